@@ -12,58 +12,134 @@ Author: Joey Zhao, 2025
 """
 
 # Required imports
+import time
+_STARTUP_T0 = time.perf_counter()  # Reference point for the --profile-startup timeline
 import os
 import csv
 import re
 import math
-import shutil
 import random
 import json
-import requests
 import io
-from datetime import date, datetime
-from tkinter import messagebox, Canvas
+import weakref
+import importlib
+import threading
+import queue
+import zlib
+import bisect
+import heapq
+from array import array
+import mmap
+import struct
+import zipfile
+import functools
+import hashlib
+import tempfile
+import atexit
+import logging
+import logging.handlers
+from datetime import date, datetime, timedelta
+from types import MappingProxyType, SimpleNamespace
+from collections import namedtuple, OrderedDict, deque, Counter
+from tkinter import messagebox, Canvas, filedialog
 import tkinter as tk
-try:
-    from tkcalendar import DateEntry
-    CALENDAR_AVAILABLE = True
-except ImportError:
-    CALENDAR_AVAILABLE = False
-    print("Warning: tkcalendar not available. Install with: pip install tkcalendar")
-    
-    # Fallback DateEntry class when tkcalendar is not available
-    class DateEntry:
-        """Fallback date entry widget using CTkEntry"""
-        def __init__(self, parent, **kwargs):
-            self.parent = parent
-            self._date = datetime.now().date()
-            # Create a simple entry with today's date
-            self.entry = ctk.CTkEntry(parent, placeholder_text="YYYY-MM-DD")
-            self.entry.insert(0, self._date.strftime("%Y-%m-%d"))
-            
-        def pack(self, **kwargs):
-            self.entry.pack(**kwargs)
-            
-        def grid(self, **kwargs):
-            self.entry.grid(**kwargs)
-            
-        def get_date(self):
-            """Get the current date value"""
-            try:
-                date_str = self.entry.get().strip()
-                return datetime.strptime(date_str, "%Y-%m-%d").date()
-            except (ValueError, TypeError):
-                return datetime.now().date()
-                
-        def set_date(self, new_date):
-            """Set the date value"""
-            self.entry.delete(0, 'end')
-            if isinstance(new_date, str):
-                self.entry.insert(0, new_date)
-            else:
-                self.entry.insert(0, new_date.strftime("%Y-%m-%d"))
+
+# --- Startup timeline (printed with --profile-startup) ---
+PROFILE_STARTUP = False
+_STARTUP_MARKS = []
+_startupReported = False
+
+def markStartup(label):
+    """Record a named point on the startup timeline. Cheap enough to leave on always."""
+    elapsed = (time.perf_counter() - _STARTUP_T0) * 1000
+    _STARTUP_MARKS.append((label, elapsed))
+    if PROFILE_STARTUP and _startupReported:
+        print(f"  {elapsed:9.1f} ms  {label} (deferred)")
+
+def printStartupTimeline():
+    """Print the import/init timeline collected so far (called once the first frame is up)."""
+    global _startupReported
+    print("Startup timeline (ms since first import):")
+    for label, elapsed in _STARTUP_MARKS:
+        print(f"  {elapsed:9.1f} ms  {label}")
+    _startupReported = True
+
+class LazyModule:
+    """
+    Stand-in for a module that is only imported the first time it is used.
+    Keeps heavy libraries (requests, Pillow, tkcalendar) off the startup path:
+    `requests.get(...)` works as usual, the import just happens on that first call.
+    """
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+            markStartup(f"lazy import {self._name}")
+        return getattr(self._module, attr)
+
+markStartup("stdlib imports")
 import customtkinter as ctk
-from PIL import Image, ImageTk
+markStartup("customtkinter imported")
+requests = LazyModule("requests")      # Weather widget only
+Image = LazyModule("PIL.Image")        # Login artwork, nav icons, weather icon
+ImageTk = LazyModule("PIL.ImageTk")
+
+class FallbackDateEntry:
+    """Fallback date entry widget using CTkEntry (used when tkcalendar is not installed)"""
+    def __init__(self, parent, **kwargs):
+        self.parent = parent
+        self._date = datetime.now().date()
+        # Create a simple entry with today's date
+        self.entry = ctk.CTkEntry(parent, placeholder_text="YYYY-MM-DD")
+        self.entry.insert(0, self._date.strftime("%Y-%m-%d"))
+        
+    def pack(self, **kwargs):
+        self.entry.pack(**kwargs)
+        
+    def grid(self, **kwargs):
+        self.entry.grid(**kwargs)
+        
+    def get_date(self):
+        """Get the current date value"""
+        try:
+            date_str = self.entry.get().strip()
+            return datetime.strptime(date_str, "%Y-%m-%d").date()
+        except (ValueError, TypeError):
+            return datetime.now().date()
+            
+    def set_date(self, new_date):
+        """Set the date value"""
+        self.entry.delete(0, 'end')
+        if isinstance(new_date, str):
+            self.entry.insert(0, new_date)
+        else:
+            self.entry.insert(0, new_date.strftime("%Y-%m-%d"))
+
+CALENDAR_AVAILABLE = None  # Unknown until the first date picker is created
+_dateEntryClass = None
+
+def createDatePicker(parent):
+    """
+    Create a date picker widget. tkcalendar is imported on first use (it is only
+    needed on the Home/Workouts/Macros pages), falling back to FallbackDateEntry.
+    """
+    global CALENDAR_AVAILABLE, _dateEntryClass
+    if _dateEntryClass is None:
+        try:
+            _dateEntryClass = importlib.import_module("tkcalendar").DateEntry
+            CALENDAR_AVAILABLE = True
+        except ImportError:
+            _dateEntryClass = FallbackDateEntry
+            CALENDAR_AVAILABLE = False
+            print("Warning: tkcalendar not available. Install with: pip install tkcalendar")
+        markStartup("lazy import tkcalendar")
+    if CALENDAR_AVAILABLE:
+        return _dateEntryClass(parent, width=10, background='darkblue',
+                               foreground='white', borderwidth=2, date_pattern='yyyy-mm-dd')
+    return _dateEntryClass(parent)
 
 """
 This solution is developed using Python, an object-oriented programming (OOP)
@@ -110,8 +186,8 @@ Explanation: External files are used to persist data between application session
 * **CSV (Delimited)**: Chosen as the primary data source for users, posts, etc.
     **Justification**: CSV files are human-readable, easily editable, and universally compatible. Python's `csv` module reads data directly into record-like dictionaries, ideal for this application's data.
 
-* **TXT (Plain Text)**: Chosen for the `error_log.txt` file.
-    **Justification**: TXT files are the simplest format for appending sequential log entries, requiring no special parsing for unstructured, chronological error logging.
+* **JSON Lines**: Chosen for the `error_log.txt` file (rotated at 1 MiB).
+    **Justification**: One JSON object per line keeps the log appendable and chronological while making severity and context fields easy to filter.
 
 --- APPLICATION OF OOP PRINCIPLES (9-10 Level) ---
 
@@ -133,6 +209,18 @@ and extensible application.
 * **Classes and Objects**: The entire application is structured around classes (`HealthyHabitsApp`, `User`, `AdminUser`, etc.) and their instantiated objects, demonstrating a deep use of OOP.
 """
 
+# --- Themed colours ---
+class ThemeColor(str):
+    """
+    A colour string tagged with the theme role it came from (e.g. "bg", "text").
+    Widgets accept it exactly like a plain hex string, but the role travels with the
+    value, so ThemeRegistry can find the widget again and recolour it in place.
+    """
+    def __new__(cls, value, role):
+        color = super().__new__(cls, value)
+        color.role = role
+        return color
+
 # --- MyFitnessPal Inspired Color Palette ---
 # Primary brand color, actions, progress
 COLOR_PRIMARY_GREEN = "#68B043"   # A vibrant, healthy green
@@ -144,7 +232,6 @@ COLOR_SECONDARY_DARK_BLUE = "#2B878A" # Darker teal/blue
 
 # Neutrals for backgrounds, text, and UI elements
 COLOR_WHITE_CLEAN = "#FFFFFF"     # Pure white for main backgrounds
-COLOR_WIDGET_BG = "#d5d0c3"       # Slightly darker than white for widget backgrounds
 COLOR_LIGHT_GREY = "#F5F5F5"      # Very light grey for subtle distinctions
 COLOR_MEDIUM_GREY = "#E0E0E0"     # Slightly darker grey for borders/dividers
 COLOR_DARK_GREY = "#4A4A4A"       # Dark grey for primary text (softer than black)
@@ -161,15 +248,18 @@ COLOR_BTN_SECONDARY_BG = COLOR_LIGHT_GREY
 COLOR_BTN_SECONDARY_TXT = COLOR_DARK_GREY
 
 # Set default theme colors (Light Mode as default, mimicking MFP)
-COLOR_BG = COLOR_WHITE_CLEAN
-COLOR_ACCENT = COLOR_LIGHT_GREY
-COLOR_ACCENT2 = COLOR_MEDIUM_GREY
-COLOR_TEXT = COLOR_TEXT_PRIMARY
-COLOR_PRIMARY = COLOR_PRIMARY_GREEN
-COLOR_SECONDARY = COLOR_SECONDARY_BLUE
-COLOR_BTN = COLOR_BTN_NORMAL_BG
-COLOR_BTN_TXT = COLOR_BTN_NORMAL_TXT
-COLOR_WHITE = COLOR_WHITE_CLEAN # Used for elements that should truly be white, even on light backgrounds
+# JUSTIFICATION (ThemeColor): Themed colours carry their role so a theme switch can
+# recolour existing widgets instead of rebuilding the whole page.
+COLOR_BG = ThemeColor(COLOR_WHITE_CLEAN, "bg")
+COLOR_ACCENT = ThemeColor(COLOR_LIGHT_GREY, "accent")
+COLOR_ACCENT2 = ThemeColor(COLOR_MEDIUM_GREY, "accent2")
+COLOR_TEXT = ThemeColor(COLOR_TEXT_PRIMARY, "text")
+COLOR_PRIMARY = ThemeColor(COLOR_PRIMARY_GREEN, "primary")
+COLOR_SECONDARY = ThemeColor(COLOR_SECONDARY_BLUE, "secondary")
+COLOR_BTN = ThemeColor(COLOR_BTN_NORMAL_BG, "btn")
+COLOR_BTN_TXT = ThemeColor(COLOR_BTN_NORMAL_TXT, "btn_txt")
+COLOR_WHITE = ThemeColor(COLOR_WHITE_CLEAN, "white") # Used for elements that should truly be white, even on light backgrounds
+COLOR_WIDGET_BG = ThemeColor("#d5d0c3", "widget_bg") # Slightly darker than white for widget backgrounds
 
 # Dark Mode Palette (Simplified adaptation, focusing on contrast and readability)
 COLOR_BG_DARK = "#2F2F2F" # Darker background
@@ -182,6 +272,99 @@ COLOR_BTN_DARK = COLOR_PRIMARY_DARK_GREEN # Slightly darker green for dark mode
 COLOR_BTN_TXT_DARK = COLOR_WHITE_CLEAN # White text on dark buttons
 COLOR_WHITE_DARK = "#383838" # Used where a "white" element would be dark grey in dark mode
 
+# Role -> colour for each theme. ThemeRegistry swaps between these at runtime.
+THEME_PALETTES = {
+    "light": {
+        "bg": COLOR_WHITE_CLEAN, "accent": COLOR_LIGHT_GREY, "accent2": COLOR_MEDIUM_GREY,
+        "text": COLOR_TEXT_PRIMARY, "primary": COLOR_PRIMARY_GREEN, "secondary": COLOR_SECONDARY_BLUE,
+        "btn": COLOR_BTN_NORMAL_BG, "btn_txt": COLOR_BTN_NORMAL_TXT, "white": COLOR_WHITE_CLEAN,
+        "widget_bg": "#F8F9FA"  # Light widget background for light mode
+    },
+    "dark": {
+        "bg": COLOR_BG_DARK, "accent": COLOR_ACCENT_DARK, "accent2": COLOR_ACCENT2_DARK,
+        "text": COLOR_TEXT_DARK, "primary": COLOR_PRIMARY_DARK, "secondary": COLOR_SECONDARY_DARK,
+        "btn": COLOR_BTN_DARK, "btn_txt": COLOR_BTN_TXT_DARK, "white": COLOR_WHITE_DARK,
+        "widget_bg": "#424242"  # Darker widget background for dark mode
+    }
+}
+
+class ThemeRegistry:
+    """
+    Holds the active palette and recolours live widgets when the theme changes.
+    CustomTkinter widgets are picked up automatically because their colour options
+    hold ThemeColor values; plain Tk widgets (e.g. Canvas) and canvas items do not
+    keep the role, so they subscribe explicitly with subscribe()/subscribeItem().
+    """
+    COLOR_OPTIONS = ("fg_color", "bg_color", "text_color", "border_color", "button_color",
+                     "button_hover_color", "hover_color", "progress_color")
+
+    def __init__(self, palettes, mode="light"):
+        self._palettes = palettes
+        self._mode = mode
+        self._subscriptions = weakref.WeakKeyDictionary()      # widget -> {option: role}
+        self._itemSubscriptions = weakref.WeakKeyDictionary()  # canvas -> {item: {option: role}}
+
+    def getMode(self):
+        return self._mode
+
+    def color(self, role):
+        """Return the ThemeColor for a role in the active palette."""
+        return ThemeColor(self._palettes[self._mode][role], role)
+
+    def subscribe(self, widget, **options):
+        """Register a Tk widget option (e.g. bg=COLOR_WIDGET_BG) to follow the theme."""
+        roles = self._subscriptions.setdefault(widget, {})
+        for option, color in options.items():
+            roles[option] = color.role
+        return widget
+
+    def subscribeItem(self, canvas, item, **options):
+        """Register a canvas item option (e.g. fill=COLOR_TEXT) to follow the theme."""
+        items = self._itemSubscriptions.setdefault(canvas, {})
+        items.setdefault(item, {}).update({option: color.role for option, color in options.items()})
+        return item
+
+    def apply(self, mode, root):
+        """
+        Switch to `mode` and recolour every existing widget under `root` in place.
+        Returns the number of widget options that were updated.
+        """
+        self._mode = mode
+        colors = {role: self.color(role) for role in self._palettes[mode]}
+        updated = 0
+        # Iterative walk (no recursion limit) over the live widget tree
+        stack = [root]
+        while stack:
+            widget = stack.pop()
+            changes = {}
+            for option in self.COLOR_OPTIONS:
+                try:
+                    value = widget.cget(option)
+                except Exception:
+                    continue  # Option not supported by this widget type
+                if isinstance(value, ThemeColor) and value != colors[value.role]:
+                    changes[option] = colors[value.role]
+            if changes:
+                widget.configure(**changes)
+                updated += len(changes)
+            stack.extend(widget.winfo_children())
+        for widget, roles in list(self._subscriptions.items()):
+            try:
+                widget.configure(**{option: colors[role] for option, role in roles.items()})
+                updated += len(roles)
+            except tk.TclError:
+                del self._subscriptions[widget]  # Widget was destroyed
+        for canvas, items in list(self._itemSubscriptions.items()):
+            try:
+                for item, roles in items.items():
+                    canvas.itemconfigure(item, **{option: colors[role] for option, role in roles.items()})
+                    updated += len(roles)
+            except tk.TclError:
+                del self._itemSubscriptions[canvas]
+        return updated
+
+THEME = ThemeRegistry(THEME_PALETTES)
+
 
 # --- Data files ---
 USERS_CSV = "users.csv"
@@ -191,8 +374,153 @@ WORKOUT_PLANS_CSV = "workout_plans.csv" # For user-created plans
 ERROR_LOG = "error_log.txt"
 BACKUP_DIR = "backups"
 ASSETS_DIR = "assets" # For icons
+FOOD_DB_FILE = "food_db.bin" # Compiled external food database (see compile_food_database)
+MEAL_PLAN_CACHE_FILE = "meal_plan_cache.json" # Generated smart meal plans (see MealPlanCache)
+WORKOUT_LOG_DIR = "workout_log" # Completed workouts per user and ISO week (see WorkoutLog)
+WORKOUT_PLANS_DIR = os.path.splitext(WORKOUT_PLANS_CSV)[0] # Per-user plan segments (see WorkoutPlanStore)
+EXERCISE_CATALOG_FILE = "exercises.csv" # Optional exercise catalog: name, group, equipment, desc
+
+# --- Instrumentation (timers, counters, latency histograms) ---
+METRICS_RECENT_PAGES = 12 # Page renders listed in the performance overlay (F12)
+METRICS_EXPORT_FILE = "metrics.json" # Default target for exportMetrics / --metrics-out
+
+class LatencyHistogram:
+    """
+    Streaming latency histogram with fixed log-spaced buckets (~9% wide, 1 µs to ~66 min).
+    Recording is O(1) and memory is constant however many samples arrive, so
+    p50/p95/p99 stay cheap to keep for the whole session; a percentile is reported
+    as the upper edge of its bucket, i.e. at most ~9% high.
+    """
+    BASE = 2 ** 0.125
+    BUCKETS = 256
+
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * self.BUCKETS))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        micros = seconds * 1e6
+        index = 0 if micros <= 1 else min(int(math.log(micros, self.BASE)) + 1, self.BUCKETS - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, pct):
+        """Return the pct-th percentile in milliseconds (0.0 when empty)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * pct / 100))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self.BASE ** index / 1000, self.max * 1000)
+        return self.max * 1000
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total * 1000 / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50), 3),
+            "p95_ms": round(self.percentile(95), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+class Metrics:
+    """
+    Process-wide registry of named timers and counters.
+    Names are dotted by kind ("io.readCsv", "page.showHome") so the overlay and
+    exports can group them. A lock keeps samples from background threads
+    (readCsv in runInBackground, backups, weather) from racing the Tk thread.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timers = {}
+        self.counters = {}
+        self.recentPages = deque(maxlen=METRICS_RECENT_PAGES)
+
+    def record(self, name, seconds):
+        with self._lock:
+            histogram = self.timers.get(name)
+            if histogram is None:
+                histogram = self.timers[name] = LatencyHistogram()
+            histogram.record(seconds)
+            if name.startswith("page."):
+                self.recentPages.append((name[5:], seconds * 1000, time.time()))
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self):
+        """Return a JSON-ready copy of every timer summary, counter and recent page render."""
+        with self._lock:
+            return {
+                "taken": datetime.now().isoformat(timespec="seconds"),
+                "uptime_s": round(time.perf_counter() - _STARTUP_T0, 3),
+                "timers": {name: h.summary() for name, h in sorted(self.timers.items())},
+                "counters": dict(sorted(self.counters.items())),
+                "recent_pages": [
+                    {"page": page, "ms": round(ms, 3), "at": datetime.fromtimestamp(at).isoformat(timespec="seconds")}
+                    for page, ms, at in self.recentPages
+                ],
+            }
+
+    def reset(self):
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+            self.recentPages.clear()
+
+METRICS = Metrics()
+
+class timing:
+    """Context manager that records the enclosed block under `name`: `with timing("io.load"): ...`"""
+    __slots__ = ("name", "_t0")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        METRICS.record(self.name, time.perf_counter() - self._t0)
+        return False
+
+def timed(name):
+    """
+    Decorator that records each call's wall time under `name`.
+    Costs two perf_counter reads and one lock round-trip per call (~1 µs).
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                METRICS.record(name, time.perf_counter() - t0)
+        return wrapper
+    return decorate
+
+def exportMetrics(path=METRICS_EXPORT_FILE):
+    """Write a METRICS snapshot as JSON and return it. Safe to call at any time."""
+    snapshot = METRICS.snapshot()
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, indent=2)
+    os.replace(tmp, path)
+    return snapshot
 
 # --- Utility: CSV ---
+@timed("io.readCsv")
 def readCsv(filename):
     """
     Read CSV file into a list of dictionaries.
@@ -206,11 +534,14 @@ def readCsv(filename):
         return []
     try:
         with open(filename, newline="", encoding="utf-8") as f:
-            return list(csv.DictReader(f))
+            rows = list(csv.DictReader(f))
+        METRICS.count("io.rowsRead", len(rows))
+        return rows
     except Exception as e:
-        logError(f"Read CSV error: {e}")
+        logError("Read CSV error", file=filename, error=str(e))
         return []
 
+@timed("io.appendCsv")
 def appendCsv(filename, row, fieldnames):
     """
     Append a row to CSV file.
@@ -223,9 +554,11 @@ def appendCsv(filename, row, fieldnames):
             if not file_exists:
                 writer.writeheader()
             writer.writerow(row)
+        METRICS.count("io.rowsWritten")
     except Exception as e:
-        logError(f"Append CSV error: {e}")
+        logError("Append CSV error", file=filename, error=str(e))
 
+@timed("io.writeCsv")
 def writeCsv(filename, rows, fieldnames):
     """
     Write list of rows to CSV file.
@@ -235,23 +568,390 @@ def writeCsv(filename, rows, fieldnames):
         with open(filename, "w", newline="", encoding="utf-8") as f:
             writer = csv.DictWriter(f, fieldnames=fieldnames)
             writer.writeheader()
+            written = 0
             for row in rows:
                 writer.writerow(row)
+                written += 1
+        METRICS.count("io.rowsWritten", written)
     except Exception as e:
-        logError(f"Write CSV error: {e}")
+        logError("Write CSV error", file=filename, error=str(e))
+
+# --- Logging (queue-based, rotating, JSON records) ---
+LOG_MAX_BYTES = 1 << 20        # rotate error_log.txt at 1 MiB...
+LOG_BACKUP_COUNT = 5           # ...keeping error_log.txt.1 to .5
+LOG_RATE_LIMIT = (5, 60.0)     # at most 5 records per message pattern per 60 s
+
+class JsonLogFormatter(logging.Formatter):
+    """One JSON object per line: time, level, message, thread, plus any context fields."""
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        entry.update(getattr(record, "context", None) or {})
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed  # repeats dropped by the rate limiter since the last one
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+_DIGITS = re.compile(r"\d+")
 
-def logError(msg):
+class RateLimitFilter(logging.Filter):
+    """
+    Let through at most `burst` records per message pattern (digits ignored) and KEY_FIELDS
+    context in each `window` seconds, so a flood of "Read CSV error" for one file does not
+    hide the same error for another. The first record after a quiet spell reports how
+    many were dropped.
+    """
+    KEY_FIELDS = ("file",)
+
+    def __init__(self, burst, window):
+        super().__init__()
+        self.burst, self.window = burst, window
+        self._windows = {}  # pattern -> [window start, records let through, records dropped]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        context = getattr(record, "context", None) or {}
+        pattern = (record.levelno, _DIGITS.sub("#", str(record.msg))[:200],
+                   tuple(str(context.get(field, "")) for field in self.KEY_FIELDS))
+        now = time.monotonic()
+        with self._lock:
+            state = self._windows.get(pattern)
+            if state is None or now - state[0] >= self.window:
+                if len(self._windows) > 1000:
+                    self._windows.clear()  # bound memory under a flood of distinct messages
+                record.suppressed = state[2] if state else 0
+                self._windows[pattern] = [now, 1, 0]
+                return True
+            if state[1] < self.burst:
+                state[1] += 1
+                record.suppressed = 0
+                return True
+            state[2] += 1
+            return False
+
+class _EnqueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that hands the record over as-is; formatting happens on the listener thread."""
+    def prepare(self, record):
+        return record
+
+_APP_LOGGER = None
+_LOG_LISTENER = None
+_appLoggerLock = threading.Lock()
+
+def getAppLogger():
+    """
+    The application logger (created on first use). Callers only filter and enqueue;
+    a QueueListener thread writes JSON lines to a size-rotated ERROR_LOG.
+    """
+    global _APP_LOGGER, _LOG_LISTENER
+    if _APP_LOGGER is None:
+        with _appLoggerLock:  # two threads logging at once must not start two listeners
+            if _APP_LOGGER is None:
+                log_queue = queue.SimpleQueue()
+                file_handler = logging.handlers.RotatingFileHandler(ERROR_LOG, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+                                                                    encoding="utf-8", delay=True)
+                file_handler.setFormatter(JsonLogFormatter())
+                _LOG_LISTENER = logging.handlers.QueueListener(log_queue, file_handler)
+                _LOG_LISTENER.start()
+                atexit.register(shutdownLogging)  # flush what is still queued on exit
+                logger = logging.getLogger("healthyhabits")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                handler = _EnqueueHandler(log_queue)
+                handler.addFilter(RateLimitFilter(*LOG_RATE_LIMIT))
+                logger.addHandler(handler)
+                _APP_LOGGER = logger
+    return _APP_LOGGER
+
+def shutdownLogging():
+    """Write out any queued records and stop the listener thread (safe to call twice)."""
+    global _LOG_LISTENER
+    if _LOG_LISTENER is not None:
+        _LOG_LISTENER.stop()
+        _LOG_LISTENER = None
+
+def logError(msg, level=logging.ERROR, **context):
     """
-    Log error messages to error_log.txt.
+    Log a message to error_log.txt, e.g. logError("Read CSV error", file=path).
     AC6: Demonstrates file I/O, error handling, and function encapsulation.
+    Keyword arguments are stored as fields of the JSON record. The caller only pays for an
+    enqueue; repeated messages are rate limited (see RateLimitFilter).
     """
-    try:
-        with open(ERROR_LOG, "a") as f:
-            f.write(f"{datetime.now().isoformat()} {msg}\n")
-    except Exception:
-        pass
+    getAppLogger().log(level, msg, extra={"context": context})
+
+# --- Backups (content-addressed, deduplicated, compressed) ---
+# Content-defined chunks: ~256 KiB on average, never under 64 KiB or over 2 MiB
+BACKUP_CHUNK_TARGET = 1 << 18
+BACKUP_CHUNK_MIN = 1 << 16
+BACKUP_CHUNK_MAX = 1 << 21
+BACKUP_CHUNK_WINDOW = 64  # bytes hashed before each candidate cut
+_LEGACY_BACKUP_PATTERN = re.compile(r"(.+)_(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})\.bak")  # pre-snapshot file copies
+BACKUP_RETENTION = (("hourly", 24, "%Y-%m-%d %H"), ("daily", 7, "%Y-%m-%d"), ("weekly", 4, "%G-W%V"))
+
+def backupSources(root="."):
+    """
+    Data files to back up, as paths relative to root: the CSV stores plus the per-user
+    log and plan directories.
+    """
+    files = [f for f in (USERS_CSV, MACROS_CSV, POSTS_CSV, WORKOUT_PLANS_CSV, MEAL_PLAN_CACHE_FILE)
+             if os.path.isfile(os.path.join(root, f))]
+    for directory in (NUTRITION_LOG_DIR, WORKOUT_LOG_DIR, WORKOUT_PLANS_DIR):
+        for parent, _, names in os.walk(os.path.join(root, directory)):
+            relative = os.path.relpath(parent, root)
+            files.extend(os.path.join(relative, name) for name in sorted(names) if not name.endswith(".tmp"))
+    return files
+
+class BackupStore:
+    """
+    Snapshot backups made of zlib-compressed, content-addressed chunks.
+    A chunk is stored once under backups/chunks/<ab>/<sha256>.z however many files or
+    snapshots contain it. Chunk boundaries depend on content, not offsets (see
+    _cut_point), so an insert near the start of users.csv re-stores one chunk rather
+    than every chunk after it. A snapshot is a JSON manifest listing every file's size,
+    mtime and chunk hashes. Only files whose size or mtime changed since the previous
+    snapshot are read. If nothing changed, no snapshot is written. prune() keeps the
+    newest snapshot of each hour, day and ISO week per BACKUP_RETENTION and deletes
+    chunks that no kept snapshot references.
+    """
+    def __init__(self, root=BACKUP_DIR):
+        self.root = root
+        self.chunk_dir = os.path.join(root, "chunks")
+        self.snapshot_dir = os.path.join(root, "snapshots")
+        self._lock = threading.Lock()  # startup and logout backups can overlap
+
+    def _chunk_path(self, digest):
+        return os.path.join(self.chunk_dir, digest[:2], digest + ".z")
+
+    def snapshots(self):
+        """Snapshot ids, oldest first (ids are sortable timestamps)."""
+        if not os.path.isdir(self.snapshot_dir):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.snapshot_dir) if name.endswith(".json"))
+
+    def manifest(self, snapshot_id):
+        with open(os.path.join(self.snapshot_dir, snapshot_id + ".json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _cut_point(buf, final):
+        """
+        Where the next chunk of buf ends, or None if more data is needed to decide.
+        Candidate cuts are line ends (the data files are CSV/JSON lines), so the scan runs
+        at bytes.find speed instead of a per-byte Python loop. A line end is a cut when the
+        CRC of the BACKUP_CHUNK_WINDOW bytes before it falls under a threshold scaled by
+        the line's length, giving ~BACKUP_CHUNK_TARGET byte chunks whatever the line
+        lengths. The decision depends only on nearby content, so after an insert the cuts
+        line up again from the next boundary. Data with no line ends is cut at the maximum.
+        """
+        threshold = (1 << 32) // BACKUP_CHUNK_TARGET
+        limit = min(len(buf), BACKUP_CHUNK_MAX)
+        line_start = buf.rfind(b"\n", 0, BACKUP_CHUNK_MIN - 1) + 1
+        i = buf.find(b"\n", BACKUP_CHUNK_MIN - 1, limit)
+        while i != -1:
+            end = i + 1
+            if zlib.crc32(buf[max(end - BACKUP_CHUNK_WINDOW, 0):end]) < (end - line_start) * threshold:
+                return end
+            line_start = end
+            i = buf.find(b"\n", end, limit)
+        if len(buf) >= BACKUP_CHUNK_MAX:
+            return BACKUP_CHUNK_MAX
+        return len(buf) if final else None
+
+    def _store_file(self, path):
+        """Chunk, hash and store one file; returns its chunk list and how many bytes were new."""
+        chunks, written = [], 0
+        buf, final = b"", False
+        with open(path, "rb") as f:
+            while buf or not final:
+                cut = self._cut_point(buf, final) if buf else None
+                if cut is None:
+                    block = f.read(BACKUP_CHUNK_MAX)
+                    final = not block
+                    buf += block
+                    continue
+                data, buf = buf[:cut], buf[cut:]
+                digest = hashlib.sha256(data).hexdigest()
+                chunk_path = self._chunk_path(digest)
+                if not os.path.exists(chunk_path):
+                    os.makedirs(os.path.dirname(chunk_path), exist_ok=True)
+                    compressed = zlib.compress(data, 6)
+                    with open(chunk_path + ".tmp", "wb") as out:
+                        out.write(compressed)
+                    os.replace(chunk_path + ".tmp", chunk_path)
+                    written += len(compressed)
+                chunks.append(digest)
+        return chunks, written
+
+    def snapshot(self, files=None):
+        """
+        Back up the given files (default backupSources()) and prune old snapshots.
+        Returns {"snapshot": id or None, "changed": [...], "failed": [...], "bytes_written": n}.
+        """
+        with self._lock:
+            self._migrate_legacy()
+            previous = self.snapshots()
+            previous_files = self.manifest(previous[-1])["files"] if previous else {}
+            entries, changed, failed, written = {}, [], [], 0
+            for path in (backupSources() if files is None else files):
+                key = path.replace(os.sep, "/")
+                try:
+                    stat = os.stat(path)
+                    old = previous_files.get(key)
+                    if old and old["size"] == stat.st_size and old["mtime"] == stat.st_mtime_ns:
+                        entries[key] = old
+                        continue
+                    chunks, new_bytes = self._store_file(path)
+                except OSError as e:
+                    logError("Backup failed", file=path, error=str(e))
+                    failed.append(path)
+                    if key in previous_files:
+                        entries[key] = previous_files[key]  # keep the last good copy in the snapshot
+                    continue
+                entries[key] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "chunks": chunks}
+                changed.append(key)
+                written += new_bytes
+            removed = [key for key in previous_files if key not in entries and key not in failed]
+            snapshot_id = None
+            if changed or removed or not previous:
+                now = datetime.now()
+                snapshot_id = now.strftime("%Y-%m-%dT%H-%M-%S.%f")
+                os.makedirs(self.snapshot_dir, exist_ok=True)
+                path = os.path.join(self.snapshot_dir, snapshot_id + ".json")
+                with open(path + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump({"created": now.isoformat(), "changed": changed, "files": entries}, f)
+                os.replace(path + ".tmp", path)
+                self._prune(now)
+            return {"snapshot": snapshot_id, "changed": changed, "failed": failed, "bytes_written": written}
+
+    def _migrate_legacy(self):
+        """
+        Turn backups/<file>_<timestamp>.bak copies from the old backup scheme into
+        snapshots (one per timestamp) and delete them, so retention and chunk
+        de-duplication apply to them too (caller holds the lock).
+        """
+        if not os.path.isdir(self.root):
+            return
+        groups = {}
+        for name in os.listdir(self.root):
+            match = _LEGACY_BACKUP_PATTERN.fullmatch(name)
+            if match:
+                groups.setdefault(match.group(2), []).append((match.group(1), os.path.join(self.root, name)))
+        if not groups:
+            return
+        top_level = {USERS_CSV, MACROS_CSV, POSTS_CSV, WORKOUT_PLANS_CSV}
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        for stamp, copies in sorted(groups.items()):
+            taken = datetime.strptime(stamp, "%Y-%m-%d_%H-%M-%S")
+            entries = {}
+            try:
+                for original, path in copies:
+                    # Plan segments were copied by basename only
+                    key = original if original in top_level else f"{WORKOUT_PLANS_DIR}/{original}"
+                    chunks, _ = self._store_file(path)
+                    stat = os.stat(path)
+                    entries[key] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "chunks": chunks}
+            except OSError as e:
+                logError("Legacy backup migration failed", file=stamp, error=str(e))
+                continue  # Leave this group's copies in place for the next attempt
+            manifest_path = os.path.join(self.snapshot_dir, taken.strftime("%Y-%m-%dT%H-%M-%S.%f") + ".json")
+            with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({"created": taken.isoformat(), "changed": sorted(entries), "files": entries, "migrated": True}, f)
+            os.replace(manifest_path + ".tmp", manifest_path)
+            for _, path in copies:
+                os.remove(path)
+        self._prune(datetime.now())
+
+    def _prune(self, now):
+        """Apply BACKUP_RETENTION, then delete chunks no remaining snapshot uses (caller holds the lock)."""
+        snapshot_ids = self.snapshots()
+        keep = {snapshot_ids[-1]} if snapshot_ids else set()
+        for _, count, bucket_format in BACKUP_RETENTION:
+            buckets = set()
+            for snapshot_id in reversed(snapshot_ids):
+                bucket = datetime.strptime(snapshot_id, "%Y-%m-%dT%H-%M-%S.%f").strftime(bucket_format)
+                if bucket not in buckets:
+                    if len(buckets) == count:
+                        break
+                    buckets.add(bucket)
+                    keep.add(snapshot_id)
+        doomed = [s for s in snapshot_ids if s not in keep]
+        if not doomed:
+            return
+        for snapshot_id in doomed:
+            os.remove(os.path.join(self.snapshot_dir, snapshot_id + ".json"))
+        live = set()
+        for snapshot_id in keep:
+            for entry in self.manifest(snapshot_id)["files"].values():
+                live.update(entry["chunks"])
+        for parent, _, names in os.walk(self.chunk_dir):
+            for name in names:
+                if name.endswith(".z") and name[:-2] not in live:
+                    os.remove(os.path.join(parent, name))
+
+    def restore(self, target_dir, snapshot_id=None, paths=None):
+        """
+        Write files from a snapshot (default: the newest) under target_dir, optionally only
+        those in paths. Each chunk is checked against its hash and each file is replaced
+        atomically. A full restore (no paths) then deletes the data files under target_dir
+        that the snapshot does not have (see backupSources), so the tree matches the
+        snapshot rather than mixing in newer files.
+        Returns {"restored": n, "removed": [...]}.
+        """
+        with self._lock:
+            snapshot_ids = self.snapshots()
+            if not snapshot_ids:
+                raise ValueError("No backups found")
+            snapshot_id = snapshot_id or snapshot_ids[-1]
+            if snapshot_id not in snapshot_ids:
+                raise ValueError(f"Unknown backup '{snapshot_id}'")
+            files = self.manifest(snapshot_id)["files"]
+            restored = 0
+            for key, entry in files.items():
+                if paths and key not in paths:
+                    continue
+                destination = os.path.join(target_dir, *key.split("/"))
+                os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+                with open(destination + ".tmp", "wb") as out:
+                    for digest in entry["chunks"]:
+                        with open(self._chunk_path(digest), "rb") as f:
+                            data = zlib.decompress(f.read())
+                        if hashlib.sha256(data).hexdigest() != digest:
+                            raise ValueError(f"Backup chunk {digest} is corrupt")
+                        out.write(data)
+                os.replace(destination + ".tmp", destination)
+                restored += 1
+            removed = []
+            if not paths:
+                for path in backupSources(target_dir):
+                    key = path.replace(os.sep, "/")
+                    if key not in files:
+                        os.remove(os.path.join(target_dir, path))
+                        removed.append(key)
+            return {"restored": restored, "removed": removed}
+
+_BACKUP_STORE = None
+
+def getBackupStore():
+    """The shared BackupStore (created on first use)."""
+    global _BACKUP_STORE
+    if _BACKUP_STORE is None:
+        _BACKUP_STORE = BackupStore()
+    return _BACKUP_STORE
 
 # --- Input validation (AC7) ---
+# Numeric ranges shared by the logging forms and the CSV importer: (lowest, highest, message)
+INPUT_RANGES = {
+    "calories": (0, 5000, "Calories must be between 0 and 5000"),
+    "macro": (0, 1000, "Macro values must be between 0 and 1000g"),
+    "serving": (1, 2000, "Serving size must be between 1 and 2000g"),
+    "weight": (20, 300, "Weight must be between 20 and 300 kg"),
+}
+
 def validateInput(inputType, value):
     """
     Validate input based on type (AC7: validation techniques, error handling, control structures).
@@ -272,8 +972,364 @@ def validateInput(inputType, value):
         except ValueError:
             return False, "Enter a number."
         return True, ""
+    elif inputType in INPUT_RANGES:
+        lowest, highest, message = INPUT_RANGES[inputType]
+        try:
+            v = float(value)
+        except (TypeError, ValueError):
+            return False, "Enter a number."
+        if not (lowest <= v <= highest):
+            return False, message
+        return True, ""
     return False, "Unknown input type"
 
+# --- Workout event log (append-only, indexed by ISO week) ---
+def isoWeekKey(day):
+    """ISO week label for a date, e.g. "2026-W42" (weeks start on Monday)."""
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+class WorkoutLog:
+    """
+    Append-only store of completed workouts.
+    Each user has a directory with one CSV segment per ISO week (workout_log/<id>/<YYYY-Www>.csv)
+    and an index.json of {week: count} updated on every append. Weekly progress and streaks
+    read only the index; history reads only the segments of the weeks asked for.
+    """
+    FIELDS = ["studentId", "timestamp", "workout", "plan"]
+
+    def __init__(self, root=WORKOUT_LOG_DIR):
+        self.root = root
+        self._index = {}  # studentId -> {week: count}
+
+    def _user_dir(self, student_id):
+        return os.path.join(self.root, re.sub(r"[^A-Za-z0-9_-]", "_", student_id))
+
+    def _week_index(self, student_id):
+        """
+        {week: count} for the user, cached. Rebuilt by counting the segments (and written
+        back) when index.json is missing or unreadable but segments exist.
+        """
+        index = self._index.get(student_id)
+        if index is None:
+            user_dir = self._user_dir(student_id)
+            path = os.path.join(user_dir, "index.json")
+            index = None
+            if os.path.exists(path):
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        index = json.load(f)
+                except (OSError, ValueError) as e:
+                    logError(f"Workout index unreadable ({path}): {e}")
+            if index is None:
+                segments = [name for name in os.listdir(user_dir) if name.endswith(".csv")] if os.path.isdir(user_dir) else []
+                index = {os.path.splitext(name)[0]: len(readCsv(os.path.join(user_dir, name))) for name in segments}
+                if segments:
+                    self._save_index(student_id, index)
+            self._index[student_id] = index
+        return index
+
+    def _save_index(self, student_id, index):
+        user_dir = self._user_dir(student_id)
+        temp_path = os.path.join(user_dir, "index.json.tmp")
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.replace(temp_path, os.path.join(user_dir, "index.json"))
+        except OSError as e:
+            logError(f"Workout index save failed: {e}")
+
+    def record(self, student_id, workout_name, plan_name=None, when=None):
+        """Append one completed workout and return the event as stored."""
+        when = when or datetime.now()
+        week = isoWeekKey(when.date())
+        user_dir = self._user_dir(student_id)
+        os.makedirs(user_dir, exist_ok=True)
+        index = self._week_index(student_id)  # before the append, or a rebuild would count this event twice
+        event = {"studentId": student_id, "timestamp": when.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "workout": workout_name or "Workout", "plan": plan_name or ""}
+        appendCsv(os.path.join(user_dir, week + ".csv"), event, self.FIELDS)
+
+        index[week] = index.get(week, 0) + 1
+        self._save_index(student_id, index)
+        return event
+
+    def week_count(self, student_id, week=None):
+        """Workouts logged in an ISO week (this week by default)."""
+        return self._week_index(student_id).get(week or isoWeekKey(date.today()), 0)
+
+    def weekly_counts(self, student_id, start=None, end=None):
+        """[(week, count)] for weeks with workouts between start and end inclusive, oldest first."""
+        index = self._week_index(student_id)
+        return [(week, index[week]) for week in sorted(index)
+                if (start is None or week >= start) and (end is None or week <= end)]
+
+    def events(self, student_id, start=None, end=None):
+        """Workout events for weeks between start and end inclusive, oldest first."""
+        user_dir = self._user_dir(student_id)
+        rows = []
+        for week, _ in self.weekly_counts(student_id, start, end):
+            rows.extend(readCsv(os.path.join(user_dir, week + ".csv")))
+        return rows
+
+    def last_event(self, student_id):
+        index = self._week_index(student_id)
+        if not index:
+            return None
+        rows = readCsv(os.path.join(self._user_dir(student_id), max(index) + ".csv"))
+        return rows[-1] if rows else None
+
+    def week_streak(self, student_id, weekly_goal, today=None, adjustments=None):
+        """
+        Consecutive ISO weeks, counting back from this one, that met weekly_goal.
+        The current week only adds to the streak once met; an unfinished week never breaks it.
+        adjustments ({week: delta}) are added to the logged counts first, e.g. the user's
+        reset of this week's progress (see User.resetWorkoutsCompleted).
+        """
+        index = self._week_index(student_id)
+        adjustments = adjustments or {}
+
+        def count(week):
+            return max(index.get(week, 0) + adjustments.get(week, 0), 0)
+
+        day = today or date.today()
+        streak = 0
+        if count(isoWeekKey(day)) >= weekly_goal:
+            streak += 1
+        while True:
+            day -= timedelta(days=7)
+            if count(isoWeekKey(day)) < max(weekly_goal, 1):
+                return streak
+            streak += 1
+
+_WORKOUT_LOG = None
+
+def getWorkoutLog():
+    """The shared WorkoutLog (created on first use)."""
+    global _WORKOUT_LOG
+    if _WORKOUT_LOG is None:
+        _WORKOUT_LOG = WorkoutLog()
+    return _WORKOUT_LOG
+
+class WorkoutPlanStore:
+    """
+    Workout plans keyed by (user_id, plan_name).
+    Each user has an append-only JSON Lines segment (workout_plans/<id>.jsonl): saving a plan
+    appends the whole record, deleting appends a tombstone, and the latest line per plan
+    wins. A segment is replayed once and its parsed plans cached, so opening the planner
+    reads only that user's file. Segments are compacted when superseded lines outnumber
+    live plans. Plans in the legacy WORKOUT_PLANS_CSV are moved into segments on first use.
+    """
+    def __init__(self, root=WORKOUT_PLANS_DIR, legacy_csv=WORKOUT_PLANS_CSV):
+        self.root = root
+        self.legacy_csv = legacy_csv
+        self._plans = {}  # user_id -> OrderedDict(plan_name -> exercises)
+        self._dead = {}   # user_id -> superseded/tombstone lines in the segment
+        self._migrated = False
+
+    def _segment(self, user_id):
+        return os.path.join(self.root, re.sub(r"[^A-Za-z0-9_-]", "_", user_id) + ".jsonl")
+
+    def _migrate_legacy(self):
+        """Split the old shared CSV into per-user segments (once), keeping it as *.migrated."""
+        self._migrated = True
+        if not os.path.exists(self.legacy_csv):
+            return
+        os.makedirs(self.root, exist_ok=True)
+        by_user = {}
+        for row in readCsv(self.legacy_csv):
+            try:
+                exercises = json.loads(row.get("exercises") or "[]")
+            except json.JSONDecodeError:
+                logError(f"Could not parse exercises for plan: {row.get('plan_name')}")
+                continue
+            by_user.setdefault(row.get("user_id", ""), OrderedDict())[row.get("plan_name", "")] = exercises
+        for user_id, plans in by_user.items():
+            self._plans.pop(user_id, None)
+            self._write_segment(user_id, plans, mode="a")
+        os.replace(self.legacy_csv, self.legacy_csv + ".migrated")
+
+    def _write_segment(self, user_id, plans, mode="w"):
+        path = self._segment(user_id)
+        temp_path = path + ".tmp" if mode == "w" else path
+        with open(temp_path, mode, encoding="utf-8") as f:
+            for plan_name, exercises in plans.items():
+                f.write(json.dumps({"plan_name": plan_name, "exercises": exercises}) + "\n")
+        if mode == "w":
+            os.replace(temp_path, path)
+
+    def _load(self, user_id):
+        if not self._migrated:
+            self._migrate_legacy()
+        plans = self._plans.get(user_id)
+        if plans is None:
+            plans, lines = OrderedDict(), 0
+            path = self._segment(user_id)
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                            if "plan_name" not in record or not (record.get("deleted") or "exercises" in record):
+                                raise ValueError("missing plan_name or exercises")
+                        except (ValueError, TypeError):  # JSONDecodeError is a ValueError; TypeError for non-objects
+                            logError(f"Skipping damaged workout plan record in {path}")
+                            continue
+                        lines += 1
+                        plans.pop(record["plan_name"], None)
+                        if not record.get("deleted"):
+                            plans[record["plan_name"]] = record["exercises"]
+            self._plans[user_id] = plans
+            self._dead[user_id] = lines - len(plans)
+        return plans
+
+    def _append(self, user_id, record):
+        os.makedirs(self.root, exist_ok=True)
+        with open(self._segment(user_id), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def _maybe_compact(self, user_id):
+        plans = self._plans[user_id]
+        if self._dead[user_id] > len(plans) + 8:
+            self._write_segment(user_id, plans)
+            self._dead[user_id] = 0
+
+    def plans(self, user_id):
+        """The user's plans as {"user_id", "plan_name", "exercises"} dicts, oldest first (copies)."""
+        return [{"user_id": user_id, "plan_name": name, "exercises": [dict(e) for e in exercises]}
+                for name, exercises in self._load(user_id).items()]
+
+    def get(self, user_id, plan_name):
+        exercises = self._load(user_id).get(plan_name)
+        return None if exercises is None else {"user_id": user_id, "plan_name": plan_name, "exercises": [dict(e) for e in exercises]}
+
+    def upsert(self, user_id, plan_name, exercises):
+        """Create or replace one plan (a single appended line)."""
+        plans = self._load(user_id)
+        exercises = [dict(e) for e in exercises]
+        self._append(user_id, {"plan_name": plan_name, "exercises": exercises})
+        if plan_name in plans:
+            self._dead[user_id] += 1
+        plans[plan_name] = exercises
+        self._maybe_compact(user_id)
+
+    def delete(self, user_id, plan_name):
+        """Remove one plan (a single appended tombstone). Returns False if it did not exist."""
+        plans = self._load(user_id)
+        if plan_name not in plans:
+            return False
+        self._append(user_id, {"plan_name": plan_name, "deleted": True})
+        del plans[plan_name]
+        self._dead[user_id] += 2  # the old record and the tombstone
+        self._maybe_compact(user_id)
+        return True
+
+# --- Exercise catalog (data-driven, indexed by muscle group, equipment and name tokens) ---
+EXERCISE_CATALOG_FIELDS = ["name", "group", "equipment", "desc"]
+# Used when EXERCISE_CATALOG_FILE is missing: (name, group, equipment, desc)
+_BUILTIN_EXERCISES = (
+    ("Push-ups", "Chest", "Bodyweight", "A classic bodyweight exercise for the chest, shoulders, and triceps."),
+    ("Bench Press", "Chest", "Barbell", "A fundamental compound lift for building upper body strength, primarily targeting the chest."),
+    ("Dumbbell Flyes", "Chest", "Dumbbell", "An isolation exercise that stretches and targets the pectoral muscles."),
+    ("Pull-ups", "Back", "Bodyweight", "A challenging bodyweight exercise that builds a wide, strong back."),
+    ("Bent-Over Rows", "Back", "Barbell", "A compound exercise that targets the entire back, improving posture and strength."),
+    ("Deadlifts", "Back", "Barbell", "A full-body lift that heavily engages the back, legs, and core."),
+    ("Squats", "Legs", "Barbell", "The king of leg exercises, targeting quads, hamstrings, and glutes."),
+    ("Lunges", "Legs", "Bodyweight", "A unilateral exercise excellent for balance, stability, and leg strength."),
+    ("Leg Press", "Legs", "Machine", "A machine-based exercise to build powerful quadriceps."),
+    ("Overhead Press", "Shoulders", "Barbell", "A key lift for developing strong, broad shoulders."),
+    ("Lateral Raises", "Shoulders", "Dumbbell", "An isolation exercise to target the medial deltoid for shoulder width."),
+    ("Bicep Curls", "Arms", "Dumbbell", "The classic exercise for building bicep peaks."),
+    ("Tricep Dips", "Arms", "Bodyweight", "A bodyweight or weighted exercise to build strong triceps."),
+    ("Plank", "Core", "Bodyweight", "An isometric exercise to build core stability and endurance."),
+    ("Crunches", "Core", "Bodyweight", "A basic but effective exercise for targeting the abdominal muscles."),
+)
+
+def _nameTokens(text):
+    return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+class ExerciseCatalog:
+    """
+    Read-only exercise list with inverted indexes. Exercises are kept in name order and
+    each index maps a muscle group, an equipment type or a lowercase name token to the
+    array of positions that have it (ascending, so results stay in name order). A query
+    intersects the relevant postings starting from the shortest, so cost depends on the
+    size of the answer, not the size of the catalog. Name tokens match by prefix.
+    """
+    def __init__(self, rows):
+        self.items = sorted((dict(row) for row in rows if row.get("name")), key=lambda e: e["name"].lower())
+        self.by_group, self.by_equipment, self.by_token = {}, {}, {}
+        for i, exercise in enumerate(self.items):
+            # readCsv gives "" for empty cells and None for short rows
+            exercise["group"] = (exercise.get("group") or "").strip() or "Other"
+            exercise["equipment"] = (exercise.get("equipment") or "").strip()
+            exercise["desc"] = exercise.get("desc") or ""
+            self.by_group.setdefault(exercise["group"], array("I")).append(i)
+            if exercise["equipment"]:
+                self.by_equipment.setdefault(exercise["equipment"], array("I")).append(i)
+            for token in _nameTokens(exercise["name"]):
+                self.by_token.setdefault(token, array("I")).append(i)
+        self._tokens = sorted(self.by_token)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, i):
+        return self.items[i]
+
+    def groups(self):
+        return sorted(self.by_group)
+
+    def equipment(self):
+        return sorted(self.by_equipment)
+
+    def _token_positions(self, prefix):
+        """Positions whose name has a token starting with prefix."""
+        start = bisect.bisect_left(self._tokens, prefix)
+        stop = bisect.bisect_left(self._tokens, prefix + "\uffff")
+        if stop - start == 1:
+            return self.by_token[self._tokens[start]]
+        positions = set()
+        for token in self._tokens[start:stop]:
+            positions.update(self.by_token[token])
+        return positions
+
+    def query(self, group=None, equipment=None, text=""):
+        """Positions (in name order) matching every filter given; "All"/None/"" means no filter."""
+        postings = []
+        if group and group != "All":
+            postings.append(self.by_group.get(group, ()))
+        if equipment and equipment != "All":
+            postings.append(self.by_equipment.get(equipment, ()))
+        for token in _nameTokens(text):
+            postings.append(self._token_positions(token))
+        if not postings:
+            return range(len(self.items))
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            if not result:
+                break
+            result.intersection_update(posting)
+        return sorted(result)
+
+def loadExerciseCatalog(path=None):
+    """Build an ExerciseCatalog from a CSV (name, group, equipment, desc), or the built-in list."""
+    path = path or EXERCISE_CATALOG_FILE
+    rows = readCsv(path) if os.path.exists(path) else []
+    if not rows:
+        rows = [dict(zip(EXERCISE_CATALOG_FIELDS, row)) for row in _BUILTIN_EXERCISES]
+    return ExerciseCatalog(rows)
+
+_EXERCISE_CATALOG = None
+
+def getExerciseCatalog():
+    """The shared ExerciseCatalog (loaded on first use)."""
+    global _EXERCISE_CATALOG
+    if _EXERCISE_CATALOG is None:
+        _EXERCISE_CATALOG = loadExerciseCatalog()
+    return _EXERCISE_CATALOG
+
 # --- OOP: User class (AC6) ---
 class User:
     """
@@ -299,25 +1355,31 @@ class User:
         self._weight = float(weight) if weight is not None else None
         self._gender = gender
         self._activityLevel = activityLevel
-        self._caloriesConsumed = 0
+        # Memoised derived values (goal/consumed/progress dicts, calorie summary). Every method
+        # that changes a field they depend on calls _invalidate, so they are never stale.
+        self._derived = {}
+        # What was eaten lives only in the NutritionLog; this is the day total the memos were built from
+        self._consumedStamp = None
         self._caloriesBurned = 0
         self._calorieGoal = self.calculateCalorieGoal()
-        # Macro tracking attributes
-        self._proteinConsumed = 0.0
-        self._carbsConsumed = 0.0
-        self._fatConsumed = 0.0
         # Macro goals (calculated based on calorie goal and user type)
         self._proteinGoal = self.calculateProteinGoal()
         self._carbsGoal = self.calculateCarbsGoal()
         self._fatGoal = self.calculateFatGoal()
         # New attributes for home page features
         self._weeklyGoal = 3 # Default weekly workout goal
-        self._workoutsCompleted = 0 # Workouts completed this week
+        # Workouts this week come from the WorkoutLog; this is an adjustment on top of it
+        # (counts carried over from before the log existed, or minus workouts cleared by a reset)
+        self._workoutsCompleted = 0
         # Weight tracking attributes
         self._weightHistory = []  # List of (date, weight) tuples
         self._manualGoals = False
         # Workout completion tracking
         self._lastWorkoutCompletion = None  # Last completed workout info
+        # Period keys for the daily/weekly counters above. Rollover is lazy: the first read
+        # or write that finds a stale key archives the closing totals and starts afresh.
+        self._macroDate = date.today().isoformat()
+        self._workoutWeek = isoWeekKey(date.today())
         # JUSTIFICATION (List of Tuples): _weightHistory uses a list of (date, weight) tuples.
         # Tuples are immutable and efficient for storing paired data points that should not change.
 
@@ -341,46 +1403,107 @@ class User:
         factor = activity_factors.get(self._activityLevel, 1.2)
         return int(bmr * factor)
 
+    # Derived values keyed by what they depend on; _invalidate drops the affected ones.
+    _GOAL_DERIVED = ("goals", "progress", "calories")
+    _CONSUMED_DERIVED = ("consumed", "progress", "calories")
+
+    def _memo(self, key, compute):
+        value = self._derived.get(key)
+        if value is None:
+            value = self._derived[key] = compute()
+        return value
+
+    def _invalidate(self, keys):
+        for key in keys:
+            self._derived.pop(key, None)
+
     def getCalorieGoal(self):
         return self._calorieGoal
     def getCaloriesConsumed(self):
-        return self._caloriesConsumed
+        return self.getMacroConsumed()["calories"]
     def getCaloriesBurned(self):
+        self._rolloverDay()
         return self._caloriesBurned
-    def addCalories(self, amount):
-        self._caloriesConsumed += amount
     def addExercise(self, amount):
+        self._rolloverDay()
         self._caloriesBurned += amount
+        self._invalidate(self._CONSUMED_DERIVED)
     def getRemainingCalories(self):
-        return self._calorieGoal - self._caloriesConsumed + self._caloriesBurned
+        return self.getCalorieSummary()["remaining"]
+
+    def getCalorieSummary(self):
+        """Today's goal, consumed, burned, net (consumed - burned) and remaining calories (read-only)."""
+        self._rolloverDay()
+        consumed = self.getMacroConsumed()["calories"]
+        def compute():
+            net = consumed - self._caloriesBurned
+            return MappingProxyType({"goal": self._calorieGoal, "consumed": consumed,
+                                     "burned": self._caloriesBurned, "net": net, "remaining": self._calorieGoal - net})
+        return self._memo("calories", compute)
+
+    def _rolloverDay(self, today=None):
+        """
+        Reset the day counters if the date has moved on since they were last touched.
+        The closing day's foods are already in the NutritionLog, which is the history, so
+        this is O(1) however long the user has been away.
+        """
+        today = (today or date.today()).isoformat()
+        if today == self._macroDate:
+            return False
+        self._caloriesBurned = 0
+        self._invalidate(self._CONSUMED_DERIVED)
+        self._macroDate = today
+        return True
+
+    def _rolloverWeek(self, today=None):
+        """
+        Same as _rolloverDay for the weekly workout adjustment, keyed by ISO week.
+        Completed workouts are in the WorkoutLog, so only the adjustment is reset.
+        """
+        week = isoWeekKey(today or date.today())
+        if week == self._workoutWeek:
+            return False
+        self._workoutsCompleted = 0  # the new week's events are already in the log
+        self._workoutWeek = week
+        return True
 
     def getWeeklyGoal(self):
         return self._weeklyGoal
     def setWeeklyGoal(self, goal):
         self._weeklyGoal = goal
     def getWorkoutsCompleted(self):
-        return self._workoutsCompleted
-    def addWorkoutCompleted(self, workout_name=None):
+        self._rolloverWeek()
+        return max(getWorkoutLog().week_count(self._studentId) + self._workoutsCompleted, 0)
+    def addWorkoutCompleted(self, workout_name=None, plan_name=None):
         """Add a completed workout to the user's progress tracking.
+        The event is appended to the WorkoutLog, so users.csv does not need rewriting.
         
         Args:
             workout_name (str, optional): Name of the specific workout completed.
+            plan_name (str, optional): Workout plan it was completed from.
         """
-        self._workoutsCompleted += 1
-        
-        # Track last completion with timestamp and workout name
-        from datetime import datetime
-        self._lastWorkoutCompletion = {
-            "name": workout_name or "Workout",
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "time": datetime.now().strftime("%H:%M")
-        }
+        self._rolloverWeek()
+        event = getWorkoutLog().record(self._studentId, workout_name, plan_name)
+        self._lastWorkoutCompletion = self._completionFromEvent(event)
     def resetWorkoutsCompleted(self):
-        self._workoutsCompleted = 0
+        self._rolloverWeek()  # Archive last week first, or its carried-over count is overwritten
+        self._workoutsCompleted = -getWorkoutLog().week_count(self._studentId)
+
+    @staticmethod
+    def _completionFromEvent(event):
+        when = datetime.strptime(event["timestamp"], "%Y-%m-%dT%H:%M:%S")
+        return {"name": event["workout"], "date": when.strftime("%Y-%m-%d"), "time": when.strftime("%H:%M")}
 
     def getLastWorkoutCompletion(self):
         """Get information about the last completed workout."""
-        return self._lastWorkoutCompletion
+        event = getWorkoutLog().last_event(self._studentId)
+        return self._completionFromEvent(event) if event else self._lastWorkoutCompletion
+
+    def getWorkoutStreak(self):
+        """Consecutive weeks (up to this one) in which the weekly goal was met."""
+        self._rolloverWeek()
+        return getWorkoutLog().week_streak(self._studentId, self._weeklyGoal,
+                                           adjustments={self._workoutWeek: self._workoutsCompleted})
 
     def getWeightHistory(self):
         return self._weightHistory
@@ -395,6 +1518,17 @@ class User:
         # Keep only last 12 weeks of data
         if len(self._weightHistory) > 84:  # 12 weeks * 7 days
             self._weightHistory = self._weightHistory[-84:]
+
+    def addWeightEntries(self, entries):
+        """
+        Add many (date_str, weight) entries at once; the last one given for a date wins.
+        History is kept in date order and trimmed to the 84 most recent days, so importing
+        older records never pushes out newer ones (getCurrentWeight reads the last entry).
+        """
+        merged = dict(self._weightHistory)
+        for date_str, weight in entries:
+            merged[date_str] = float(weight)
+        self._weightHistory = sorted(merged.items())[-84:]
     
     def getCurrentWeight(self):
         if self._weightHistory:
@@ -579,51 +1713,46 @@ class User:
         return round((cal_goal * 0.30) / 9, 1)  # 9 cal per gram
 
     # Macro tracking methods
-    def addMacros(self, calories, protein=0, carbs=0, fat=0):
-        """Add macronutrients to daily totals."""
-        self._caloriesConsumed += calories
-        self._proteinConsumed += protein
-        self._carbsConsumed += carbs
-        self._fatConsumed += fat
-    
     def getMacroGoals(self):
-        """Return dictionary of all macro goals."""
-        return {
+        """Return dictionary of all macro goals (memoised, read-only)."""
+        return self._memo("goals", lambda: MappingProxyType({
             "calories": self._calorieGoal,
             "protein": self._proteinGoal,
             "carbs": self._carbsGoal,
             "fat": self._fatGoal
-        }
+        }))
     
     def getMacroConsumed(self):
-        """Return dictionary of all consumed macros."""
-        return {
-            "calories": self._caloriesConsumed,
-            "protein": self._proteinConsumed,
-            "carbs": self._carbsConsumed,
-            "fat": self._fatConsumed
-        }
+        """
+        Return today's consumed macros from the NutritionLog's day totals (memoised until
+        those totals change, read-only). Foods are logged through the NutritionLog only.
+        """
+        day = getNutritionLog().day_totals(self._studentId, date.today().isoformat())
+        stamp = tuple(day[key] for key in MACRO_KEYS)
+        if stamp != self._consumedStamp:
+            self._consumedStamp = stamp
+            self._invalidate(self._CONSUMED_DERIVED)
+        return self._memo("consumed", lambda: MappingProxyType({
+            "calories": round(day["calories"]),
+            "protein": round(day["protein"], 1),
+            "carbs": round(day["carbs"], 1),
+            "fat": round(day["fat"], 1)
+        }))
     
     def getMacroProgress(self):
-        """Return macro progress as percentages."""
+        """Return macro progress as percentages (memoised, read-only)."""
         goals = self.getMacroGoals()
         consumed = self.getMacroConsumed()
-        progress = {}
-        
-        for macro in goals:
-            if goals[macro] > 0:
-                progress[macro] = min((consumed[macro] / goals[macro]) * 100, 100)
-            else:
-                progress[macro] = 0
-        
-        return progress
+        def compute():
+            progress = {}
+            for macro in goals:
+                if goals[macro] > 0:
+                    progress[macro] = min((consumed[macro] / goals[macro]) * 100, 100)
+                else:
+                    progress[macro] = 0
+            return MappingProxyType(progress)
+        return self._memo("progress", compute)
     
-    def resetDailyMacros(self):
-        """Reset daily macro tracking (call at midnight or new day)."""
-        self._caloriesConsumed = 0
-        self._proteinConsumed = 0.0
-        self._carbsConsumed = 0.0
-        self._fatConsumed = 0.0
 
     def set_manual_goals(self, calorie_goal, protein_goal, carbs_goal, fat_goal):
         """Set macro goals manually, overriding automatic calculation."""
@@ -632,6 +1761,7 @@ class User:
         self._carbsGoal = carbs_goal
         self._fatGoal = fat_goal
         self._manualGoals = True
+        self._invalidate(self._GOAL_DERIVED)
 
     def reset_to_automatic_goals(self):
         """Reset goals to be calculated automatically based on profile."""
@@ -640,6 +1770,7 @@ class User:
         self._proteinGoal = self.calculateProteinGoal()
         self._carbsGoal = self.calculateCarbsGoal()
         self._fatGoal = self.calculateFatGoal()
+        self._invalidate(self._GOAL_DERIVED)
 
     def toDict(self):
         """
@@ -663,12 +1794,8 @@ class User:
             "weight": str(self._weight) if self._weight is not None else "",
             "gender": self._gender or "",
             "activityLevel": self._activityLevel or "",
-            "caloriesConsumed": str(self._caloriesConsumed),
             "caloriesBurned": str(self._caloriesBurned),
             "calorieGoal": str(self._calorieGoal),
-            "proteinConsumed": str(self._proteinConsumed),
-            "carbsConsumed": str(self._carbsConsumed),
-            "fatConsumed": str(self._fatConsumed),
             "proteinGoal": str(self._proteinGoal),
             "carbsGoal": str(self._carbsGoal),
             "fatGoal": str(self._fatGoal),
@@ -676,7 +1803,9 @@ class User:
             "workoutsCompleted": str(self._workoutsCompleted),
             "weightHistory": "|".join([f"{date}:{weight}" for date, weight in self._weightHistory]),
             "manualGoals": str(self._manualGoals),
-            "lastWorkoutCompletion": json.dumps(self._lastWorkoutCompletion) if self._lastWorkoutCompletion else ""
+            "lastWorkoutCompletion": json.dumps(self._lastWorkoutCompletion) if self._lastWorkoutCompletion else "",
+            "macroDate": self._macroDate,
+            "workoutWeek": self._workoutWeek
         }
         return d
 
@@ -717,8 +1846,7 @@ class User:
             user = User(**user_args)
 
         # The rest of the attribute setting is common to all user types
-        user._caloriesConsumed = int(d.get("caloriesConsumed", 0))
-        user._caloriesBurned = int(d.get("caloriesBurned", 0))
+        user._caloriesBurned = int(float(d.get("caloriesBurned") or 0))
         
         user._manualGoals = (d.get("manualGoals", "False") == "True")
         if user._manualGoals:
@@ -726,14 +1854,13 @@ class User:
             user._proteinGoal = float(d.get("proteinGoal", 150))
             user._carbsGoal = float(d.get("carbsGoal", 200))
             user._fatGoal = float(d.get("fatGoal", 60))
-        else:
-            user.reset_to_automatic_goals()
+        # Otherwise the constructor has already calculated the automatic goals from the profile
 
-        user._proteinConsumed = float(d.get("proteinConsumed", 0))
-        user._carbsConsumed = float(d.get("carbsConsumed", 0))
-        user._fatConsumed = float(d.get("fatConsumed", 0))
         user._weeklyGoal = int(d.get("weeklyGoal", 3))
-        user._workoutsCompleted = int(d.get("workoutsCompleted", 0))
+        user._workoutsCompleted = int(d.get("workoutsCompleted") or 0)
+        # Rows written before rollover tracking have no period keys; treat their counters as current
+        user._macroDate = d.get("macroDate") or user._macroDate
+        user._workoutWeek = d.get("workoutWeek") or user._workoutWeek
         
         last_workout_str = d.get("lastWorkoutCompletion", "")
         if last_workout_str:
@@ -800,6 +1927,7 @@ class PremiumUser(User):
         """A sample method for premium-only features."""
         messagebox.showinfo("Premium Feature", "Welcome to your premium analytics dashboard!")
 
+@timed("io.getAllUsers")
 def getAllUsers():
     """
     Retrieve all users from users.csv.
@@ -824,6 +1952,7 @@ def userExists(studentId):
     """
     return getUserById(studentId) is not None
 
+@timed("io.saveUser")
 def saveUser(user):
     """
     Save user to users.csv.
@@ -833,32 +1962,300 @@ def saveUser(user):
     users.append(user.toDict())
     writeCsv(USERS_CSV, users, [
         "studentId", "password", "goalWeight", "goalType", "planType", "isAdmin", "badges", "securityAnswer",
-        "age", "height", "weight", "gender", "activityLevel", "caloriesConsumed", "caloriesBurned", "calorieGoal",
-        "proteinConsumed", "carbsConsumed", "fatConsumed",
+        "age", "height", "weight", "gender", "activityLevel", "caloriesBurned", "calorieGoal",
         "proteinGoal", "carbsGoal", "fatGoal",
-        "weeklyGoal", "workoutsCompleted", "weightHistory", "manualGoals", "lastWorkoutCompletion"
+        "weeklyGoal", "workoutsCompleted", "weightHistory", "manualGoals", "lastWorkoutCompletion",
+        "macroDate", "workoutWeek"
     ])
 
 
 
+# --- UI animation engine ---
+def easeOutCubic(t):
+    """Easing curve: fast start, gentle stop (t and result both in 0..1)."""
+    return 1 - pow(1 - t, 3)
+
+class Animator:
+    """
+    Small frame-timed animation engine driven by a single root.after() ticker.
+    Each animation is positioned by elapsed time rather than by step count, so when
+    the main loop is busy frames are simply dropped and the animation still finishes
+    on time. Starting an animation with a key that is already running replaces it,
+    continuing from the current value, so rapid clicks never fight over a widget.
+    """
+    FRAME_MS = 16  # ~60 fps
+
+    def __init__(self, root):
+        self._root = root
+        self._animations = {}  # key -> animation state (dictionary record)
+        self._tickId = None
+
+    def animate(self, key, start, end, durationMs, apply, easing=easeOutCubic, onDone=None):
+        """Animate a value from start to end, calling apply(value) on each frame."""
+        running = self._animations.get(key)
+        if running is not None:
+            # Merge: continue from where the old animation is, for the remaining distance
+            fullDistance = abs(running["end"] - running["start"]) or 1
+            start = running["current"]
+            durationMs *= min(1.0, abs(end - start) / fullDistance)
+        self._animations[key] = {
+            "start": start, "end": end, "current": start, "applied": None,
+            "startTime": time.perf_counter(), "duration": max(durationMs, 1),
+            "apply": apply, "easing": easing, "onDone": onDone
+        }
+        if self._tickId is None:
+            self._tickId = self._root.after(0, self._tick)
+
+    def cancel(self, key):
+        """Stop an animation where it is."""
+        self._animations.pop(key, None)
+
+    def isAnimating(self, key):
+        return key in self._animations
+
+    def _tick(self):
+        """Advance every running animation to the current time (one shared timer)."""
+        self._tickId = None
+        now = time.perf_counter()
+        for key, anim in list(self._animations.items()):
+            t = min(1.0, (now - anim["startTime"]) * 1000 / anim["duration"])
+            anim["current"] = anim["start"] + (anim["end"] - anim["start"]) * anim["easing"](t)
+            value = int(round(anim["current"]))
+            try:
+                if value != anim["applied"]:  # Skip redundant geometry updates
+                    anim["apply"](value)
+                    anim["applied"] = value
+            except tk.TclError:
+                self._animations.pop(key, None)  # Widget was destroyed mid-animation
+                continue
+            if t >= 1.0:
+                self._animations.pop(key, None)
+                if anim["onDone"]:
+                    anim["onDone"]()
+        if self._animations:
+            self._tickId = self._root.after(self.FRAME_MS, self._tick)
+
+# --- Virtualised list widget ---
+class VirtualList(ctk.CTkFrame):
+    """
+    Scrollable list that only creates widgets for the rows in view.
+    Rows have a fixed height. A pool of just enough row widgets (made by make_row(parent))
+    is placed on a canvas whose scroll region covers every item. Scrolling moves the pool
+    and calls fill_row(widget, item) for rows whose item changed, so building the list
+    costs the same for 15 items or 15,000.
+    """
+    def __init__(self, master, make_row, fill_row, row_height=48, **kwargs):
+        kwargs.setdefault("fg_color", "transparent")
+        super().__init__(master, **kwargs)
+        self._make_row = make_row
+        self._fill_row = fill_row
+        self.row_height = row_height
+        self._items = []
+        self._pool = []   # [widget, canvas window id, index shown or None]
+        self._canvas = THEME.subscribe(Canvas(self, bg=COLOR_WIDGET_BG, highlightthickness=0), bg=COLOR_WIDGET_BG)
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.pack(side="right", fill="y")
+        self._canvas.pack(side="left", fill="both", expand=True)
+        self._canvas.configure(yscrollcommand=self._scrollbar.set)
+        self._canvas.bind("<Configure>", lambda event: self._layout())
+        self._bind_wheel(self._canvas)
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", lambda e: self._scroll_units(-1 if e.delta > 0 else 1), add="+")
+        widget.bind("<Button-4>", lambda e: self._scroll_units(-1), add="+")
+        widget.bind("<Button-5>", lambda e: self._scroll_units(1), add="+")
+        for child in widget.winfo_children():
+            self._bind_wheel(child)
+
+    def set_items(self, items):
+        """Show a new sequence of items, scrolled to the top."""
+        self._items = items
+        self._canvas.configure(scrollregion=(0, 0, 1, len(items) * self.row_height))
+        self._canvas.yview_moveto(0)
+        for slot in self._pool:
+            slot[2] = None
+        self._layout()
+
+    def _on_scrollbar(self, *args):
+        self._canvas.yview(*args)
+        self._refresh()
+
+    def _scroll_units(self, units):
+        self._canvas.yview_scroll(units, "units")
+        self._refresh()
+
+    def _layout(self):
+        """Size the pool to the visible height (plus one partly visible row) and the current width."""
+        height = max(self._canvas.winfo_height(), self.row_height)
+        width = self._canvas.winfo_width()
+        self._canvas.configure(yscrollincrement=self.row_height)
+        needed = height // self.row_height + 2
+        while len(self._pool) < needed:
+            widget = self._make_row(self._canvas)
+            self._bind_wheel(widget)
+            window = self._canvas.create_window(0, 0, window=widget, anchor="nw", height=self.row_height)
+            self._pool.append([widget, window, None])
+        for _, window, _ in self._pool:
+            self._canvas.itemconfigure(window, width=width)
+        self._refresh()
+
+    def _refresh(self):
+        if not self._pool:
+            return
+        top = self._canvas.canvasy(0)
+        first = max(int(top // self.row_height), 0)
+        for offset, slot in enumerate(self._pool):
+            widget, window, shown = slot
+            index = first + offset
+            if index >= len(self._items):
+                self._canvas.itemconfigure(window, state="hidden")
+                slot[2] = None
+                continue
+            self._canvas.coords(window, 0, index * self.row_height)
+            self._canvas.itemconfigure(window, state="normal")
+            if shown != index:
+                self._fill_row(widget, self._items[index])
+                slot[2] = index
+
 # --- Existing code with updated docstrings ---
 class HealthyHabitsApp:
     def __init__(self):
+        markStartup("app init")
         self.root = ctk.CTk()
         self.root.title("Healthy Habits")
         self.root.geometry("1100x730")
         ctk.set_appearance_mode("light")
         ctk.set_default_color_theme("blue")
+        markStartup("root window created")
         self.weather_api_key = "68e9c19dc9ac617b698f3c4d315fca9b" 
         self.currentUser = None
-        self.posts = readCsv(POSTS_CSV)
-        self.exercise_library = self.loadExerciseLibrary()
+        # Background jobs hand results back to the Tk thread through this queue
+        self._uiQueue = queue.Queue()
+        self._pendingJobs = 0
+        # Posts are only needed on the Feed page, so load them off the startup path.
+        # Until they arrive the Feed shows a placeholder and offers no post actions.
+        self.posts = []
+        self._postsLoaded = False
+        self._feedLoadingLabel = None
+        self.runInBackground(lambda: readCsv(POSTS_CSV), self._onPostsLoaded)
         self.navBar = None
         self.contentFrame = None
         self.toggle_btn = None
         self.menu_visible = False  # Start with menu closed
+        self.animator = Animator(self.root)
+        self.mealPlanCache = MealPlanCache(path=MEAL_PLAN_CACHE_FILE)
+        self.nutritionLog = getNutritionLog()  # shared with User, which reads today's totals from it
+        self.workoutPlans = WorkoutPlanStore()
+        # One app-wide click router replaces per-widget "close sidebar" bindings
+        self.root.bind_all("<Button-1>", self._routeClick, add="+")
+        # F12 toggles the performance overlay (page render times, I/O counts)
+        self._perfOverlay = None
+        self._perfOverlayLabel = None
+        self._perfOverlayOn = False
+        self._perfOverlayJob = None
+        self.root.bind_all("<F12>", self.togglePerfOverlay, add="+")
         
         self.showLoginSplit()
+        markStartup("login screen built")
+
+    def runInBackground(self, work, onDone=None):
+        """
+        Run `work()` on a daemon thread and pass its result to `onDone` on the Tk thread.
+        Tkinter is not thread-safe, so the worker never touches widgets; results come
+        back through a queue that the main loop polls while jobs are pending.
+        """
+        def worker():
+            try:
+                result, error = work(), None
+            except Exception as e:
+                result, error = None, e
+            self._uiQueue.put((onDone, result, error))
+
+        self._pendingJobs += 1
+        threading.Thread(target=worker, daemon=True).start()
+        if self._pendingJobs == 1:
+            self.root.after(50, self._drainUiQueue)
+
+    def _drainUiQueue(self):
+        """Deliver finished background results on the Tk thread."""
+        while True:
+            try:
+                onDone, result, error = self._uiQueue.get_nowait()
+            except queue.Empty:
+                break
+            self._pendingJobs -= 1
+            if error is not None:
+                logError("Background task failed", error=repr(error))
+            elif onDone:
+                onDone(result)
+        if self._pendingJobs > 0:
+            self.root.after(50, self._drainUiQueue)
+
+    def _onPostsLoaded(self, posts):
+        """Install posts read in the background and re-render the Feed if it is waiting for them."""
+        self.posts = posts
+        self._postsLoaded = True
+        markStartup("posts loaded (background)")
+        if self._feedLoadingLabel is not None and self._feedLoadingLabel.winfo_exists():
+            self.showFeed()
+        self._feedLoadingLabel = None
+
+    def togglePerfOverlay(self, event=None):
+        """Show or hide the performance overlay in the top-right corner of the window."""
+        self._perfOverlayOn = not self._perfOverlayOn
+        if self._perfOverlayOn:
+            self._refreshPerfOverlay()
+            return
+        if self._perfOverlayJob is not None:
+            self.root.after_cancel(self._perfOverlayJob)  # Else a quick re-toggle runs two refresh loops
+            self._perfOverlayJob = None
+        if self._perfOverlay is not None:
+            if self._perfOverlay.winfo_exists():
+                self._perfOverlay.destroy()
+            self._perfOverlay = None
+
+    def _buildPerfOverlay(self):
+        overlay = ctk.CTkFrame(self.root, fg_color=COLOR_DARK_GREY, corner_radius=8)
+        self._perfOverlayLabel = ctk.CTkLabel(overlay, text="", justify="left", anchor="w",
+                                              font=ctk.CTkFont(family="Courier", size=11), text_color=COLOR_WHITE_CLEAN)
+        self._perfOverlayLabel.pack(padx=10, pady=(8, 4), anchor="w")
+        ctk.CTkButton(overlay, text="Export JSON", width=100, height=24, fg_color=COLOR_BTN, text_color=COLOR_BTN_TXT,
+                      command=self._exportPerfSnapshot).pack(padx=10, pady=(0, 8), anchor="e")
+        overlay.place(relx=1.0, x=-12, y=12, anchor="ne")
+        self._perfOverlay = overlay
+
+    def _refreshPerfOverlay(self):
+        """Redraw the overlay once a second while it is switched on."""
+        self._perfOverlayJob = None
+        if not self._perfOverlayOn:
+            return
+        # Login/main-nav rebuilds destroy every child of root, the overlay included
+        if self._perfOverlay is None or not self._perfOverlay.winfo_exists():
+            self._buildPerfOverlay()
+        snapshot = METRICS.snapshot()
+        lines = ["Recent pages            ms"]
+        lines += [f"  {p['page'][4:]:<20}{p['ms']:>6.1f}" for p in reversed(snapshot["recent_pages"])] or ["  (none yet)"]
+        lines.append("")
+        lines.append("Timer          n   p50   p95   p99")
+        for name, stats in snapshot["timers"].items():
+            if not name.startswith("page."):
+                lines.append(f"  {name.split('.', 1)[1][:11]:<11}{stats['count']:>4}{stats['p50_ms']:>6.1f}{stats['p95_ms']:>6.1f}{stats['p99_ms']:>6.1f}")
+        counters = snapshot["counters"]
+        lines.append("")
+        lines.append(f"Rows read {counters.get('io.rowsRead', 0)}, written {counters.get('io.rowsWritten', 0)}")
+        self._perfOverlayLabel.configure(text="\n".join(lines))
+        self._perfOverlay.lift()
+        self._perfOverlayJob = self.root.after(1000, self._refreshPerfOverlay)
+
+    def _exportPerfSnapshot(self):
+        try:
+            exportMetrics(METRICS_EXPORT_FILE)
+            messagebox.showinfo("Performance", f"Metrics written to {os.path.abspath(METRICS_EXPORT_FILE)}")
+        except OSError as e:
+            logError("Metrics export failed", file=METRICS_EXPORT_FILE, error=str(e))
+            messagebox.showerror("Performance", "Could not write the metrics file.")
+
+    @timed("net.getWeatherData")
     def getWeatherData(self):
         """Fetches live weather data from OpenWeatherMap API."""
         if self.weather_api_key == "YOUR_API_KEY_HERE" or not self.weather_api_key:
@@ -888,59 +2285,91 @@ class HealthyHabitsApp:
                 return {"error": "Invalid API Key provided."}
             return {"error": f"Weather data not found (HTTP Error)."}
         except requests.exceptions.RequestException as req_err:
-            logError(f"Weather API request failed: {req_err}")
+            logError("Weather API request failed", level=logging.WARNING, error=str(req_err))
             return {"error": "Could not connect to weather service."}
         except Exception as e:
-            logError(f"An error occurred fetching weather data: {e}")
+            logError("An error occurred fetching weather data", error=str(e))
             return {"error": "An unknown error occurred."}
     def setThemeColors(self, mode):
+        """
+        Switch between light and dark palettes.
+        Existing widgets are recoloured in place by the ThemeRegistry, so the current page,
+        its data and any network/CSV results stay as they are (no rebuild, no refetch).
+        """
         global COLOR_BG, COLOR_ACCENT, COLOR_ACCENT2, COLOR_TEXT, COLOR_PRIMARY, COLOR_SECONDARY, COLOR_BTN, COLOR_BTN_TXT, COLOR_WHITE, COLOR_WIDGET_BG
-        if mode == "dark":
-            COLOR_BG = COLOR_BG_DARK
-            COLOR_ACCENT = COLOR_ACCENT_DARK
-            COLOR_ACCENT2 = COLOR_ACCENT2_DARK
-            COLOR_TEXT = COLOR_TEXT_DARK
-            COLOR_PRIMARY = COLOR_PRIMARY_DARK
-            COLOR_SECONDARY = COLOR_SECONDARY_DARK
-            COLOR_BTN = COLOR_BTN_DARK
-            COLOR_BTN_TXT = COLOR_BTN_TXT_DARK
-            COLOR_WHITE = COLOR_WHITE_DARK
-            COLOR_WIDGET_BG = "#424242"  # Darker widget background for dark mode
-        else: # Light mode
-            COLOR_BG = COLOR_WHITE_CLEAN
-            COLOR_ACCENT = COLOR_LIGHT_GREY
-            COLOR_ACCENT2 = COLOR_MEDIUM_GREY
-            COLOR_TEXT = COLOR_TEXT_PRIMARY
-            COLOR_PRIMARY = COLOR_PRIMARY_GREEN
-            COLOR_SECONDARY = COLOR_SECONDARY_BLUE
-            COLOR_BTN = COLOR_BTN_NORMAL_BG
-            COLOR_BTN_TXT = COLOR_BTN_NORMAL_TXT
-            COLOR_WHITE = COLOR_WHITE_CLEAN # Ensure white is truly white in light mode
-            COLOR_WIDGET_BG = "#F8F9FA"  # Light widget background for light mode
-        # Re-render main navigation and current page to apply new colors
-        if self.currentUser: # Only re-render if logged in
-            self.showMainNav()
-        else: # If on login/register, re-render that specific view
-            self.showLoginSplit()
-    def loadExerciseLibrary(self):
-        """Loads a predefined list of exercises. This is a data source for the planner."""
-        return [
-            {"name": "Push-ups", "group": "Chest", "desc": "A classic bodyweight exercise for the chest, shoulders, and triceps."},
-            {"name": "Bench Press", "group": "Chest", "desc": "A fundamental compound lift for building upper body strength, primarily targeting the chest."},
-            {"name": "Dumbbell Flyes", "group": "Chest", "desc": "An isolation exercise that stretches and targets the pectoral muscles."},
-            {"name": "Pull-ups", "group": "Back", "desc": "A challenging bodyweight exercise that builds a wide, strong back."},
-            {"name": "Bent-Over Rows", "group": "Back", "desc": "A compound exercise that targets the entire back, improving posture and strength."},
-            {"name": "Deadlifts", "group": "Back", "desc": "A full-body lift that heavily engages the back, legs, and core."},
-            {"name": "Squats", "group": "Legs", "desc": "The king of leg exercises, targeting quads, hamstrings, and glutes."},
-            {"name": "Lunges", "group": "Legs", "desc": "A unilateral exercise excellent for balance, stability, and leg strength."},
-            {"name": "Leg Press", "group": "Legs", "desc": "A machine-based exercise to build powerful quadriceps."},
-            {"name": "Overhead Press", "group": "Shoulders", "desc": "A key lift for developing strong, broad shoulders."},
-            {"name": "Lateral Raises", "group": "Shoulders", "desc": "An isolation exercise to target the medial deltoid for shoulder width."},
-            {"name": "Bicep Curls", "group": "Arms", "desc": "The classic exercise for building bicep peaks."},
-            {"name": "Tricep Dips", "group": "Arms", "desc": "A bodyweight or weighted exercise to build strong triceps."},
-            {"name": "Plank", "group": "Core", "desc": "An isometric exercise to build core stability and endurance."},
-            {"name": "Crunches", "group": "Core", "desc": "A basic but effective exercise for targeting the abdominal muscles."},
-        ]
+        mode = "dark" if mode == "dark" else "light"
+        THEME.apply(mode, self.root)
+        # Update the globals so widgets created from now on use the new palette
+        COLOR_BG = THEME.color("bg")
+        COLOR_ACCENT = THEME.color("accent")
+        COLOR_ACCENT2 = THEME.color("accent2")
+        COLOR_TEXT = THEME.color("text")
+        COLOR_PRIMARY = THEME.color("primary")
+        COLOR_SECONDARY = THEME.color("secondary")
+        COLOR_BTN = THEME.color("btn")
+        COLOR_BTN_TXT = THEME.color("btn_txt")
+        COLOR_WHITE = THEME.color("white")
+        COLOR_WIDGET_BG = THEME.color("widget_bg")
+    def _exerciseBrowser(self, parent, on_add=None, show_desc=True, wraplength=400):
+        """
+        Search box, muscle-group and equipment filters over a VirtualList of the exercise catalog.
+        Filtering is an index query (see ExerciseCatalog.query); on_add(exercise) adds an "Add" button per row.
+        """
+        catalog = getExerciseCatalog()
+        browser = ctk.CTkFrame(parent, fg_color="transparent")
+        filter_row = ctk.CTkFrame(browser, fg_color="transparent")
+        filter_row.pack(fill="x", pady=(0, 5))
+        search_entry = ctk.CTkEntry(filter_row, placeholder_text="Search exercises...")
+        search_entry.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        group_var = ctk.StringVar(value="All")
+        equipment_var = ctk.StringVar(value="All")
+        count_label = ctk.CTkLabel(browser, text="", text_color=COLOR_TEXT_SECONDARY, font=ctk.CTkFont(size=11))
+
+        def make_row(canvas):
+            row = ctk.CTkFrame(canvas, fg_color=COLOR_ACCENT, corner_radius=6)
+            row.grid_columnconfigure(0, weight=1)
+            row.title_label = ctk.CTkLabel(row, text="", font=ctk.CTkFont(weight="bold"), anchor="w")
+            row.title_label.grid(row=0, column=0, sticky="w", padx=10, pady=(4, 0))
+            if show_desc:
+                row.desc_label = ctk.CTkLabel(row, text="", wraplength=wraplength, justify="left", anchor="w", text_color=COLOR_TEXT_SECONDARY, font=ctk.CTkFont(size=11))
+                row.desc_label.grid(row=1, column=0, sticky="w", padx=10, pady=(0, 4))
+            if on_add:
+                row.add_button = ctk.CTkButton(row, text="Add", width=50)
+                row.add_button.grid(row=0, column=1, rowspan=2, padx=10)
+            return row
+
+        def fill_row(row, position):
+            exercise = catalog[position]
+            equipment = f", {exercise['equipment']}" if exercise["equipment"] else ""
+            row.title_label.configure(text=f"{exercise['name']} ({exercise['group']}{equipment})")
+            if show_desc:
+                row.desc_label.configure(text=exercise["desc"])
+            if on_add:
+                row.add_button.configure(command=lambda e=exercise: on_add(dict(e)))
+
+        exercise_list = VirtualList(browser, make_row, fill_row, row_height=64 if show_desc else 40)
+        pending = [None]
+
+        def apply_filter(*args):
+            pending[0] = None
+            positions = catalog.query(group_var.get(), equipment_var.get(), search_entry.get())
+            exercise_list.set_items(positions)
+            count_label.configure(text=f"{len(positions):,} of {len(catalog):,} exercises")
+
+        def on_search_key(event):
+            if pending[0] is not None:
+                browser.after_cancel(pending[0])
+            pending[0] = browser.after(120, apply_filter)
+
+        ctk.CTkOptionMenu(filter_row, variable=group_var, values=["All"] + catalog.groups(), width=110, command=apply_filter).pack(side="left", padx=(0, 5))
+        if catalog.equipment():
+            ctk.CTkOptionMenu(filter_row, variable=equipment_var, values=["All"] + catalog.equipment(), width=110, command=apply_filter).pack(side="left")
+        search_entry.bind("<KeyRelease>", on_search_key)
+        count_label.pack(anchor="w")
+        exercise_list.pack(fill="both", expand=True)
+        apply_filter()
+        return browser
+
     def _openExerciseLibraryDialog(self, add_exercise_callback):
         """Opens a pop-up dialog to select exercises."""
         dialog = ctk.CTkToplevel(self.root)
@@ -950,15 +2379,8 @@ class HealthyHabitsApp:
         
         ctk.CTkLabel(dialog, text="Exercise Library", font=ctk.CTkFont(size=20, weight="bold")).pack(pady=10)
 
-        library_scroll_frame = ctk.CTkScrollableFrame(dialog)
-        library_scroll_frame.pack(fill="both", expand=True, padx=10, pady=10)
-
-        for exercise in self.exercise_library:
-            ex_frame = ctk.CTkFrame(library_scroll_frame)
-            ex_frame.pack(fill="x", pady=4, padx=4)
-            ctk.CTkLabel(ex_frame, text=f"{exercise['name']} ({exercise['group']})", font=ctk.CTkFont(weight="bold")).pack(anchor="w", padx=10, pady=(5,0))
-            ctk.CTkLabel(ex_frame, text=exercise['desc'], wraplength=400, justify="left", text_color=COLOR_TEXT_SECONDARY).pack(anchor="w", padx=10, pady=(0,5))
-            ctk.CTkButton(ex_frame, text="Add", width=50, command=lambda e=exercise: self._getSetsRepsAndAdd(e, add_exercise_callback, dialog)).pack(side="right", padx=10, pady=5)
+        self._exerciseBrowser(dialog, on_add=lambda e: self._getSetsRepsAndAdd(e, add_exercise_callback, dialog),
+                              wraplength=360).pack(fill="both", expand=True, padx=10, pady=10)
 
     def _getSetsRepsAndAdd(self, exercise, add_exercise_callback, parent_dialog):
         """Opens a second small dialog to get sets/reps, then calls the callback."""
@@ -1092,13 +2514,12 @@ class HealthyHabitsApp:
             """Log the completed workout to the home progress tracker."""
             # Add workout completion to user's tracking
             user = self.currentUser
-            user.addWorkoutCompleted(workout_name=plan_name)
+            user.addWorkoutCompleted(workout_name=plan_name, plan_name=plan_name)
             
-            # Auto-adjust goal if user exceeds their weekly goal
+            # Auto-adjust goal if user exceeds their weekly goal (the only change users.csv needs)
             if user.getWorkoutsCompleted() > user.getWeeklyGoal():
                 user.setWeeklyGoal(user.getWorkoutsCompleted())
-            
-            saveUser(user)
+                saveUser(user)
             
             # Show success message with plan name
             messagebox.showinfo("Workout Completed! 🎉", 
@@ -1176,6 +2597,7 @@ class HealthyHabitsApp:
         ctk.CTkButton(bottom_frame, text="Save Plan", command=final_save_plan, fg_color=COLOR_PRIMARY_GREEN).pack(side="right", padx=10)
         ctk.CTkButton(bottom_frame, text="Cancel", command=lambda: self._drawPlannerHome(container)).pack(side="right", padx=10)
 
+    @timed("page.showWorkoutPlannerHub")
     def showWorkoutPlannerHub(self, sub_page=None, plan_to_view=None):
         """Display workout planning hub."""
         cf = self.contentFrame
@@ -1271,8 +2693,6 @@ class HealthyHabitsApp:
             library_frame = ctk.CTkFrame(creator_frame, fg_color=COLOR_WIDGET_BG)
             library_frame.grid(row=0, column=0, sticky="nsew", padx=(0, 10))
             ctk.CTkLabel(library_frame, text="Exercise Library").pack(pady=5)
-            library_scroll = ctk.CTkScrollableFrame(library_frame, fg_color="transparent")
-            library_scroll.pack(fill="both", expand=True, padx=5)
 
             plan_frame = ctk.CTkFrame(creator_frame, fg_color=COLOR_WIDGET_BG)
             plan_frame.grid(row=0, column=1, sticky="nsew")
@@ -1316,11 +2736,7 @@ class HealthyHabitsApp:
                         messagebox.showwarning("Input Error", "Please enter sets and reps.")
                 ctk.CTkButton(dialog, text="Add", command=confirm_add).pack(pady=10)
 
-            for ex in self.exercise_library:
-                lib_ex_frame = ctk.CTkFrame(library_scroll, fg_color=COLOR_ACCENT)
-                lib_ex_frame.pack(fill="x", pady=2)
-                ctk.CTkLabel(lib_ex_frame, text=ex['name']).pack(side="left", padx=10)
-                ctk.CTkButton(lib_ex_frame, text="Add", width=50, command=lambda e=ex: add_exercise(e)).pack(side="right", padx=10)
+            self._exerciseBrowser(library_frame, on_add=add_exercise, show_desc=False).pack(fill="both", expand=True, padx=5)
 
             def final_save_plan():
                 if not current_plan_exercises:
@@ -1354,67 +2770,10 @@ class HealthyHabitsApp:
         """Displays the filterable exercise library."""
         ctk.CTkLabel(cf, text="Exercise Library", font=ctk.CTkFont(size=24, weight="bold")).pack(pady=10)
         
-        filter_frame = ctk.CTkFrame(cf, fg_color="transparent")
-        filter_frame.pack(fill="x", padx=20, pady=5)
-        ctk.CTkLabel(filter_frame, text="Filter by muscle group:").pack(side="left")
-        
-        muscle_groups = ["All"] + sorted(list(set(ex['group'] for ex in self.exercise_library)))
-        filter_var = ctk.StringVar(value="All")
-        
-        library_scroll_frame = ctk.CTkScrollableFrame(cf)
-        library_scroll_frame.pack(fill="both", expand=True, padx=20, pady=10)
-
-        def apply_filter(*args):
-            for w in library_scroll_frame.winfo_children(): w.destroy()
-            group = filter_var.get()
-            filtered_list = self.exercise_library if group == "All" else [ex for ex in self.exercise_library if ex['group'] == group]
-            
-            for exercise in filtered_list:
-                ex_frame = ctk.CTkFrame(library_scroll_frame, fg_color=COLOR_WIDGET_BG, corner_radius=8)
-                ex_frame.pack(fill="x", pady=5)
-                ctk.CTkLabel(ex_frame, text=f"{exercise['name']} ({exercise['group']})", font=ctk.CTkFont(size=16, weight="bold")).pack(anchor="w", padx=15, pady=(5,0))
-                ctk.CTkLabel(ex_frame, text=exercise['desc'], wraplength=800, text_color=COLOR_TEXT_SECONDARY, justify="left").pack(anchor="w", padx=15, pady=(0,5))
-        
-        filter_menu = ctk.CTkOptionMenu(filter_frame, variable=filter_var, values=muscle_groups, command=apply_filter)
-        filter_menu.pack(side="left", padx=10)
-        
-        apply_filter()
+        self._exerciseBrowser(cf, wraplength=800).pack(fill="both", expand=True, padx=20, pady=10)
         ctk.CTkButton(cf, text="Back to Planner", command=self.showWorkoutPlannerHub).pack(pady=15)
 
-    def getUserWorkoutPlans(self):
-        """Gets all workout plans for the current user."""
-        all_plans = readCsv(WORKOUT_PLANS_CSV)
-        user_plans = []
-        for plan in all_plans:
-            if plan.get('user_id') == self.currentUser.getStudentId():
-                try:
-                    plan['exercises'] = json.loads(plan['exercises'])
-                    user_plans.append(plan)
-                except json.JSONDecodeError:
-                    logError(f"Could not parse exercises for plan: {plan.get('plan_name')}")
-        return user_plans
-
-    def saveWorkoutPlan(self, plan_data):
-        """Saves a new or updated workout plan for the user."""
-        all_plans = readCsv(WORKOUT_PLANS_CSV)
-        
-        plan_to_save = {
-            "user_id": self.currentUser.getStudentId(),
-            "plan_name": plan_data['plan_name'],
-            "exercises": json.dumps(plan_data['exercises'])
-        }
-
-        plan_exists = False
-        for i, existing_plan in enumerate(all_plans):
-            if existing_plan.get('user_id') == plan_to_save['user_id'] and existing_plan.get('plan_name') == plan_to_save['plan_name']:
-                all_plans[i] = plan_to_save
-                plan_exists = True
-                break
-        
-        if not plan_exists:
-            all_plans.append(plan_to_save)
-
-        writeCsv(WORKOUT_PLANS_CSV, all_plans, ["user_id", "plan_name", "exercises"])
+    @timed("page.showLoginSplit")
     def showLoginSplit(self):
         """Display split login/register UI with content on left, image on right."""
         for w in self.root.winfo_children():
@@ -1434,6 +2793,14 @@ class HealthyHabitsApp:
         # Right: Image/branding
         right = ctk.CTkFrame(splitFrame, fg_color=COLOR_BG, corner_radius=0)
         right.grid(row=0, column=1, sticky="nsew")
+        # Decoding and resizing the artwork is the slowest part of this screen, so it is
+        # drawn once the login card is already visible (after the first idle redraw).
+        self.root.after_idle(lambda: self.root.after(0, lambda: self._drawLoginArtwork(right)))
+
+    def _drawLoginArtwork(self, right):
+        """Fill the right-hand side of the login screen with the branding image."""
+        if not right.winfo_exists():
+            return  # User already moved on from the login screen
         try:
             img = Image.open("fitness.png")
             # Calculate frame dimensions (right side is larger)
@@ -1708,16 +3075,14 @@ class HealthyHabitsApp:
     # --- Main navigation & placeholders (AC7/SRS) ---
     def showMainNav(self):
         """Display main navigation bar and content with a slidable menu."""
-        for w in self.root.winfo_children():
-            w.destroy()
+        with timing("nav.teardown"):
+            for w in self.root.winfo_children():
+                w.destroy()
 
         # Main Content Frame (full width, menu will overlay when visible)
         self.contentFrame = ctk.CTkScrollableFrame(self.root, fg_color=COLOR_BG)
         self.contentFrame.place(x=0, y=0, relwidth=1, relheight=1)
         
-        # Bind click event to content frame to close sidebar when clicked
-        self.contentFrame.bind("<Button-1>", self.close_sidebar_on_click)
-        
         # Left Navigation Bar (starts hidden, can slide in)
         self.navBar = ctk.CTkFrame(self.root, fg_color=COLOR_ACCENT2, corner_radius=0, width=220)
         self.navBar.place(x=-220, y=0, relheight=1)
@@ -1791,30 +3156,16 @@ class HealthyHabitsApp:
         self.menu_visible = not self.menu_visible
 
     def animate_slide(self, widget, start_x, end_x):
-        """Animate a widget sliding horizontally."""
-        duration = 200  # Animation duration in milliseconds
-        steps = 20      # Number of frames for the animation
-        delay = duration // steps
-        change_x = end_x - start_x
-
-        def ease_out_cubic(t): 
-            return 1 - pow(1 - t, 3)
-
-        def step_animation(i):
-            progress = i / steps
-            eased_progress = ease_out_cubic(progress)
-            current_x = start_x + change_x * eased_progress
-            try:
-                widget.place(x=int(current_x), y=0, relheight=1)
-                # Ensure toggle button stays on top
-                if hasattr(self, 'toggle_btn') and self.toggle_btn:
-                    self.toggle_btn.lift()
-            except:
-                pass  # Handle case where widget might be destroyed
-            if i < steps:
-                self.root.after(delay, lambda: step_animation(i + 1))
-        
-        step_animation(0)
+        """
+        Animate a widget sliding horizontally (200ms, ease-out).
+        Runs on the shared Animator, so a new slide on the same widget takes over
+        from the current position instead of starting a competing animation.
+        """
+        # Ensure toggle button stays on top
+        if self.toggle_btn:
+            self.toggle_btn.lift()
+        self.animator.animate(("slide", str(widget)), start_x, end_x, 200,
+                              lambda x: widget.place(x=x, y=0, relheight=1))
 
 
     def updateNavHighlight(self):
@@ -1827,9 +3178,10 @@ class HealthyHabitsApp:
             )
 
     def showPage(self, page):
-        """Switch between pages based on navigation."""
-        for widget in self.contentFrame.winfo_children():
-            widget.destroy()
+        """Switch between pages based on navigation (each page method times its own render)."""
+        with timing("nav.teardown"):
+            for widget in self.contentFrame.winfo_children():
+                widget.destroy()
         page_methods = {
             "home": self.showHome, "workouts": self.showWorkouts,
             "macros": self.showMacros, "feed": self.showFeed, "settings": self.showSettings
@@ -1837,9 +3189,8 @@ class HealthyHabitsApp:
         method = page_methods.get(page)
         if method:
             method()
-            # Bind close sidebar event to all widgets on the page
-            self.root.after(100, lambda: self.bind_close_sidebar_to_children(self.contentFrame))
 
+    @timed("page.showSettings")
     def showSettings(self):
         """Display settings page with dark/light mode and password change."""
         cf = self.contentFrame
@@ -1886,6 +3237,7 @@ class HealthyHabitsApp:
         # Logout button
         ctk.CTkButton(cf, text="Logout", width=280, fg_color=COLOR_SECONDARY_BLUE, text_color=COLOR_BTN_TXT, corner_radius=8, command=self.logout).pack(padx=48, pady=(10, 30))
 
+    @timed("page.showHome")
     def showHome(self):
         """
         Display home page with streaks/badges, progress bar, calorie widget, and workout logging.
@@ -1940,11 +3292,12 @@ class HealthyHabitsApp:
         content_frame.grid_columnconfigure(1, weight=1)
 
         # Circular progress bar (drawn with Canvas)
-        calGoal = user.getCalorieGoal()
-        calConsumed = user.getCaloriesConsumed()
-        calBurned = user.getCaloriesBurned()
-        calNet = calConsumed - calBurned
-        calRem = calGoal - calNet
+        calSummary = user.getCalorieSummary()
+        calGoal = calSummary["goal"]
+        calConsumed = calSummary["consumed"]
+        calBurned = calSummary["burned"]
+        calNet = calSummary["net"]
+        calRem = calSummary["remaining"]
 
         percent = min(max(calNet / calGoal, 0), 1) if calGoal and calNet >= 0 else 0
         if calNet < 0: # If burned more than consumed, represent as progress towards next goal or distinct color
@@ -1952,7 +3305,7 @@ class HealthyHabitsApp:
 
         canvas_frame = ctk.CTkFrame(content_frame, fg_color="transparent")
         canvas_frame.grid(row=0, column=0, padx=(0, 5), pady=0, sticky="nsew")
-        canvas = Canvas(canvas_frame, width=120, height=120, bg=COLOR_WIDGET_BG, highlightthickness=0)
+        canvas = THEME.subscribe(Canvas(canvas_frame, width=120, height=120, bg=COLOR_WIDGET_BG, highlightthickness=0), bg=COLOR_WIDGET_BG)
         canvas.pack(expand=True)
 
         # Draw background circle
@@ -1962,7 +3315,7 @@ class HealthyHabitsApp:
             extent = percent * 360
             canvas.create_arc(10, 10, 110, 110, start=90, extent=-extent, style="arc", outline=COLOR_PRIMARY_GREEN, width=10)
         # Calories remaining in center
-        canvas.create_text(60, 50, text=f"{calRem}", font=("Arial", 20, "bold"), fill=COLOR_TEXT)
+        THEME.subscribeItem(canvas, canvas.create_text(60, 50, text=f"{calRem}", font=("Arial", 20, "bold"), fill=COLOR_TEXT), fill=COLOR_TEXT)
         canvas.create_text(60, 75, text="Calories remaining", font=("Arial", 10), fill=COLOR_TEXT_SECONDARY)
 
         # Right side info
@@ -2019,7 +3372,7 @@ class HealthyHabitsApp:
             ctk.CTkLabel(frame, text=title, font=ctk.CTkFont(size=14, weight="bold"), text_color=COLOR_TEXT).pack(pady=(0, 5))
             
             # Canvas for circle
-            canvas = Canvas(frame, width=80, height=80, bg=COLOR_WIDGET_BG, highlightthickness=0)
+            canvas = THEME.subscribe(Canvas(frame, width=80, height=80, bg=COLOR_WIDGET_BG, highlightthickness=0), bg=COLOR_WIDGET_BG)
             canvas.pack()
             
             # Calculate percentage
@@ -2034,7 +3387,7 @@ class HealthyHabitsApp:
                 canvas.create_arc(10, 10, 70, 70, start=90, extent=-extent, style="arc", outline=color, width=6)
             
             # Center text
-            canvas.create_text(40, 35, text=f"{current:.1f}g", font=("Arial", 12, "bold"), fill=COLOR_TEXT)
+            THEME.subscribeItem(canvas, canvas.create_text(40, 35, text=f"{current:.1f}g", font=("Arial", 12, "bold"), fill=COLOR_TEXT), fill=COLOR_TEXT)
             canvas.create_text(40, 50, text=f"/{goal:.1f}g", font=("Arial", 8), fill=COLOR_TEXT_SECONDARY)
             
             return canvas, frame
@@ -2093,7 +3446,9 @@ class HealthyHabitsApp:
                 messagebox.showwarning("Set Goal", "Enter a number between 1 and 14.")
         ctk.CTkButton(goalRow, text="Set Goal", width=80, fg_color=COLOR_SECONDARY_BLUE, text_color=COLOR_BTN_TXT, corner_radius=8, command=set_goal).pack(side="left")
 
-        ctk.CTkLabel(workout_widget, text=f"Completed: {user.getWorkoutsCompleted()} / {user.getWeeklyGoal()}", text_color=COLOR_TEXT, font=ctk.CTkFont(size=15)).pack(pady=(10, 5))
+        streak = user.getWorkoutStreak()
+        streak_text = f"  ·  🔥 {streak} week streak" if streak else ""
+        ctk.CTkLabel(workout_widget, text=f"Completed: {user.getWorkoutsCompleted()} / {user.getWeeklyGoal()}{streak_text}", text_color=COLOR_TEXT, font=ctk.CTkFont(size=15)).pack(pady=(10, 5))
         
         # Show last completed workout if available
         last_workout = user.getLastWorkoutCompletion()
@@ -2127,7 +3482,7 @@ class HealthyHabitsApp:
             user.addWorkoutCompleted(workout_name=workout_name)
             if user.getWorkoutsCompleted() > user.getWeeklyGoal():
                 user.setWeeklyGoal(user.getWorkoutsCompleted()) # Auto-adjust goal if exceeded
-            saveUser(user)
+                saveUser(user)
             messagebox.showinfo("Workout Logged", f"Logged: {workout_name}")
             self.showHome()
         ctk.CTkButton(logRow, text="Log Workout", width=120, fg_color=COLOR_PRIMARY_GREEN, text_color=COLOR_BTN_TXT, corner_radius=8, command=log_workout).pack(side="left")
@@ -2206,7 +3561,7 @@ class HealthyHabitsApp:
         weight_history = user.getWeightHistory()
         if len(weight_history) >= 2:
             # Create a simple line graph using Canvas
-            graph_canvas = Canvas(graph_frame, width=280, height=60, bg=COLOR_WIDGET_BG, highlightthickness=0)
+            graph_canvas = THEME.subscribe(Canvas(graph_frame, width=280, height=60, bg=COLOR_WIDGET_BG, highlightthickness=0), bg=COLOR_WIDGET_BG)
             graph_canvas.pack()
             
             # Get last 8 weeks of data for display
@@ -2255,11 +3610,7 @@ class HealthyHabitsApp:
         weight_entry.grid(row=0, column=0, padx=(0, 5), sticky="ew")
         
         # Date picker for weight logging
-        if CALENDAR_AVAILABLE:
-            weight_date_picker = DateEntry(weight_log_frame, width=10, background='darkblue',
-                                        foreground='white', borderwidth=2, date_pattern='yyyy-mm-dd')
-        else:
-            weight_date_picker = DateEntry(weight_log_frame)
+        weight_date_picker = createDatePicker(weight_log_frame)
         weight_date_picker.grid(row=0, column=1, padx=(5, 0), sticky="ew")
         
         def log_weight():
@@ -2270,8 +3621,9 @@ class HealthyHabitsApp:
                     return
                 
                 weight = float(weight_str)
-                if weight < 20 or weight > 300:
-                    messagebox.showwarning("Input Error", "Weight must be between 20 and 300 kg")
+                valid, message = validateInput("weight", weight)
+                if not valid:
+                    messagebox.showwarning("Input Error", message)
                     return
                 
                 # Get selected date
@@ -2332,7 +3684,7 @@ class HealthyHabitsApp:
                 icon_label = ctk.CTkLabel(weather_card, image=icon_image, text="")
                 icon_label.grid(row=0, column=0, rowspan=3, padx=20, pady=15, sticky="e")
             except Exception as e:
-                logError(f"Could not load weather icon: {e}")
+                logError("Could not load weather icon", level=logging.WARNING, error=str(e))
                 # Fallback text if icon fails to load
                 ctk.CTkLabel(weather_card, text="Icon", font=ctk.CTkFont(size=18)).grid(row=0, column=0, rowspan=3, padx=20, pady=15, sticky="e")
 
@@ -2350,6 +3702,7 @@ class HealthyHabitsApp:
             
             ctk.CTkLabel(weather_card, text="🌤️ Live Weather", font=ctk.CTkFont(size=18, weight="bold"), text_color=COLOR_PRIMARY).pack(pady=(15, 5))
             ctk.CTkLabel(weather_card, text=error_message, font=ctk.CTkFont(size=14), text_color=COLOR_TEXT_SECONDARY, wraplength=350).pack(pady=10, padx=20)
+    @timed("page.showWorkouts")
     def showWorkouts(self):
         """Displays the main workout page with weight tracking and the planner widget."""
         cf = self.contentFrame
@@ -2507,7 +3860,7 @@ class HealthyHabitsApp:
         weight_history = user.getWeightHistory()
         if len(weight_history) >= 2:
             # Create detailed graph
-            graph_canvas = Canvas(graph_section, width=500, height=200, bg=COLOR_WIDGET_BG, highlightthickness=1, highlightcolor=COLOR_MEDIUM_GREY)
+            graph_canvas = THEME.subscribe(Canvas(graph_section, width=500, height=200, bg=COLOR_WIDGET_BG, highlightthickness=1, highlightcolor=COLOR_MEDIUM_GREY), bg=COLOR_WIDGET_BG)
             graph_canvas.pack(pady=10)
             
             # Sort and get recent data (last 12 weeks = 84 days)
@@ -2618,11 +3971,7 @@ class HealthyHabitsApp:
         date_input_frame.grid(row=0, column=1, padx=5, sticky="ew")
         ctk.CTkLabel(date_input_frame, text="Date", font=ctk.CTkFont(size=12, weight="bold")).pack()
         
-        if CALENDAR_AVAILABLE:
-            workout_date_picker = DateEntry(date_input_frame, width=10, background='darkblue',
-                                          foreground='white', borderwidth=2, date_pattern='yyyy-mm-dd')
-        else:
-            workout_date_picker = DateEntry(date_input_frame)
+        workout_date_picker = createDatePicker(date_input_frame)
         workout_date_picker.pack(fill="x", pady=2)
         
         # Log button
@@ -2638,8 +3987,9 @@ class HealthyHabitsApp:
                     return
                 
                 weight = float(weight_str)
-                if weight < 20 or weight > 300:
-                    messagebox.showwarning("Input Error", "Weight must be between 20 and 300 kg")
+                valid, message = validateInput("weight", weight)
+                if not valid:
+                    messagebox.showwarning("Input Error", message)
                     return
                 
                 # Get selected date
@@ -2687,51 +4037,18 @@ class HealthyHabitsApp:
         self._drawPlannerHome(planner_display_frame)
 
     def getUserWorkoutPlans(self):
-        """Gets all workout plans for the current user."""
-        all_plans = readCsv(WORKOUT_PLANS_CSV)
-        user_plans = []
-        for plan in all_plans:
-            if plan.get('user_id') == self.currentUser.getStudentId():
-                try:
-                    plan['exercises'] = json.loads(plan['exercises'])
-                    user_plans.append(plan)
-                except json.JSONDecodeError:
-                    logError(f"Could not parse exercises for plan: {plan.get('plan_name')}")
-        return user_plans
+        """Gets all workout plans for the current user (from the per-user plan store)."""
+        return self.workoutPlans.plans(self.currentUser.getStudentId())
 
     def saveWorkoutPlan(self, plan_data):
         """Saves a new or updated workout plan for the user."""
-        all_plans = readCsv(WORKOUT_PLANS_CSV)
-        
-        plan_to_save = {
-            "user_id": self.currentUser.getStudentId(),
-            "plan_name": plan_data['plan_name'],
-            "exercises": json.dumps(plan_data['exercises'])
-        }
-
-        plan_exists = False
-        for i, existing_plan in enumerate(all_plans):
-            if existing_plan.get('user_id') == plan_to_save['user_id'] and existing_plan.get('plan_name') == plan_to_save['plan_name']:
-                all_plans[i] = plan_to_save
-                plan_exists = True
-                break
-        
-        if not plan_exists:
-            all_plans.append(plan_to_save)
+        self.workoutPlans.upsert(self.currentUser.getStudentId(), plan_data['plan_name'], plan_data['exercises'])
 
-        writeCsv(WORKOUT_PLANS_CSV, all_plans, ["user_id", "plan_name", "exercises"])
     def deleteWorkoutPlan(self, plan_name):
         """Deletes a workout plan for the current user."""
-        all_plans = readCsv(WORKOUT_PLANS_CSV)
-        
-        # Create a new list excluding the plan to be deleted
-        updated_plans = [
-            p for p in all_plans 
-            if not (p.get('user_id') == self.currentUser.getStudentId() and p.get('plan_name') == plan_name)
-        ]
-        
-        # Save the updated list back to the CSV
-        writeCsv(WORKOUT_PLANS_CSV, updated_plans, ["user_id", "plan_name", "exercises"])
+        self.workoutPlans.delete(self.currentUser.getStudentId(), plan_name)
+
+    @timed("page.showMacros")
     def showMacros(self):
         """
         Display comprehensive macro and meal planning page.
@@ -2808,6 +4125,40 @@ class HealthyHabitsApp:
         fat_bar.set(macro_progress["fat"] / 100)
         ctk.CTkLabel(fat_frame, text=f"{macro_consumed['fat']:.1f}/{macro_goals['fat']:.1f}g", font=ctk.CTkFont(size=12)).pack()
         
+        # --- 12-Month Trend Card (served from the monthly rollups, no raw entries read) ---
+        trend_card = ctk.CTkFrame(main_container, fg_color=COLOR_WIDGET_BG, corner_radius=12, border_width=1, border_color=COLOR_MEDIUM_GREY)
+        trend_card.pack(fill="x", pady=(0, 8), padx=2)
+        ctk.CTkLabel(trend_card, text="Last 12 Months", font=ctk.CTkFont(size=20, weight="bold"), text_color=COLOR_PRIMARY).pack(pady=(10, 5))
+        months = self.nutritionLog.recent_months(user.getStudentId())
+        trend_canvas = THEME.subscribe(Canvas(trend_card, width=560, height=170, bg=COLOR_WIDGET_BG, highlightthickness=0), bg=COLOR_WIDGET_BG)
+        trend_canvas.pack(pady=(0, 5))
+        chart_left, chart_right, chart_top, chart_bottom = 40, 540, 15, 135
+        calorie_goal = macro_goals["calories"] or 1
+        chart_max = max([calorie_goal * 1.2] + [m["mean"]["calories"] for m in months])
+        slot_width = (chart_right - chart_left) / len(months)
+        trend_canvas.create_line(chart_left, chart_bottom, chart_right, chart_bottom, fill=COLOR_MEDIUM_GREY, width=2)
+        goal_y = chart_bottom - calorie_goal / chart_max * (chart_bottom - chart_top)
+        trend_canvas.create_line(chart_left, goal_y, chart_right, goal_y, fill=COLOR_PRIMARY, width=1, dash=(5, 5))
+        trend_canvas.create_text(chart_left - 4, goal_y, text=f"{calorie_goal:.0f}", font=("Arial", 8), fill=COLOR_PRIMARY, anchor="e")
+        for i, month in enumerate(months):
+            x0 = chart_left + i * slot_width + 6
+            x1 = x0 + slot_width - 12
+            mean_calories = month["mean"]["calories"]
+            if mean_calories:
+                y = chart_bottom - mean_calories / chart_max * (chart_bottom - chart_top)
+                on_target = month["adherence"]["calories"] >= 0.5
+                trend_canvas.create_rectangle(x0, y, x1, chart_bottom, fill=COLOR_PRIMARY_GREEN if on_target else "#FFA94D", outline="")
+            label = datetime.strptime(month["period"], "%Y-%m").strftime("%b")
+            trend_canvas.create_text((x0 + x1) / 2, chart_bottom + 12, text=label, font=("Arial", 8), fill=COLOR_TEXT_SECONDARY)
+        logged_months = [m for m in months if m["days"]]
+        if logged_months:
+            latest = logged_months[-1]
+            trend_text = (f"Mean daily intake ({latest['period']}): {latest['mean']['calories']:.0f} kcal · "
+                          f"on calorie target {latest['adherence']['calories']:.0%} of {latest['days']} logged days")
+        else:
+            trend_text = "Log foods to see monthly averages and goal adherence here."
+        ctk.CTkLabel(trend_card, text=trend_text, text_color=COLOR_TEXT_SECONDARY, font=ctk.CTkFont(size=12)).pack(pady=(0, 10))
+        
         # --- Customize Macro Goals Card ---
         customize_card = ctk.CTkFrame(main_container, fg_color=COLOR_WIDGET_BG, corner_radius=12, border_width=1, border_color=COLOR_MEDIUM_GREY)
         customize_card.pack(fill="x", pady=(0, 8), padx=2)
@@ -2908,6 +4259,46 @@ class HealthyHabitsApp:
         food_entry = ctk.CTkEntry(food_frame, placeholder_text="e.g., Chicken Breast")
         food_entry.pack(fill="x", pady=2)
         
+        # Autocomplete from the food index; picking a suggestion fills in the per-100g values
+        suggestion_box = ctk.CTkFrame(food_frame, fg_color="transparent")
+        pending_lookup = [None]
+        
+        def apply_suggestion(food):
+            calories, protein, carbs, fat = food.get_nutrition_vector(100)
+            for entry, value in ((food_entry, food.get_name()), (cal_entry, f"{calories:g}"), (protein_entry, f"{protein:g}"),
+                                 (carbs_entry, f"{carbs:g}"), (fat_entry, f"{fat:g}"), (serving_entry, "100")):
+                entry.delete(0, ctk.END)
+                entry.insert(0, value)
+            suggestion_box.pack_forget()
+        
+        def show_suggestions():
+            pending_lookup[0] = None
+            if not suggestion_box.winfo_exists():
+                return
+            for widget in suggestion_box.winfo_children():
+                widget.destroy()
+            text = food_entry.get().strip()
+            index = getFoodIndex(block=False)  # Still building in the background: no suggestions yet
+            matches = index.search(text, 5) if index is not None and len(text) >= 2 else []
+            if not matches:
+                suggestion_box.pack_forget()
+                return
+            for food in matches:
+                ctk.CTkButton(suggestion_box, text=food.get_name(), anchor="w", height=22, fg_color=COLOR_LIGHT_GREY,
+                              text_color=COLOR_TEXT, hover_color=COLOR_MEDIUM_GREY, font=ctk.CTkFont(size=11),
+                              command=lambda f=food: apply_suggestion(f)).pack(fill="x", pady=1)
+            suggestion_box.pack(fill="x")
+        
+        def on_food_key(event):
+            # Debounce so fast typing triggers one lookup
+            if pending_lookup[0] is not None:
+                self.root.after_cancel(pending_lookup[0])
+            pending_lookup[0] = self.root.after(120, show_suggestions)
+        
+        food_entry.bind("<KeyRelease>", on_food_key, add="+")
+        if _FOOD_INDEX is None:
+            self.runInBackground(getFoodIndex)  # The built-in catalog index takes a moment to build
+        
         # Calories entry
         cal_frame = ctk.CTkFrame(log_form_frame, fg_color="transparent")
         cal_frame.grid(row=0, column=1, padx=5, sticky="ew")
@@ -2947,11 +4338,7 @@ class HealthyHabitsApp:
         meal_date_frame.grid(row=1, column=2, padx=5, pady=(5, 0), sticky="ew")
         ctk.CTkLabel(meal_date_frame, text="Date", font=ctk.CTkFont(size=12, weight="bold")).pack(anchor="w")
         
-        if CALENDAR_AVAILABLE:
-            meal_date_picker = DateEntry(meal_date_frame, width=10, background='darkblue',
-                                        foreground='white', borderwidth=2, date_pattern='yyyy-mm-dd')
-        else:
-            meal_date_picker = DateEntry(meal_date_frame)
+        meal_date_picker = createDatePicker(meal_date_frame)
         meal_date_picker.pack(fill="x", pady=2)
         
         # Log button
@@ -2985,12 +4372,10 @@ class HealthyHabitsApp:
                 serving = float(entries['serving']) if entries['serving'] else 100
                 
                 # Range validation
-                if calories < 0 or calories > 5000:
-                    raise ValueError("Calories must be between 0 and 5000")
-                if any(val < 0 or val > 1000 for val in [protein, carbs, fat]):
-                    raise ValueError("Macro values must be between 0 and 1000g")
-                if serving <= 0 or serving > 2000:
-                    raise ValueError("Serving size must be between 1 and 2000g")
+                for inputType, value in [("calories", calories), ("macro", protein), ("macro", carbs), ("macro", fat), ("serving", serving)]:
+                    valid, message = validateInput(inputType, value)
+                    if not valid:
+                        raise ValueError(message)
                     
             except ValueError as e:
                 messagebox.showwarning("Input Error", f"Invalid input: {str(e)}")
@@ -3008,9 +4393,9 @@ class HealthyHabitsApp:
             selected_date = meal_date_picker.get_date()
             log_date = selected_date.strftime("%Y-%m-%d")
             
-            # Add to user's daily totals
-            user.addMacros(calories, protein, carbs, fat)
-            saveUser(user)
+            # The log is the only record of what was eaten; today's totals are read back from it
+            self.nutritionLog.log_entry(user.getStudentId(), log_date, food_name, serving, calories, protein, carbs, fat,
+                                       goals=user.getMacroGoals())
             
             # Clear all entries
             for entry in [food_entry, cal_entry, protein_entry, carbs_entry, fat_entry, serving_entry]:
@@ -3038,6 +4423,9 @@ class HealthyHabitsApp:
         quick_foods_frame.grid_columnconfigure(1, weight=1)
         quick_foods_frame.grid_columnconfigure(2, weight=1)
         quick_foods_frame.grid_columnconfigure(3, weight=1)
+        ctk.CTkButton(suggestions_frame, text="📥 Import from another tracker (CSV)...", height=28, fg_color="transparent",
+                      border_width=1, border_color=COLOR_MEDIUM_GREY, text_color=COLOR_TEXT, font=ctk.CTkFont(size=11),
+                      command=self.showImportDialog).pack(side="bottom", fill="x", pady=(8, 0))
         
         # Common foods with their macro profiles
         common_foods = [
@@ -3048,8 +4436,8 @@ class HealthyHabitsApp:
         ]
         
         def quick_add_food(name, calories, protein, carbs, fat):
-            user.addMacros(calories, protein, carbs, fat)
-            saveUser(user)
+            self.nutritionLog.log_entry(user.getStudentId(), date.today().isoformat(), name, None, calories, protein, carbs, fat,
+                                       goals=user.getMacroGoals())
             messagebox.showinfo("Quick Added", f"Added {name} to your log!")
             self.showMacros()
         
@@ -3078,7 +4466,7 @@ class HealthyHabitsApp:
         diet_frame = ctk.CTkFrame(preferences_frame, fg_color="transparent")
         diet_frame.grid(row=0, column=0, padx=5, pady=5, sticky="ew")
         ctk.CTkLabel(diet_frame, text="Diet Type", font=ctk.CTkFont(size=12, weight="bold")).pack(anchor="w")
-        diet_options = ["Balanced", "High Protein", "Low Carb", "Vegetarian", "Vegan", "Mediterranean", "Keto"]
+        diet_options = list(DIET_TYPES)
         diet_dropdown = ctk.CTkComboBox(diet_frame, values=diet_options, state="readonly")
         diet_dropdown.set("Balanced")
         diet_dropdown.pack(fill="x", pady=2)
@@ -3103,6 +4491,12 @@ class HealthyHabitsApp:
         generate_frame = ctk.CTkFrame(meal_plan_card, fg_color="transparent")
         generate_frame.pack(fill="x", padx=10, pady=(5, 15))
         
+        meal_plan_seed = [0]  # Advanced by "Regenerate" for a different plan with the same inputs
+        
+        def regenerate_meal_plan():
+            meal_plan_seed[0] += 1
+            generate_meal_plan()
+        
         def generate_meal_plan():
             """Generate an AI-style meal plan based on user preferences and goals"""
             diet_type = diet_dropdown.get()
@@ -3115,7 +4509,10 @@ class HealthyHabitsApp:
                 widget.destroy()
             
             # Generate meal plan based on preferences
-            meal_plan = self._generateSmartMealPlan(diet_type, meal_count, restrictions, goals)
+            meal_plan = self._generateSmartMealPlan(diet_type, meal_count, restrictions, goals, meal_plan_seed[0])
+            stats = self.mealPlanCache.stats()
+            cache_label.configure(text=f"Plan cache: {stats['hits']} of {stats['hits'] + stats['misses']} requests served "
+                                       f"instantly ({stats['hit_rate']:.0%} hit rate)")
             
             # Display the generated meal plan
             ctk.CTkLabel(meal_plan_display, text=f"🍽️ Your {diet_type} Meal Plan ({meal_count} meals/day)", 
@@ -3174,9 +4571,16 @@ class HealthyHabitsApp:
             ctk.CTkLabel(totals_info, text=f"Fat\n{daily_totals['fat']:.1f}g", 
                         font=ctk.CTkFont(size=11, weight="bold"), text_color=COLOR_BTN_TXT).grid(row=0, column=3)
         
+        generate_frame.grid_columnconfigure(0, weight=3)
+        generate_frame.grid_columnconfigure(1, weight=1)
         ctk.CTkButton(generate_frame, text="🤖 Generate Personalized Meal Plan", fg_color=COLOR_PRIMARY, 
                      text_color=COLOR_BTN_TXT, corner_radius=8, height=35, 
-                     font=ctk.CTkFont(size=14, weight="bold"), command=generate_meal_plan).pack(fill="x")
+                     font=ctk.CTkFont(size=14, weight="bold"), command=generate_meal_plan).grid(row=0, column=0, padx=(0, 5), sticky="ew")
+        ctk.CTkButton(generate_frame, text="🔄 Regenerate", fg_color=COLOR_SECONDARY_BLUE, 
+                     text_color=COLOR_BTN_TXT, corner_radius=8, height=35, 
+                     font=ctk.CTkFont(size=14, weight="bold"), command=regenerate_meal_plan).grid(row=0, column=1, sticky="ew")
+        cache_label = ctk.CTkLabel(generate_frame, text="", text_color=COLOR_TEXT_SECONDARY, font=ctk.CTkFont(size=10))
+        cache_label.grid(row=1, column=0, columnspan=2, sticky="w", pady=(2, 0))
         
         # Scrollable meal plan display area
         meal_plan_display = ctk.CTkScrollableFrame(meal_plan_card, height=300, fg_color="transparent")
@@ -3186,197 +4590,85 @@ class HealthyHabitsApp:
         ctk.CTkLabel(meal_plan_display, text="👆 Click 'Generate Personalized Meal Plan' to get started!", 
                     text_color=COLOR_TEXT_SECONDARY, font=ctk.CTkFont(size=12)).pack(pady=20)
 
-    def _generateSmartMealPlan(self, diet_type, meal_count, restrictions, goals):
+    def showImportDialog(self):
         """
-        Generate an intelligent meal plan based on user preferences and macro goals.
-        Uses a comprehensive food database with realistic nutritional profiles.
-        """
-        # Comprehensive food database organized by categories and diet types
-        food_database = {
-            "proteins": {
-                "balanced": [
-                    {"food": "Grilled Chicken Breast (150g)", "calories": 248, "protein": 46.5, "carbs": 0, "fat": 5.4},
-                    {"food": "Salmon Fillet (120g)", "calories": 242, "protein": 33.6, "carbs": 0, "fat": 11.0},
-                    {"food": "Lean Ground Turkey (100g)", "calories": 189, "protein": 29.1, "carbs": 0, "fat": 7.4},
-                    {"food": "Eggs (2 large)", "calories": 310, "protein": 26, "carbs": 2.2, "fat": 22},
-                    {"food": "Greek Yogurt (200g)", "calories": 130, "protein": 20, "carbs": 9, "fat": 0.4},
-                    {"food": "Cottage Cheese (150g)", "calories": 124, "protein": 17.3, "carbs": 5.4, "fat": 2.3}
-                ],
-                "high_protein": [
-                    {"food": "Protein Powder + Water (1 scoop)", "calories": 120, "protein": 25, "carbs": 3, "fat": 1},
-                    {"food": "Chicken Breast (200g)", "calories": 330, "protein": 62, "carbs": 0, "fat": 7.2},
-                    {"food": "Lean Beef (150g)", "calories": 312, "protein": 48.8, "carbs": 0, "fat": 11.7},
-                    {"food": "Tuna (1 can, 150g)", "calories": 179, "protein": 39.3, "carbs": 0, "fat": 1.3},
-                    {"food": "Egg Whites (6 whites)", "calories": 102, "protein": 21.2, "carbs": 1.4, "fat": 0.3}
-                ],
-                "vegetarian": [
-                    {"food": "Tofu (150g)", "calories": 181, "protein": 19.9, "carbs": 4.3, "fat": 11},
-                    {"food": "Lentils (1 cup cooked)", "calories": 230, "protein": 18, "carbs": 40, "fat": 0.8},
-                    {"food": "Black Beans (1 cup)", "calories": 227, "protein": 15.2, "carbs": 40.8, "fat": 0.9},
-                    {"food": "Greek Yogurt (200g)", "calories": 130, "protein": 20, "carbs": 9, "fat": 0.4},
-                    {"food": "Quinoa (1 cup cooked)", "calories": 222, "protein": 8.1, "carbs": 39.4, "fat": 3.6}
-                ],
-                "vegan": [
-                    {"food": "Tempeh (100g)", "calories": 192, "protein": 20.3, "carbs": 7.6, "fat": 10.8},
-                    {"food": "Chickpeas (1 cup)", "calories": 269, "protein": 14.5, "carbs": 45, "fat": 4.2},
-                    {"food": "Hemp Seeds (3 tbsp)", "calories": 170, "protein": 10, "carbs": 2.5, "fat": 12},
-                    {"food": "Peanut Butter (2 tbsp)", "calories": 188, "protein": 8, "carbs": 8, "fat": 16},
-                    {"food": "Almond Butter (2 tbsp)", "calories": 196, "protein": 7.2, "carbs": 7.5, "fat": 18.3}
-                ]
-            },
-            "carbs": {
-                "balanced": [
-                    {"food": "Brown Rice (1 cup cooked)", "calories": 216, "protein": 5, "carbs": 45, "fat": 1.8},
-                    {"food": "Sweet Potato (medium, 200g)", "calories": 180, "protein": 4, "carbs": 41.4, "fat": 0.3},
-                    {"food": "Oatmeal (1 cup cooked)", "calories": 154, "protein": 5.4, "carbs": 28, "fat": 3.2},
-                    {"food": "Whole Wheat Bread (2 slices)", "calories": 138, "protein": 7.4, "carbs": 23, "fat": 2.5},
-                    {"food": "Banana (medium)", "calories": 105, "protein": 1.3, "carbs": 27, "fat": 0.4}
-                ],
-                "low_carb": [
-                    {"food": "Cauliflower Rice (1 cup)", "calories": 25, "protein": 2, "carbs": 5, "fat": 0.3},
-                    {"food": "Zucchini Noodles (1 cup)", "calories": 20, "protein": 1.5, "carbs": 4, "fat": 0.4},
-                    {"food": "Shirataki Noodles (1 package)", "calories": 20, "protein": 1, "carbs": 6, "fat": 0},
-                    {"food": "Berries Mix (1/2 cup)", "calories": 42, "protein": 0.6, "carbs": 10.2, "fat": 0.2}
-                ],
-                "keto": [
-                    {"food": "Avocado (1/2 medium)", "calories": 160, "protein": 2, "carbs": 9, "fat": 15},
-                    {"food": "Macadamia Nuts (30g)", "calories": 204, "protein": 2.2, "carbs": 3.9, "fat": 21.5}
-                ]
-            },
-            "vegetables": [
-                {"food": "Broccoli (1 cup)", "calories": 31, "protein": 3, "carbs": 6, "fat": 0.4},
-                {"food": "Spinach (2 cups)", "calories": 14, "protein": 1.8, "carbs": 2.2, "fat": 0.2},
-                {"food": "Bell Peppers (1 cup)", "calories": 30, "protein": 1, "carbs": 7, "fat": 0.3},
-                {"food": "Asparagus (1 cup)", "calories": 27, "protein": 3, "carbs": 5.2, "fat": 0.2},
-                {"food": "Green Beans (1 cup)", "calories": 35, "protein": 2, "carbs": 8, "fat": 0.1},
-                {"food": "Brussels Sprouts (1 cup)", "calories": 38, "protein": 3, "carbs": 8, "fat": 0.3},
-                {"food": "Kale (2 cups)", "calories": 33, "protein": 2.9, "carbs": 6.7, "fat": 0.6}
-            ],
-            "healthy_fats": [
-                {"food": "Olive Oil (1 tbsp)", "calories": 119, "protein": 0, "carbs": 0, "fat": 13.5},
-                {"food": "Avocado (1/2 medium)", "calories": 160, "protein": 2, "carbs": 9, "fat": 15},
-                {"food": "Almonds (30g)", "calories": 173, "protein": 6.4, "carbs": 6.1, "fat": 14.8},
-                {"food": "Walnuts (30g)", "calories": 196, "protein": 4.6, "carbs": 4.1, "fat": 19.6},
-                {"food": "Chia Seeds (2 tbsp)", "calories": 138, "protein": 4.7, "carbs": 12, "fat": 8.7}
-            ]
-        }
-        
-        # Meal templates based on meal count
-        meal_templates = {
-            3: [
-                {"name": "🌅 Breakfast", "protein_ratio": 0.25, "carb_ratio": 0.35, "fat_ratio": 0.30},
-                {"name": "🍽️ Lunch", "protein_ratio": 0.40, "carb_ratio": 0.35, "fat_ratio": 0.35},
-                {"name": "🌙 Dinner", "protein_ratio": 0.35, "carb_ratio": 0.30, "fat_ratio": 0.35}
-            ],
-            4: [
-                {"name": "🌅 Breakfast", "protein_ratio": 0.25, "carb_ratio": 0.35, "fat_ratio": 0.25},
-                {"name": "🍽️ Lunch", "protein_ratio": 0.35, "carb_ratio": 0.35, "fat_ratio": 0.30},
-                {"name": "🥪 Snack", "protein_ratio": 0.15, "carb_ratio": 0.15, "fat_ratio": 0.20},
-                {"name": "🌙 Dinner", "protein_ratio": 0.25, "carb_ratio": 0.15, "fat_ratio": 0.25}
-            ],
-            5: [
-                {"name": "🌅 Breakfast", "protein_ratio": 0.20, "carb_ratio": 0.30, "fat_ratio": 0.25},
-                {"name": "🥪 Mid-Morning", "protein_ratio": 0.15, "carb_ratio": 0.20, "fat_ratio": 0.15},
-                {"name": "🍽️ Lunch", "protein_ratio": 0.30, "carb_ratio": 0.25, "fat_ratio": 0.25},
-                {"name": "🍎 Afternoon", "protein_ratio": 0.15, "carb_ratio": 0.15, "fat_ratio": 0.15},
-                {"name": "🌙 Dinner", "protein_ratio": 0.20, "carb_ratio": 0.10, "fat_ratio": 0.20}
-            ],
-            6: [
-                {"name": "🌅 Breakfast", "protein_ratio": 0.18, "carb_ratio": 0.25, "fat_ratio": 0.20},
-                {"name": "🥪 Mid-Morning", "protein_ratio": 0.12, "carb_ratio": 0.15, "fat_ratio": 0.15},
-                {"name": "🍽️ Lunch", "protein_ratio": 0.25, "carb_ratio": 0.25, "fat_ratio": 0.25},
-                {"name": "🍎 Afternoon", "protein_ratio": 0.15, "carb_ratio": 0.15, "fat_ratio": 0.15},
-                {"name": "🌙 Dinner", "protein_ratio": 0.20, "carb_ratio": 0.15, "fat_ratio": 0.15},
-                {"name": "🌜 Evening", "protein_ratio": 0.10, "carb_ratio": 0.05, "fat_ratio": 0.10}
-            ]
-        }
-        
-        # Filter foods based on diet type and restrictions
-        def filter_foods(food_list, diet_type, restrictions):
-            filtered = []
-            for food in food_list:
-                food_name = food["food"].lower()
-                
-                # Apply restrictions filter
-                if restrictions:
-                    restriction_terms = [term.strip() for term in restrictions.split(',')]
-                    if any(term in food_name for term in restriction_terms):
-                        continue
-                
-                # Diet-specific filtering
-                if diet_type.lower() == "vegan":
-                    if any(term in food_name for term in ["chicken", "beef", "turkey", "salmon", "tuna", "egg", "yogurt", "cheese"]):
-                        continue
-                elif diet_type.lower() == "vegetarian":
-                    if any(term in food_name for term in ["chicken", "beef", "turkey", "salmon", "tuna"]):
-                        continue
-                elif diet_type.lower() == "keto":
-                    if food["carbs"] > 10:  # Strict carb limit for keto
-                        continue
-                
-                filtered.append(food)
-            return filtered
-        
-        # Get appropriate protein sources
-        protein_key = diet_type.lower().replace(" ", "_")
-        if protein_key not in food_database["proteins"]:
-            protein_key = "balanced"
-        
-        proteins = filter_foods(food_database["proteins"][protein_key], diet_type, restrictions)
-        
-        # Get appropriate carb sources
-        carb_key = "low_carb" if diet_type.lower() in ["low carb", "keto"] else "balanced"
-        if diet_type.lower() == "keto":
-            carb_key = "keto"
-        
-        carbs = filter_foods(food_database["carbs"].get(carb_key, food_database["carbs"]["balanced"]), diet_type, restrictions)
-        vegetables = filter_foods(food_database["vegetables"], diet_type, restrictions)
-        fats = filter_foods(food_database["healthy_fats"], diet_type, restrictions)
-        
-        # Generate meal plan
-        meal_plan = []
-        templates = meal_templates[meal_count]
-        
-        for template in templates:
-            meal = {
-                "name": template["name"],
-                "items": []
-            }
-            
-            # Calculate target macros for this meal
-            target_calories = goals["calories"] * (template["protein_ratio"] + template["carb_ratio"] + template["fat_ratio"])
-            target_protein = goals["protein"] * template["protein_ratio"]
-            
-            # Select foods for the meal
-            meal_items = []
-            
-            # Add a protein source
-            if proteins:
-                protein_choice = random.choice(proteins)
-                meal_items.append(protein_choice)
-            
-            # Add carbs (unless keto)
-            if carbs and diet_type.lower() != "keto":
-                carb_choice = random.choice(carbs)
-                meal_items.append(carb_choice)
-            
-            # Add vegetables
-            if vegetables:
-                veg_choice = random.choice(vegetables)
-                meal_items.append(veg_choice)
-            
-            # Add healthy fats if needed
-            current_fat = sum(item["fat"] for item in meal_items)
-            target_fat = goals["fat"] * template["fat_ratio"]
-            
-            if current_fat < target_fat * 0.7 and fats:
-                fat_choice = random.choice(fats)
-                meal_items.append(fat_choice)
-            
-            meal["items"] = meal_items
-            meal_plan.append(meal)
-        
-        return meal_plan
+        Pick a CSV export from another tracker and import it on a worker thread.
+        The progress dialog is modal (so nothing else edits the user's data meanwhile) but
+        the window stays responsive: the worker only publishes numbers, which a root.after
+        poll copies into the widgets.
+        """
+        path = filedialog.askopenfilename(title="Import nutrition / weight CSV", filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        user = self.currentUser
+        dialog = ctk.CTkToplevel(self.root)
+        dialog.title("Importing")
+        dialog.geometry("420x180")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        ctk.CTkLabel(dialog, text=f"Importing {os.path.basename(path)}", font=ctk.CTkFont(size=14, weight="bold")).pack(pady=(15, 5))
+        bar = ctk.CTkProgressBar(dialog, width=360, progress_color=COLOR_PRIMARY_GREEN)
+        bar.pack(pady=5)
+        bar.set(0)
+        status = ctk.CTkLabel(dialog, text="Starting...", text_color=COLOR_TEXT_SECONDARY, font=ctk.CTkFont(size=12))
+        status.pack(pady=5)
+        latest = [None]           # (bytes_done, bytes_total, stats) written by the worker
+        cancel_requested = [False]
+
+        def cancel():
+            # The dialog stays up until the worker stops, so finished always runs on it
+            cancel_requested[0] = True
+            status.configure(text="Cancelling after this batch...")
+
+        ctk.CTkButton(dialog, text="Cancel", width=100, fg_color=COLOR_MEDIUM_GREY, command=cancel).pack(pady=5)
+        dialog.protocol("WM_DELETE_WINDOW", cancel)
+
+        def poll():
+            if not dialog.winfo_exists() or latest[0] is None:
+                if dialog.winfo_exists():
+                    dialog.after(100, poll)
+                return
+            done, total, stats = latest[0]
+            bar.set(done / total if total else 1)
+            status.configure(text=f"{stats['rows']:,} rows read · {stats['foods']:,} foods · {stats['weights']:,} weights · {stats['skipped']:,} skipped")
+            dialog.after(100, poll)
+
+        def work():
+            try:
+                return import_tracker_csv(path, user, self.nutritionLog,
+                                          progress=lambda done, total, stats: latest.__setitem__(0, (done, total, dict(stats))),
+                                          cancel=lambda: cancel_requested[0])
+            except (OSError, ValueError) as e:
+                return {"error": str(e)}
+            except Exception as e:  # finished must run whatever happens, or the modal dialog never closes
+                logError("Import failed", file=path, error=repr(e))
+                return {"error": f"Unexpected error: {e}"}
+
+        def finished(stats):
+            if dialog.winfo_exists():
+                dialog.grab_release()
+                dialog.destroy()
+            if "error" in stats:
+                messagebox.showerror("Import Failed", stats["error"])
+                return
+            summary = (f"{'Import cancelled' if stats['cancelled'] else 'Import complete'}: {stats['rows']:,} rows\n\n"
+                       f"✅ {stats['foods']:,} food entries\n⚖️ {stats['weights']:,} weight entries\n⚠️ {stats['skipped']:,} rows skipped")
+            if stats["errors"]:
+                summary += "\n\n" + "\n".join(stats["errors"][:5])
+            messagebox.showinfo("Import", summary)
+            self.showMacros()
+
+        poll()
+        self.runInBackground(work, finished)
+
+    @timed("plan.generateSmartMealPlan")
+    def _generateSmartMealPlan(self, diet_type, meal_count, restrictions, goals, seed=0):
+        """
+        Generate an intelligent meal plan based on user preferences and macro goals.
+        Each meal is solved against its share of the goals (see generate_smart_meal_plan);
+        the same inputs and seed give the same plan, so repeats come from the plan cache.
+        """
+        return self.mealPlanCache.get_or_generate(diet_type, meal_count, restrictions, goals, seed)
 
     def _addMealToLog(self, meal):
         """Add all items from a meal to the user's nutrition log"""
@@ -3385,15 +4677,15 @@ class HealthyHabitsApp:
         total_carbs = 0
         total_fat = 0
         
+        today = date.today().isoformat()
         for item in meal["items"]:
             total_calories += item["calories"]
             total_protein += item["protein"]
             total_carbs += item["carbs"]
             total_fat += item["fat"]
-        
-        # Add to user's daily totals
-        self.currentUser.addMacros(total_calories, total_protein, total_carbs, total_fat)
-        saveUser(self.currentUser)
+            self.nutritionLog.log_entry(self.currentUser.getStudentId(), today, item["food"], None,
+                                        item["calories"], item["protein"], item["carbs"], item["fat"],
+                                        goals=self.currentUser.getMacroGoals())
         
         # Show confirmation
         messagebox.showinfo("Meal Added", 
@@ -3404,6 +4696,7 @@ class HealthyHabitsApp:
         # Refresh the macros page to show updated progress
         self.showMacros()
 
+    @timed("page.showFeed")
     def showFeed(self):
         """Display social feed page with admin approval and unique likes."""
         cf = self.contentFrame
@@ -3415,6 +4708,12 @@ class HealthyHabitsApp:
 
         ctk.CTkLabel(card, text="Community Feed", font=ctk.CTkFont(size=26, weight="bold"), text_color=COLOR_PRIMARY).pack(pady=(20, 12))
 
+        if not self._postsLoaded:
+            # Posting, liking or deleting now would work on a partial list; _onPostsLoaded re-renders the page
+            self._feedLoadingLabel = ctk.CTkLabel(card, text="Loading posts...", text_color=COLOR_TEXT_SECONDARY, font=ctk.CTkFont(size=14))
+            self._feedLoadingLabel.pack(pady=20)
+            return
+
         # Post creation area
         post_frame = ctk.CTkFrame(card, fg_color=COLOR_LIGHT_GREY, corner_radius=10, border_width=1, border_color=COLOR_MEDIUM_GREY)
         post_frame.pack(pady=8, padx=15, fill="x")
@@ -3552,8 +4851,10 @@ class HealthyHabitsApp:
     def _postUpdate(self, content):
         if not self.currentUser: messagebox.showwarning("Post Error", "You must be logged in."); return
         if not content.strip() or len(content) > 280: messagebox.showwarning("Post Error", "Post cannot be empty and must be under 280 characters."); return
+        # One past the highest ID: len(self.posts) + 1 reuses an ID once any post is deleted
+        next_id = max((int(p["postID"]) for p in self.posts if str(p.get("postID", "")).isdigit()), default=0) + 1
         post = {
-            "postID": str(len(self.posts) + 1), 
+            "postID": str(next_id), 
             "content": content, 
             "likes": "0", 
             "comments": "", 
@@ -3605,41 +4906,132 @@ class HealthyHabitsApp:
         writeCsv(POSTS_CSV, all_posts, ["postID", "content", "likes", "comments", "approved", "authorId", "timestamp", "likedBy"])
 
     def backupData(self):
-        """Create daily backup of CSV files (FR21)."""
-        if not os.path.exists(BACKUP_DIR):
-            os.makedirs(BACKUP_DIR)
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        for file in [USERS_CSV, MACROS_CSV, POSTS_CSV, WORKOUT_PLANS_CSV]:
-            if os.path.exists(file):
-                try:
-                    shutil.copy(file, os.path.join(BACKUP_DIR, f"{os.path.basename(file)}_{timestamp}.bak"))
-                except Exception as e:
-                    logError(f"Backup failed for {file}: {e}")
-                    messagebox.showwarning("Backup Error", f"Failed to back up {file}. Check error_log.txt.")
+        """
+        Snapshot the data files into the deduplicated backup store (FR21).
+        Returns the list of files that could not be backed up. No GUI calls here,
+        so it is safe to run on a background thread (see backupDataInBackground).
+        """
+        return getBackupStore().snapshot()["failed"]
 
+    def backupDataInBackground(self):
+        """Run backupData on a worker thread and report failures on the Tk thread."""
+        def on_done(failed):
+            markStartup("backup finished (background)")
+            for file in failed:
+                messagebox.showwarning("Backup Error", f"Failed to back up {file}. Check error_log.txt.")
+        self.runInBackground(self.backupData, on_done)
 
     def logout(self):
         """Logout and return to login screen."""
-        self.backupData()  # FR21
+        self.backupDataInBackground()  # FR21
+        self.mealPlanCache.save()
         self.currentUser = None
         self.showLoginSplit()
 
-    def close_sidebar_on_click(self, event):
-        """Close sidebar when clicking on content area."""
-        if self.menu_visible:
-            self.toggle_left_menu()
-    
-    def bind_close_sidebar_to_children(self, widget):
-        """Recursively bind the close sidebar event to all child widgets."""
+    def _routeClick(self, event):
+        """
+        Central click router, bound once with bind_all in __init__.
+        Closes the sidebar when a click in the main window lands outside the sidebar
+        and its toggle button. Works for any page without binding each widget, so
+        navigation cost no longer grows with the number of widgets on the page.
+        """
+        if not self.menu_visible or self.navBar is None:
+            return
+        widget = event.widget
+        if isinstance(widget, str):
+            return  # Internal Tk widgets (e.g. dropdown popups) report a path string
         try:
-            widget.bind("<Button-1>", self.close_sidebar_on_click, add=True)
-            for child in widget.winfo_children():
-                self.bind_close_sidebar_to_children(child)
-        except:
-            pass  # Some widgets might not support binding
+            if widget.winfo_toplevel() is not self.root:
+                return  # Clicks inside dialogs should not affect the sidebar
+        except tk.TclError:
+            return
+        path = str(widget)
+        for excluded in (self.navBar, self.toggle_btn):
+            if excluded is None:
+                continue
+            excluded_path = str(excluded)
+            if path == excluded_path or path.startswith(excluded_path + "."):
+                return
+        self.toggle_left_menu()
 
 # --- COMPREHENSIVE MEAL PLANNING SYSTEM (AC6/AC7 REQUIREMENTS) ---
 
+# --- DIETARY AND ALLERGEN TAGS (bitmasks computed once per food) ---
+
+# Ingredient bits, detected from food names
+TAG_MEAT = 1 << 0
+TAG_FISH = 1 << 1
+TAG_EGG = 1 << 2
+TAG_DAIRY = 1 << 3
+TAG_NUTS = 1 << 4
+TAG_GLUTEN = 1 << 5
+TAG_SOY = 1 << 6
+TAG_SESAME = 1 << 7
+# Diet bits, derived from the ingredient bits and carbs
+TAG_VEGETARIAN = 1 << 8
+TAG_VEGAN = 1 << 9
+TAG_KETO = 1 << 10
+
+KETO_CARB_LIMIT = 10  # Strict carb limit (g) per food for keto
+TAG_KEYWORDS = (
+    (TAG_MEAT, ("chicken", "beef", "pork", "turkey", "lamb")),
+    (TAG_FISH, ("fish", "salmon", "tuna")),
+    (TAG_EGG, ("egg",)),
+    (TAG_DAIRY, ("yogurt", "cheese", "milk", "cream", "whey")),
+    (TAG_NUTS, ("almond", "walnut", "macadamia", "peanut", "cashew", "pecan", "hazelnut", "pistachio")),
+    (TAG_GLUTEN, ("wheat", "bread", "oat", "oatmeal", "barley", "rye", "pasta")),
+    (TAG_SOY, ("tofu", "tempeh", "soy", "edamame")),
+    (TAG_SESAME, ("sesame", "tahini")),
+)
+# Keywords match whole words (plural "s"/"es" allowed), so "eggplant" and "veggie" are not eggs
+_TAG_BY_WORD = {keyword: bit for bit, keywords in TAG_KEYWORDS for keyword in keywords}
+_WORD_PATTERN = re.compile(r"[a-z]+")
+# Diet name -> bits a food must have
+DIET_REQUIRED_TAGS = {"vegetarian": TAG_VEGETARIAN, "vegan": TAG_VEGAN, "keto": TAG_KETO}
+# Words accepted in the free-text restrictions box -> bits to exclude
+RESTRICTION_TAGS = {
+    "meat": TAG_MEAT, "fish": TAG_FISH, "seafood": TAG_FISH,
+    "egg": TAG_EGG, "eggs": TAG_EGG,
+    "dairy": TAG_DAIRY, "milk": TAG_DAIRY, "lactose": TAG_DAIRY,
+    "nut": TAG_NUTS, "nuts": TAG_NUTS, "peanut": TAG_NUTS, "peanuts": TAG_NUTS, "tree nuts": TAG_NUTS,
+    "gluten": TAG_GLUTEN, "wheat": TAG_GLUTEN, "coeliac": TAG_GLUTEN, "celiac": TAG_GLUTEN,
+    "soy": TAG_SOY, "soya": TAG_SOY, "sesame": TAG_SESAME,
+}
+
+def tag_food(name, carbs_g):
+    """AC6: Bitmask of ingredient and diet tags for a food, from its name and carbs."""
+    tags = 0
+    for word in _WORD_PATTERN.findall(name.lower()):
+        bit = _TAG_BY_WORD.get(word)
+        if bit is None and word.endswith("s"):
+            bit = _TAG_BY_WORD.get(word[:-1]) or (_TAG_BY_WORD.get(word[:-2]) if word.endswith("es") else None)
+        if bit:
+            tags |= bit
+    if not tags & (TAG_MEAT | TAG_FISH):
+        tags |= TAG_VEGETARIAN
+        if not tags & (TAG_EGG | TAG_DAIRY):
+            tags |= TAG_VEGAN
+    if carbs_g <= KETO_CARB_LIMIT:
+        tags |= TAG_KETO
+    return tags
+
+RestrictionQuery = namedtuple("RestrictionQuery", ["excluded_tags", "name_terms"])
+
+@functools.lru_cache(maxsize=256)
+def compile_restrictions(restrictions):
+    """
+    Parse the comma-separated restrictions text once into a RestrictionQuery: known
+    allergen words become excluded tag bits, anything else is kept as a name term.
+    """
+    excluded, terms = 0, []
+    for term in (restrictions or "").lower().split(","):
+        term = term.strip()
+        if term in RESTRICTION_TAGS:
+            excluded |= RESTRICTION_TAGS[term]
+        elif term:
+            terms.append(term)
+    return RestrictionQuery(excluded, tuple(terms))
+
 class FoodItem:
     """
     AC6: OOP class demonstrating encapsulation, abstraction, data types
@@ -3652,12 +5044,11 @@ class FoodItem:
         self._carbs_per_100g = float(carbs_per_100g)
         self._fat_per_100g = float(fat_per_100g)
         self._category = category  # AC6: Data types (text - string)
-        self._is_vegetarian = self._determine_vegetarian()  # AC6: Data types (boolean)
-    
-    def _determine_vegetarian(self):
-        """AC6: Private method, control structures (selection)"""
-        meat_keywords = ["chicken", "beef", "pork", "fish", "salmon", "tuna", "turkey", "lamb"]
-        return not any(keyword in self._name.lower() for keyword in meat_keywords)
+        self._tags = tag_food(name, self._carbs_per_100g)  # AC6: Data types (integer bitmask)
+        self._is_vegetarian = bool(self._tags & TAG_VEGETARIAN)  # AC6: Data types (boolean)
+        # AC6: Data structure (tuple) - nutrients per gram, computed once
+        self._per_gram = (self._calories_per_100g / 100.0, self._protein_per_100g / 100.0,
+                          self._carbs_per_100g / 100.0, self._fat_per_100g / 100.0)
     
     def get_nutrition_per_serving(self, serving_size_g):
         """
@@ -3668,31 +5059,1371 @@ class FoodItem:
         if serving_size_g <= 0 or serving_size_g > 1000:
             raise ValueError("Serving size must be between 1-1000g")
         
-        # AC6: Arithmetic operations
-        multiplier = serving_size_g / 100.0
-        return {
-            "calories": round(self._calories_per_100g * multiplier, 1),
-            "protein": round(self._protein_per_100g * multiplier, 1),
-            "carbs": round(self._carbs_per_100g * multiplier, 1),
-            "fat": round(self._fat_per_100g * multiplier, 1)
-        }
+        # AC6: Arithmetic operations on the precomputed per-gram values
+        calories, protein, carbs, fat = (round(value * serving_size_g, 1) for value in self._per_gram)
+        return {"calories": calories, "protein": protein, "carbs": carbs, "fat": fat}
+    
+    def get_nutrition_vector(self, serving_size_g):
+        """Unrounded (calories, protein, carbs, fat) for a serving, for matrix maths."""
+        return tuple(value * serving_size_g for value in self._per_gram)
+    
+    def get_per_gram(self):
+        """(calories, protein, carbs, fat) per gram."""
+        return self._per_gram
     
     # AC6: Getter methods (encapsulation)
     def get_name(self): return self._name
+    def get_calories_per_100g(self): return self._calories_per_100g
     def get_category(self): return self._category
     def is_vegetarian(self): return self._is_vegetarian
+    def get_tags(self): return self._tags
+
+# --- FOOD CATALOG (built once, shared by MealPlan and the smart meal generator) ---
+
+# AC6: Two-dimensional data structure (tuple of records): name, kcal, protein, carbs, fat per 100g, category
+_BASE_FOOD_ROWS = (
+    # Proteins
+    ("Chicken Breast", 165, 31, 0, 3.6, "Protein"),
+    ("Salmon Fillet", 208, 20, 0, 13, "Protein"),
+    ("Eggs", 155, 13, 1.1, 11, "Protein"),
+    ("Greek Yogurt", 100, 10, 3.6, 5, "Protein"),
+    ("Tofu", 76, 8, 1.9, 4.8, "Protein"),
+    ("Lentils", 116, 9, 20, 0.4, "Protein"),
+
+    # Carbohydrates
+    ("Brown Rice", 123, 2.6, 25, 1, "Carbs"),
+    ("Oats", 389, 16.9, 66, 6.9, "Carbs"),
+    ("Sweet Potato", 86, 1.6, 20, 0.1, "Carbs"),
+    ("Quinoa", 368, 14, 64, 6, "Carbs"),
+    ("Whole Wheat Bread", 247, 13, 41, 4.2, "Carbs"),
+
+    # Vegetables
+    ("Broccoli", 34, 2.8, 7, 0.4, "Vegetables"),
+    ("Spinach", 23, 2.9, 3.6, 0.4, "Vegetables"),
+    ("Bell Peppers", 31, 1, 7, 0.3, "Vegetables"),
+    ("Carrots", 41, 0.9, 10, 0.2, "Vegetables"),
+    ("Avocado", 160, 2, 9, 15, "Vegetables"),
+
+    # Fruits
+    ("Banana", 89, 1.1, 23, 0.3, "Fruits"),
+    ("Apple", 52, 0.3, 14, 0.2, "Fruits"),
+    ("Berries", 57, 0.7, 14, 0.3, "Fruits"),
+    ("Orange", 47, 0.9, 12, 0.1, "Fruits"),
+
+    # Fats
+    ("Olive Oil", 884, 0, 0, 100, "Fats"),
+    ("Almonds", 579, 21, 22, 50, "Fats"),
+    ("Walnuts", 654, 15, 14, 65, "Fats"),
+)
+
+# Per-meal share of the daily calorie target and the categories MealPlan draws from
+MEAL_SLOTS = {
+    "breakfast": (0.25, ("Carbs", "Protein", "Fruits")),
+    "lunch": (0.35, ("Protein", "Carbs", "Vegetables")),
+    "dinner": (0.30, ("Protein", "Vegetables", "Carbs")),
+    "snacks": (0.10, ("Fruits", "Fats")),
+}
+
+# Serving-sized foods for the smart meal plan generator, organised by category and diet type
+_SMART_FOOD_ROWS = {
+    "proteins": {
+        "balanced": [
+            {"food": "Grilled Chicken Breast (150g)", "calories": 248, "protein": 46.5, "carbs": 0, "fat": 5.4},
+            {"food": "Salmon Fillet (120g)", "calories": 242, "protein": 33.6, "carbs": 0, "fat": 11.0},
+            {"food": "Lean Ground Turkey (100g)", "calories": 189, "protein": 29.1, "carbs": 0, "fat": 7.4},
+            {"food": "Eggs (2 large)", "calories": 310, "protein": 26, "carbs": 2.2, "fat": 22},
+            {"food": "Greek Yogurt (200g)", "calories": 130, "protein": 20, "carbs": 9, "fat": 0.4},
+            {"food": "Cottage Cheese (150g)", "calories": 124, "protein": 17.3, "carbs": 5.4, "fat": 2.3}
+        ],
+        "high_protein": [
+            {"food": "Protein Powder + Water (1 scoop)", "calories": 120, "protein": 25, "carbs": 3, "fat": 1},
+            {"food": "Chicken Breast (200g)", "calories": 330, "protein": 62, "carbs": 0, "fat": 7.2},
+            {"food": "Lean Beef (150g)", "calories": 312, "protein": 48.8, "carbs": 0, "fat": 11.7},
+            {"food": "Tuna (1 can, 150g)", "calories": 179, "protein": 39.3, "carbs": 0, "fat": 1.3},
+            {"food": "Egg Whites (6 whites)", "calories": 102, "protein": 21.2, "carbs": 1.4, "fat": 0.3}
+        ],
+        "vegetarian": [
+            {"food": "Tofu (150g)", "calories": 181, "protein": 19.9, "carbs": 4.3, "fat": 11},
+            {"food": "Lentils (1 cup cooked)", "calories": 230, "protein": 18, "carbs": 40, "fat": 0.8},
+            {"food": "Black Beans (1 cup)", "calories": 227, "protein": 15.2, "carbs": 40.8, "fat": 0.9},
+            {"food": "Greek Yogurt (200g)", "calories": 130, "protein": 20, "carbs": 9, "fat": 0.4},
+            {"food": "Quinoa (1 cup cooked)", "calories": 222, "protein": 8.1, "carbs": 39.4, "fat": 3.6}
+        ],
+        "vegan": [
+            {"food": "Tempeh (100g)", "calories": 192, "protein": 20.3, "carbs": 7.6, "fat": 10.8},
+            {"food": "Chickpeas (1 cup)", "calories": 269, "protein": 14.5, "carbs": 45, "fat": 4.2},
+            {"food": "Hemp Seeds (3 tbsp)", "calories": 170, "protein": 10, "carbs": 2.5, "fat": 12},
+            {"food": "Peanut Butter (2 tbsp)", "calories": 188, "protein": 8, "carbs": 8, "fat": 16},
+            {"food": "Almond Butter (2 tbsp)", "calories": 196, "protein": 7.2, "carbs": 7.5, "fat": 18.3}
+        ]
+    },
+    "carbs": {
+        "balanced": [
+            {"food": "Brown Rice (1 cup cooked)", "calories": 216, "protein": 5, "carbs": 45, "fat": 1.8},
+            {"food": "Sweet Potato (medium, 200g)", "calories": 180, "protein": 4, "carbs": 41.4, "fat": 0.3},
+            {"food": "Oatmeal (1 cup cooked)", "calories": 154, "protein": 5.4, "carbs": 28, "fat": 3.2},
+            {"food": "Whole Wheat Bread (2 slices)", "calories": 138, "protein": 7.4, "carbs": 23, "fat": 2.5},
+            {"food": "Banana (medium)", "calories": 105, "protein": 1.3, "carbs": 27, "fat": 0.4}
+        ],
+        "low_carb": [
+            {"food": "Cauliflower Rice (1 cup)", "calories": 25, "protein": 2, "carbs": 5, "fat": 0.3},
+            {"food": "Zucchini Noodles (1 cup)", "calories": 20, "protein": 1.5, "carbs": 4, "fat": 0.4},
+            {"food": "Shirataki Noodles (1 package)", "calories": 20, "protein": 1, "carbs": 6, "fat": 0},
+            {"food": "Berries Mix (1/2 cup)", "calories": 42, "protein": 0.6, "carbs": 10.2, "fat": 0.2}
+        ],
+        "keto": [
+            {"food": "Avocado (1/2 medium)", "calories": 160, "protein": 2, "carbs": 9, "fat": 15},
+            {"food": "Macadamia Nuts (30g)", "calories": 204, "protein": 2.2, "carbs": 3.9, "fat": 21.5}
+        ]
+    },
+    "vegetables": [
+        {"food": "Broccoli (1 cup)", "calories": 31, "protein": 3, "carbs": 6, "fat": 0.4},
+        {"food": "Spinach (2 cups)", "calories": 14, "protein": 1.8, "carbs": 2.2, "fat": 0.2},
+        {"food": "Bell Peppers (1 cup)", "calories": 30, "protein": 1, "carbs": 7, "fat": 0.3},
+        {"food": "Asparagus (1 cup)", "calories": 27, "protein": 3, "carbs": 5.2, "fat": 0.2},
+        {"food": "Green Beans (1 cup)", "calories": 35, "protein": 2, "carbs": 8, "fat": 0.1},
+        {"food": "Brussels Sprouts (1 cup)", "calories": 38, "protein": 3, "carbs": 8, "fat": 0.3},
+        {"food": "Kale (2 cups)", "calories": 33, "protein": 2.9, "carbs": 6.7, "fat": 0.6}
+    ],
+    "healthy_fats": [
+        {"food": "Olive Oil (1 tbsp)", "calories": 119, "protein": 0, "carbs": 0, "fat": 13.5},
+        {"food": "Avocado (1/2 medium)", "calories": 160, "protein": 2, "carbs": 9, "fat": 15},
+        {"food": "Almonds (30g)", "calories": 173, "protein": 6.4, "carbs": 6.1, "fat": 14.8},
+        {"food": "Walnuts (30g)", "calories": 196, "protein": 4.6, "carbs": 4.1, "fat": 19.6},
+        {"food": "Chia Seeds (2 tbsp)", "calories": 138, "protein": 4.7, "carbs": 12, "fat": 8.7}
+    ]
+}
+
+# Meal templates based on meal count
+_MEAL_TEMPLATE_ROWS = {
+    3: [
+        {"name": "🌅 Breakfast", "protein_ratio": 0.25, "carb_ratio": 0.35, "fat_ratio": 0.30},
+        {"name": "🍽️ Lunch", "protein_ratio": 0.40, "carb_ratio": 0.35, "fat_ratio": 0.35},
+        {"name": "🌙 Dinner", "protein_ratio": 0.35, "carb_ratio": 0.30, "fat_ratio": 0.35}
+    ],
+    4: [
+        {"name": "🌅 Breakfast", "protein_ratio": 0.25, "carb_ratio": 0.35, "fat_ratio": 0.25},
+        {"name": "🍽️ Lunch", "protein_ratio": 0.35, "carb_ratio": 0.35, "fat_ratio": 0.30},
+        {"name": "🥪 Snack", "protein_ratio": 0.15, "carb_ratio": 0.15, "fat_ratio": 0.20},
+        {"name": "🌙 Dinner", "protein_ratio": 0.25, "carb_ratio": 0.15, "fat_ratio": 0.25}
+    ],
+    5: [
+        {"name": "🌅 Breakfast", "protein_ratio": 0.20, "carb_ratio": 0.30, "fat_ratio": 0.25},
+        {"name": "🥪 Mid-Morning", "protein_ratio": 0.15, "carb_ratio": 0.20, "fat_ratio": 0.15},
+        {"name": "🍽️ Lunch", "protein_ratio": 0.30, "carb_ratio": 0.25, "fat_ratio": 0.25},
+        {"name": "🍎 Afternoon", "protein_ratio": 0.15, "carb_ratio": 0.15, "fat_ratio": 0.15},
+        {"name": "🌙 Dinner", "protein_ratio": 0.20, "carb_ratio": 0.10, "fat_ratio": 0.20}
+    ],
+    6: [
+        {"name": "🌅 Breakfast", "protein_ratio": 0.18, "carb_ratio": 0.25, "fat_ratio": 0.20},
+        {"name": "🥪 Mid-Morning", "protein_ratio": 0.12, "carb_ratio": 0.15, "fat_ratio": 0.15},
+        {"name": "🍽️ Lunch", "protein_ratio": 0.25, "carb_ratio": 0.25, "fat_ratio": 0.25},
+        {"name": "🍎 Afternoon", "protein_ratio": 0.15, "carb_ratio": 0.15, "fat_ratio": 0.15},
+        {"name": "🌙 Dinner", "protein_ratio": 0.20, "carb_ratio": 0.15, "fat_ratio": 0.15},
+        {"name": "🌜 Evening", "protein_ratio": 0.10, "carb_ratio": 0.05, "fat_ratio": 0.10}
+    ]
+}
+
+# Diets offered by the smart generator (filtering rules are DIET_REQUIRED_TAGS)
+DIET_TYPES = ("Balanced", "High Protein", "Low Carb", "Vegetarian", "Vegan", "Mediterranean", "Keto")
+
+def _tag_smart_foods(value):
+    """Copy of the smart food rows with a "tags" bitmask added to every food record."""
+    if isinstance(value, dict):
+        if "food" in value:
+            return dict(value, tags=tag_food(value["food"], value["carbs"]))
+        return {key: _tag_smart_foods(item) for key, item in value.items()}
+    return [_tag_smart_foods(item) for item in value]
+
+def _freeze(value):
+    """Recursively convert dicts to read-only mappings and lists to tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+MEAL_TEMPLATES = _freeze(_MEAL_TEMPLATE_ROWS)
+
+class FoodCatalog:
+    """
+    AC6: Read-only food catalog shared by every meal planner.
+    Built once by getFoodCatalog(); every grouping and diet view is precomputed here
+    so generating a plan only selects from existing tuples and never rebuilds the data.
+    """
+    def __init__(self):
+        self.items = tuple(FoodItem(*row) for row in _BASE_FOOD_ROWS)
+        by_category = {}
+        for food in self.items:
+            by_category.setdefault(food.get_category(), []).append(food)
+        self.by_category = MappingProxyType({category: tuple(foods) for category, foods in by_category.items()})
+
+        # MealPlan pools per (meal type, vegetarian only)
+        slot_pools = {}
+        for meal_type, (_share, categories) in MEAL_SLOTS.items():
+            for vegetarian in (False, True):
+                pool = tuple(food for food in self.items
+                             if food.get_category() in categories and (not vegetarian or food.is_vegetarian()))
+                slot_pools[(meal_type, vegetarian)] = pool if len(pool) >= 2 else self.items  # Fallback
+        self._slot_pools = MappingProxyType(slot_pools)
+
+        # Solver candidates per (meal type, vegetarian): one slot per category, every serving step
+        slot_candidates = {}
+        for (meal_type, vegetarian), pool in slot_pools.items():
+            slots = []
+            for category in MEAL_SLOTS[meal_type][1]:
+                foods = [food for food in pool if food.get_category() == category]
+                slots.append(tuple(
+                    (food.get_name(), tuple(food.get_nutrition_per_serving(grams)[key] for key in MACRO_KEYS), (food, grams))
+                    for food in foods for grams in SERVING_STEPS_G
+                ))
+            slot_candidates[(meal_type, vegetarian)] = tuple(slot for slot in slots if slot)
+        self._slot_candidates = MappingProxyType(slot_candidates)
+
+        self.smart = _freeze(_tag_smart_foods(_SMART_FOOD_ROWS))
+        # Changes whenever a food row does, so cached plans built from older data stop matching
+        self.fingerprint = hashlib.sha256(json.dumps([_BASE_FOOD_ROWS, _SMART_FOOD_ROWS], sort_keys=True)
+                                          .encode("utf-8")).hexdigest()[:16]
+        self._diet_views = MappingProxyType({diet.lower(): self._build_diet_view(diet.lower()) for diet in DIET_TYPES})
+
+    def _build_diet_view(self, diet):
+        """Apply the diet's pool selection and exclusion rules once."""
+        proteins = self.smart["proteins"]
+        carbs = self.smart["carbs"]
+        protein_key = diet.replace(" ", "_")
+        if protein_key not in proteins:
+            protein_key = "balanced"
+        carb_key = "low_carb" if diet in ("low carb", "keto") else "balanced"
+        if diet == "keto":
+            carb_key = "keto"
+        required = DIET_REQUIRED_TAGS.get(diet, 0)
+
+        def allowed(food):
+            return food["tags"] & required == required
+
+        return MappingProxyType({
+            "proteins": tuple(filter(allowed, proteins[protein_key])),
+            "carbs": tuple(filter(allowed, carbs.get(carb_key, carbs["balanced"]))),
+            "vegetables": tuple(filter(allowed, self.smart["vegetables"])),
+            "fats": tuple(filter(allowed, self.smart["healthy_fats"])),
+        })
+
+    def diet_view(self, diet_type):
+        """Precomputed smart-generator pools for a diet (unknown diets behave like Balanced)."""
+        return self._diet_views.get(diet_type.lower(), self._diet_views["balanced"])
+
+    def slot_pool(self, meal_type, vegetarian=False):
+        """Precomputed MealPlan pool for a meal type."""
+        return self._slot_pools[(meal_type, vegetarian)]
+
+    def slot_candidates(self, meal_type, vegetarian=False):
+        """Precomputed solver slots (food, serving) for a MealPlan meal type."""
+        return self._slot_candidates[(meal_type, vegetarian)]
+
+    @staticmethod
+    def apply_restrictions(foods, query):
+        """
+        Drop foods excluded by a compiled RestrictionQuery: one AND per food, plus a name
+        check only for words that are not known allergens. Returns the same tuple when
+        nothing is restricted.
+        """
+        excluded, terms = query
+        if not excluded and not terms:
+            return foods
+        return tuple(food for food in foods if not food["tags"] & excluded
+                     and not (terms and any(term in food["food"].lower() for term in terms)))
+
+_FOOD_CATALOG = None
+
+def getFoodCatalog():
+    """Return the shared FoodCatalog, building it on first use."""
+    global _FOOD_CATALOG
+    if _FOOD_CATALOG is None:
+        _FOOD_CATALOG = FoodCatalog()
+    return _FOOD_CATALOG
+
+# --- FOOD DATABASE FILE (compiled columnar catalog, memory-mapped) ---
+
+FOOD_DB_MAGIC = b"HHFOODDB"
+FOOD_DB_VERSION = 2
+FOOD_DB_HEADER = struct.Struct("<8sIII")  # magic, version, row count, metadata length
+FOOD_DB_NUMERIC_COLUMNS = ("calories", "protein", "carbs", "fat")  # float32, per 100g
+# Search index sections written after the name table, in this order: (name, array typecode)
+FOOD_DB_INDEX_SECTIONS = (
+    ("order", "I"),  # rank -> row id (shortest, then alphabetical, names first)
+    ("rank", "I"),  # row id -> rank
+    ("by_calories", "I"),  # row ids in calorie order
+    ("calorie_keys", "f"),  # calories of by_calories, for bisect
+    ("token_offsets", "I"),  # sorted word table: offsets into token_text (tokens + 1)
+    ("posting_offsets", "I"),  # per word: offsets into postings (tokens + 1)
+    ("postings", "I"),  # per word: ranks of the foods containing it, ascending
+    ("prefix_codes", "I"),  # sorted codes of every word prefix up to FOOD_DB_PREFIX_LEN characters
+    ("prefix_top", "I"),  # per prefix: its best FOOD_INDEX_TOP_K ranks, padded with _NO_RANK
+    ("gram_offsets", "I"),  # per trigram code: offsets into gram_postings (_GRAM_SLOTS + 1)
+    ("gram_postings", "I"),  # per trigram: row ids of the foods containing it, in rank order
+    ("token_text", "B"),  # the sorted words, ASCII, concatenated
+)
+FOOD_DB_PREFIX_LEN = 3  # Prefixes this short match too many words to merge per query, so their top ranks are stored
+# Accepted CSV headers for each field (lower-case), so common nutrient database exports import as-is
+FOOD_DB_CSV_ALIASES = {
+    "name": ("name", "food", "description", "food_name"),
+    "calories": ("calories", "kcal", "energy_kcal", "energy (kcal)"),
+    "protein": ("protein", "protein_g", "protein (g)"),
+    "carbs": ("carbs", "carbohydrate", "carbohydrates", "carbs_g", "carbohydrate (g)"),
+    "fat": ("fat", "total_fat", "fat_g", "fat (g)"),
+    "category": ("category", "food_group", "group"),
+}
+
+def _pad4(length):
+    return (-length) % 4
+
+def compile_food_database(csv_path, output_path=FOOD_DB_FILE):
+    """
+    Compile a nutrient CSV (values per 100g) into the binary columnar food database.
+    Layout after the header: JSON metadata (category names, index section lengths), one
+    float32 block per numeric column, a uint32 category code column, uint32 name offsets
+    (rows + 1), the UTF-8 name table, then the FOOD_DB_INDEX_SECTIONS; everything after
+    the header is padded to 4 bytes. Rows are streamed from the CSV; rows with a missing
+    name or a non-numeric, negative or non-finite value are skipped.
+    Returns (rows written, rows skipped).
+    """
+    columns = {name: array("f") for name in FOOD_DB_NUMERIC_COLUMNS}
+    category_codes = array("I")
+    categories = {}
+    offsets = array("I", [0])
+    names = bytearray()
+    name_list = []
+    skipped = 0
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        headers = {header.strip().lower(): header for header in (reader.fieldnames or [])}
+        source = {}
+        for field, aliases in FOOD_DB_CSV_ALIASES.items():
+            source[field] = next((headers[a] for a in aliases if a in headers), None)
+        missing = [field for field in ("name",) + FOOD_DB_NUMERIC_COLUMNS if source[field] is None]
+        if missing:
+            raise ValueError(f"CSV is missing column(s): {', '.join(missing)}")
+        for row in reader:
+            name = (row.get(source["name"]) or "").strip()
+            try:
+                values = [float(row.get(source[field]) or 0) for field in FOOD_DB_NUMERIC_COLUMNS]
+            except ValueError:
+                skipped += 1
+                continue
+            if not name or not all(math.isfinite(value) and value >= 0 for value in values):
+                skipped += 1
+                continue
+            for field, value in zip(FOOD_DB_NUMERIC_COLUMNS, values):
+                columns[field].append(value)
+            category = (row.get(source["category"]) or "Other").strip() if source["category"] else "Other"
+            category_codes.append(categories.setdefault(category, len(categories)))
+            name_list.append(name)
+            names += name.encode("utf-8")
+            offsets.append(len(names))
+
+    rows = len(category_codes)
+    sections = _compile_food_index(name_list, columns["calories"])
+    meta = json.dumps({"columns": FOOD_DB_NUMERIC_COLUMNS, "categories": list(categories), "prefix_k": FOOD_INDEX_TOP_K,
+                       "sections": {name: len(sections[name]) for name, _ in FOOD_DB_INDEX_SECTIONS}}).encode("utf-8")
+    meta += b" " * _pad4(len(meta))
+    temp_path = output_path + ".tmp"
+    with open(temp_path, "wb") as out:
+        out.write(FOOD_DB_HEADER.pack(FOOD_DB_MAGIC, FOOD_DB_VERSION, rows, len(meta)))
+        out.write(meta)
+        for field in FOOD_DB_NUMERIC_COLUMNS:
+            out.write(columns[field].tobytes())
+        out.write(category_codes.tobytes())
+        out.write(offsets.tobytes())
+        out.write(names + b"\0" * _pad4(len(names)))
+        for name, _ in FOOD_DB_INDEX_SECTIONS:
+            data = bytes(sections[name])
+            out.write(data + b"\0" * _pad4(len(data)))
+    os.replace(temp_path, output_path)
+    return rows, skipped
+
+class FoodDatabaseFile:
+    """
+    Read-only, memory-mapped view of a compiled food database. Opening it reads only the
+    header; columns and index sections are memoryviews over the mapping and FoodItem
+    objects are created per access, so memory use does not grow with the size of the file.
+    Behaves as a sequence of FoodItem.
+    """
+    def __init__(self, path=FOOD_DB_FILE):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is empty")
+        magic, version, rows, meta_len = FOOD_DB_HEADER.unpack_from(self._map, 0)
+        if magic != FOOD_DB_MAGIC or version != FOOD_DB_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {FOOD_DB_VERSION} food database (recompile it with --compile-food-db)")
+        offset = FOOD_DB_HEADER.size
+        meta = json.loads(bytes(self._map[offset:offset + meta_len]))
+        offset += meta_len
+        view = memoryview(self._map)
+        self._rows = rows
+        self.categories = tuple(meta["categories"])
+        self.prefix_k = meta["prefix_k"]
+        self._columns = {}
+        for field in meta["columns"]:
+            self._columns[field] = view[offset:offset + 4 * rows].cast("f")
+            offset += 4 * rows
+        self._category_codes = view[offset:offset + 4 * rows].cast("I")
+        offset += 4 * rows
+        self._offsets = view[offset:offset + 4 * (rows + 1)].cast("I")
+        self._names_start = offset + 4 * (rows + 1)
+        offset = self._names_start + self._offsets[rows]
+        offset += _pad4(offset)
+        self._sections = {}
+        for name, typecode in FOOD_DB_INDEX_SECTIONS:
+            size = meta["sections"][name] * array(typecode).itemsize
+            self._sections[name] = view[offset:offset + size].cast(typecode)
+            offset += size + _pad4(size)
+
+    def __len__(self):
+        return self._rows
+
+    def name(self, index):
+        """Food name for a row, decoded from the string table."""
+        start = self._names_start
+        return self._map[start + self._offsets[index]:start + self._offsets[index + 1]].decode("utf-8")
+
+    def column(self, field):
+        """A numeric column as a float32 memoryview (no copy)."""
+        return self._columns[field]
+
+    def section(self, name):
+        """One of the FOOD_DB_INDEX_SECTIONS as a memoryview (no copy)."""
+        return self._sections[name]
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._rows
+        if not 0 <= index < self._rows:
+            raise IndexError("food index out of range")
+        columns = self._columns
+        return FoodItem(self.name(index), columns["calories"][index], columns["protein"][index],
+                        columns["carbs"][index], columns["fat"][index], self.categories[self._category_codes[index]])
+
+    def __iter__(self):
+        return (self[i] for i in range(self._rows))
+
+    def close(self):
+        """Release the mapping. Column and section views must not be used afterwards."""
+        self._columns = {}
+        self._sections = {}
+        self._category_codes = self._offsets = None
+        if getattr(self, "_map", None) is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass  # A caller still holds a column view; the mapping goes when it does
+            self._map = None
+        self._file.close()
+
+_FOOD_DATABASE = None
+
+def getFoodDatabase():
+    """The compiled external food database (FOOD_DB_FILE) if one exists, else None."""
+    global _FOOD_DATABASE
+    if _FOOD_DATABASE is None and os.path.exists(FOOD_DB_FILE):
+        try:
+            _FOOD_DATABASE = FoodDatabaseFile(FOOD_DB_FILE)
+        except (OSError, ValueError) as e:
+            logError(f"Food database unreadable: {e}")
+    return _FOOD_DATABASE
+
+# --- FOOD LOOKUP INDEX (autocomplete, typo-tolerant search, calorie ranges) ---
+
+FOOD_INDEX_TOP_K = 10  # Suggestions returned straight from a trie node (or a compiled prefix list)
+FUZZY_POSTING_BUDGET = 4000  # Max trigram postings scanned per fuzzy query
+FUZZY_CANDIDATE_FACTOR = 3  # Candidates given an exact similarity score, per result wanted
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_GRAM_CODES = {ch: code for code, ch in enumerate(" 0123456789abcdefghijklmnopqrstuvwxyz")}
+_GRAM_SLOTS = len(_GRAM_CODES) ** 3
+_NO_RANK = 0xFFFFFFFF
+
+def _name_tokens(name):
+    """Lower-case word tokens of a food name."""
+    return tuple(_TOKEN_PATTERN.findall(name.lower()))
+
+def _trigrams(text):
+    """Character trigrams of a normalised name, padded so word starts/ends count."""
+    padded = f"  {' '.join(_name_tokens(text))} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _gram_code(gram):
+    """Slot of a trigram (or a space-padded word prefix) in the compiled tables."""
+    codes = _GRAM_CODES
+    return (codes[gram[0]] * 37 + codes[gram[1]]) * 37 + codes[gram[2]]
+
+def _compile_food_index(names, calories):
+    """
+    Build the FOOD_DB_INDEX_SECTIONS for compile_food_database: the same rank order,
+    word prefixes, trigrams and calorie order as FoodIndex, laid out as flat arrays that
+    CompiledFoodIndex reads in place. Words are bisected in a sorted table whose postings
+    are rank-ordered, so a prefix is a contiguous run of words; short prefixes also get
+    their best FOOD_INDEX_TOP_K ranks stored. Trigrams are addressed directly by code.
+    """
+    lowered = [name.lower() for name in names]
+    order = array("I", sorted(range(len(names)), key=lambda i: (len(lowered[i]), lowered[i])))
+    rank = array("I", bytes(4 * len(names)))
+    word_postings = {}
+    for position, food_id in enumerate(order):
+        rank[food_id] = position
+        for token in set(_name_tokens(lowered[food_id])):
+            word_postings.setdefault(token, array("I")).append(position)
+    tokens = sorted(word_postings)
+    token_text, token_offsets = bytearray(), array("I", [0])
+    postings, posting_offsets = array("I"), array("I", [0])
+    for token in tokens:
+        token_text += token.encode("ascii")
+        token_offsets.append(len(token_text))
+        postings.extend(word_postings[token])
+        posting_offsets.append(len(postings))
+
+    prefixes = sorted({token[:n] for token in tokens for n in range(1, min(len(token), FOOD_DB_PREFIX_LEN) + 1)},
+                      key=lambda prefix: _gram_code(prefix.ljust(FOOD_DB_PREFIX_LEN)))
+    prefix_codes, prefix_top = array("I"), array("I")
+    for prefix in prefixes:
+        lo = bisect.bisect_left(tokens, prefix)
+        hi = bisect.bisect_left(tokens, prefix + "\x7f")
+        top = []
+        for position in heapq.merge(*(word_postings[token] for token in tokens[lo:hi])):
+            if not top or top[-1] != position:  # Two words sharing the prefix list the food once
+                top.append(position)
+                if len(top) == FOOD_INDEX_TOP_K:
+                    break
+        prefix_codes.append(_gram_code(prefix.ljust(FOOD_DB_PREFIX_LEN)))
+        prefix_top.extend(top + [_NO_RANK] * (FOOD_INDEX_TOP_K - len(top)))
+
+    gram_lists = {}
+    for food_id in order:
+        for gram in _trigrams(lowered[food_id]):
+            gram_lists.setdefault(_gram_code(gram), array("I")).append(food_id)
+    gram_postings, gram_offsets = array("I"), array("I", [0])
+    for code in range(_GRAM_SLOTS):
+        gram_postings.extend(gram_lists.get(code, ()))
+        gram_offsets.append(len(gram_postings))
+
+    by_calories = array("I", sorted(range(len(names)), key=calories.__getitem__))
+    return {
+        "order": order, "rank": rank,
+        "by_calories": by_calories, "calorie_keys": array("f", (calories[i] for i in by_calories)),
+        "token_offsets": token_offsets, "posting_offsets": posting_offsets, "postings": postings,
+        "prefix_codes": prefix_codes, "prefix_top": prefix_top,
+        "gram_offsets": gram_offsets, "gram_postings": gram_postings,
+        "token_text": token_text,
+    }
+
+class FoodIndex:
+    """
+    AC6: Search index over a food list, built once.
+    - A prefix trie over name words; every node stores the ids of all foods under it in rank
+      order (shortest names first), so the top suggestions are a walk of len(prefix) steps
+      plus a slice, and multi-word queries scan the smallest node with early exit.
+    - A trigram inverted index for typo-tolerant matching, scanning the rarest trigrams first.
+    - Food ids ordered by calories, for bisect range queries.
+    Foods are anything with get_name() and get_calories_per_100g() (FoodItem). For a
+    compiled FoodDatabaseFile use CompiledFoodIndex, which needs no build.
+    """
+    def __init__(self, foods):
+        self._foods = foods
+        names, calories = [], array("d")
+        for food in foods:
+            names.append(food.get_name().lower())
+            calories.append(food.get_calories_per_100g())
+        # Rank: shorter, then alphabetical, names first; ids are inserted in rank order
+        self._order = sorted(range(len(names)), key=lambda i: (len(names[i]), names[i]))
+        self._rank = array("I", bytes(4 * len(names)))
+        for rank, food_id in enumerate(self._order):
+            self._rank[food_id] = rank
+
+        self._tokens = [_name_tokens(name) for name in names]
+        self._trie = ({}, array("I"))  # (children, food ids in rank order)
+        for food_id in self._order:
+            for token in set(self._tokens[food_id]):
+                node = self._trie
+                for ch in token:
+                    child = node[0].get(ch)
+                    if child is None:
+                        child = node[0][ch] = ({}, array("I"))
+                    node = child
+                    ids = node[1]
+                    if not ids or ids[-1] != food_id:  # Two words sharing a prefix add the food once
+                        ids.append(food_id)
+
+        trigram_lists = {}  # gram -> food ids in rank order
+        for food_id in self._order:
+            for gram in _trigrams(names[food_id]):
+                trigram_lists.setdefault(gram, array("I")).append(food_id)
+        self._trigrams = trigram_lists
+
+        self._by_calories = array("I", sorted(range(len(names)), key=calories.__getitem__))
+        self._calorie_keys = array("d", (calories[i] for i in self._by_calories))
+
+    def __len__(self):
+        return len(self._foods)
+
+    def _name(self, food_id):
+        name_of = getattr(self._foods, "name", None)  # FoodDatabaseFile decodes names without a FoodItem
+        return name_of(food_id) if name_of else self._foods[food_id].get_name()
+
+    def _node(self, prefix):
+        node = self._trie
+        for ch in prefix:
+            node = node[0].get(ch)
+            if node is None:
+                return None
+        return node
+
+    def complete(self, text, limit=FOOD_INDEX_TOP_K):
+        """
+        Autocomplete: foods with a word starting with each typed word, best first.
+        Drives from the word whose trie node covers the fewest foods.
+        """
+        return [self._foods[i] for i in self._complete_ids(text, limit)]
+
+    def _complete_ids(self, text, limit):
+        query = _name_tokens(text)
+        if not query:
+            return []
+        nodes = [self._node(token) for token in query]
+        if any(node is None for node in nodes):
+            return []
+        driver = min(range(len(query)), key=lambda i: len(nodes[i][1]))
+        others = [token for i, token in enumerate(query) if i != driver]
+        if not others:
+            return list(nodes[driver][1][:limit])
+        results = []
+        for food_id in nodes[driver][1]:
+            tokens = self._tokens[food_id]
+            if all(any(word.startswith(token) for word in tokens) for token in others):
+                results.append(food_id)
+                if len(results) >= limit:
+                    break
+        return results
+
+    def fuzzy(self, text, limit=FOOD_INDEX_TOP_K, min_similarity=0.5):
+        """
+        Typo-tolerant search by trigram overlap: the share of the query's trigrams found in
+        the name, ties broken by Jaccard similarity so closer-length names come first.
+        Postings are scanned rarest trigram first, up to FUZZY_POSTING_BUDGET; they are in
+        rank order, so a cut-off list keeps its shortest names and ties go to those first.
+        """
+        return [self._foods[i] for i in self._fuzzy_ids(text, limit, min_similarity)]
+
+    def _trigram_postings(self, grams):
+        """The food id list of each of the trigrams that occurs in the index."""
+        return [self._trigrams[g] for g in grams if g in self._trigrams]
+
+    @staticmethod
+    def _fuzzy_candidates(postings, wanted):
+        """
+        The `wanted` food ids found in the most posting lists, ties going to the one seen
+        first (the Counter.most_common choice), in no particular order. Counted in numpy when
+        it is available: nearly every id is in just one list, and Counter spends most of the
+        query on those.
+        """
+        np = get_numpy()
+        if np is None or not postings:
+            hits = Counter()
+            for posting in postings:
+                hits.update(posting)
+            return [food_id for food_id, _ in hits.most_common(wanted)]
+        ids = np.concatenate([np.frombuffer(posting, dtype=np.uint32) for posting in postings]).astype(np.uint64)
+        # (id, position) packed in one integer: a plain sort groups each id, first sighting first
+        packed = np.sort(ids << np.uint64(32) | np.arange(len(ids), dtype=np.uint64))
+        ids = packed >> np.uint64(32)
+        starts = np.flatnonzero(np.concatenate(([True], ids[1:] != ids[:-1])))
+        counts = np.diff(np.append(starts, len(ids))).astype(np.uint64)
+        # One unique key per id (fewest lists missed, then first seen), so no stable sort is needed
+        key = (np.uint64(len(postings)) - counts) << np.uint64(32) | (packed[starts] & np.uint64(0xFFFFFFFF))
+        if len(key) > wanted:
+            starts = starts[np.argpartition(key, wanted)[:wanted]]
+        return ids[starts].tolist()
+
+    def _fuzzy_ids(self, text, limit, min_similarity=0.5):
+        grams = _trigrams(text)
+        if not grams:
+            return []
+        lists = sorted(self._trigram_postings(grams), key=len)
+        used, scanned = [], 0
+        for posting in lists:
+            if scanned and scanned + len(posting) > FUZZY_POSTING_BUDGET:
+                break
+            scanned += len(posting)
+            used.append(posting[:FUZZY_POSTING_BUDGET])  # Caps the rarest list of a short, common word
+        # Only the strongest candidates get an exact similarity score
+        candidates = self._fuzzy_candidates(used, limit * FUZZY_CANDIDATE_FACTOR)
+        scored = []
+        for food_id in candidates:
+            food_grams = _trigrams(self._name(food_id))
+            shared = len(grams & food_grams)
+            similarity = shared / len(grams)
+            if similarity >= min_similarity:
+                scored.append((-similarity, -shared / len(grams | food_grams), self._rank[food_id], food_id))
+        scored.sort()
+        return [entry[-1] for entry in scored[:limit]]
+
+    def search(self, text, limit=FOOD_INDEX_TOP_K):
+        """
+        Prefix matches first, topped up with fuzzy matches for typos.
+        Merged by food id: FoodDatabaseFile builds a new FoodItem per access, so object
+        identity cannot tell two hits on the same row apart.
+        """
+        ids = self._complete_ids(text, limit)
+        if len(ids) < limit:
+            seen = set(ids)
+            ids += [i for i in self._fuzzy_ids(text, limit) if i not in seen][:limit - len(ids)]
+        return [self._foods[i] for i in ids]
+
+    def in_calorie_range(self, low, high, limit=None):
+        """Foods with low <= calories per 100g <= high, in calorie order."""
+        lo = bisect.bisect_left(self._calorie_keys, low)
+        hi = bisect.bisect_right(self._calorie_keys, high)
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return [self._foods[i] for i in self._by_calories[lo:hi]]
+
+    def sorted_by_calories(self):
+        """All foods in calorie order (precomputed)."""
+        return [self._foods[i] for i in self._by_calories]
+
+class CompiledFoodIndex(FoodIndex):
+    """
+    FoodIndex over a compiled FoodDatabaseFile, answered from the index sections that
+    compile_food_database wrote (see _compile_food_index). Opening it builds nothing and
+    a query creates FoodItem objects only for the rows it returns, so memory stays flat
+    however large the database is.
+    """
+    def __init__(self, database):
+        self._foods = database
+        section = database.section
+        self._order, self._rank = section("order"), section("rank")
+        self._by_calories, self._calorie_keys = section("by_calories"), section("calorie_keys")
+        self._token_offsets, self._token_text = section("token_offsets"), section("token_text")
+        self._posting_offsets, self._postings = section("posting_offsets"), section("postings")
+        self._prefix_codes, self._prefix_top = section("prefix_codes"), section("prefix_top")
+        self._gram_offsets, self._gram_postings = section("gram_offsets"), section("gram_postings")
+        self._prefix_k = database.prefix_k
+
+    def _first_token(self, key):
+        """Position of the first word >= key (bytes) in the sorted word table."""
+        offsets, text = self._token_offsets, self._token_text
+        lo, hi = 0, len(offsets) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if text[offsets[mid]:offsets[mid + 1]].tobytes() < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _token_range(self, prefix):
+        """The run [lo, hi) of words starting with prefix."""
+        key = prefix.encode("ascii")
+        return self._first_token(key), self._first_token(key + b"\x7f")
+
+    def _prefix_ranks(self, prefix):
+        """The stored top ranks of a prefix of at most FOOD_DB_PREFIX_LEN characters."""
+        slot = bisect.bisect_left(self._prefix_codes, _gram_code(prefix.ljust(FOOD_DB_PREFIX_LEN)))
+        k = self._prefix_k
+        return [position for position in self._prefix_top[slot * k:(slot + 1) * k] if position != _NO_RANK]
+
+    def _complete_ids(self, text, limit):
+        query = _name_tokens(text)
+        if not query:
+            return []
+        ranges = [self._token_range(token) for token in query]
+        offsets = self._posting_offsets
+        sizes = [offsets[hi] - offsets[lo] for lo, hi in ranges]
+        if not all(sizes):
+            return []
+        driver = min(range(len(query)), key=sizes.__getitem__)
+        others = [token for i, token in enumerate(query) if i != driver]
+        lo, hi = ranges[driver]
+        if not others and limit <= self._prefix_k and len(query[driver]) <= FOOD_DB_PREFIX_LEN:
+            ranks = self._prefix_ranks(query[driver])
+        elif hi - lo == 1:
+            ranks = self._postings[offsets[lo]:offsets[hi]]  # One word: already unique, in rank order
+        else:
+            ranks = sorted(set(self._postings[offsets[lo]:offsets[hi]]))
+        order = self._order
+        if not others:
+            return [order[position] for position in ranks[:limit]]
+        results = []
+        for position in ranks:
+            food_id = order[position]
+            tokens = _name_tokens(self._name(food_id))
+            if all(any(word.startswith(token) for word in tokens) for token in others):
+                results.append(food_id)
+                if len(results) >= limit:
+                    break
+        return results
+
+    def _trigram_postings(self, grams):
+        offsets, postings = self._gram_offsets, self._gram_postings
+        lists = []
+        for gram in grams:
+            code = _gram_code(gram)
+            start, end = offsets[code], offsets[code + 1]
+            if end > start:
+                lists.append(postings[start:end])
+        return lists
+
+_FOOD_INDEX = None
+_foodIndexLock = threading.Lock()
+
+def getFoodIndex(block=True):
+    """
+    Return the food index, opening it on first use: a CompiledFoodIndex over the compiled
+    food database when one exists, otherwise a FoodIndex built over the built-in catalog.
+    With block=False, returns None instead of waiting while another thread opens it.
+    """
+    global _FOOD_INDEX
+    if _FOOD_INDEX is None:
+        if not _foodIndexLock.acquire(blocking=block):
+            return None
+        try:
+            if _FOOD_INDEX is None:
+                database = getFoodDatabase()
+                _FOOD_INDEX = CompiledFoodIndex(database) if database is not None else FoodIndex(getFoodCatalog().items)
+                markStartup(f"food index ready ({len(_FOOD_INDEX)} foods)")
+                get_numpy()  # Fuzzy search counts with it; import it here, off the UI thread
+        finally:
+            _foodIndexLock.release()
+    return _FOOD_INDEX
+
+def _compileFoods(foods, folder):
+    """Compile FoodItems into a food database in folder via a nutrient CSV; returns its path."""
+    csv_path = os.path.join(folder, "foods.csv")
+    db_path = os.path.join(folder, FOOD_DB_FILE)
+    fieldnames = ("name",) + FOOD_DB_NUMERIC_COLUMNS
+    writeCsv(csv_path, ({"name": food.get_name(), **{field: value * 100 for field, value in zip(FOOD_DB_NUMERIC_COLUMNS, food.get_per_gram())}}
+                        for food in foods), fieldnames)
+    compile_food_database(csv_path, db_path)
+    return db_path
+
+def benchmarkFoodIndex(count=300000, queries=2000, seed=11):
+    """
+    Compile `count` synthetic foods into a temporary food database and report the time to
+    compile and open it and per-query latency over the CompiledFoodIndex. Headless.
+    """
+    rng = random.Random(seed)
+    # A 20,000-word vocabulary; names are 1-4 words, roughly the shape of a national nutrient database
+    consonants, vowels = "bcdfghklmnprstvwz", "aeiou"
+    vocabulary = sorted({"".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(rng.randint(2, 4)))
+                         for _ in range(20000)})
+    foods = [FoodItem(" ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 4))).title(),
+                      rng.uniform(10, 900), rng.uniform(0, 40), rng.uniform(0, 80), rng.uniform(0, 60))
+             for _ in range(count)]
+
+    def typo(word):
+        i = rng.randrange(len(word))
+        return word[:i] + rng.choice("aeiou") + word[i + 1:]
+
+    samples = [rng.choice(foods).get_name() for _ in range(queries)]
+    cases = {
+        "prefix (3 chars)": [name[:3] for name in samples],
+        "two-word prefix": [" ".join(w[:4] for w in name.split()[:2]) for name in samples],
+        "fuzzy (1 typo)": [typo(name) for name in samples],
+        "calorie range": [(c, c + 5) for c in (rng.uniform(10, 900) for _ in range(queries))],
+    }
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        db_path = _compileFoods(foods, folder)
+        compile_s = time.perf_counter() - start
+        start = time.perf_counter()
+        database = FoodDatabaseFile(db_path)
+        index = CompiledFoodIndex(database)
+        open_ms = (time.perf_counter() - start) * 1000
+        print(f"Food index benchmark ({count} foods, compiled in {compile_s:.1f} s, opened in {open_ms:.2f} ms)")
+        try:
+            for label, inputs in cases.items():
+                timings = []
+                found = 0
+                for value, name in zip(inputs, samples):
+                    start = time.perf_counter()
+                    if label == "calorie range":
+                        index.in_calorie_range(*value, limit=50)
+                    elif label.startswith("fuzzy"):
+                        found += name in [food.get_name() for food in index.fuzzy(value)]
+                    else:
+                        index.complete(value)
+                    timings.append((time.perf_counter() - start) * 1000)
+                timings.sort()
+                recall = f", original found in {100 * found / len(inputs):.0f}%" if label.startswith("fuzzy") else ""
+                p95, p99 = (timings[int(len(timings) * q) - 1] for q in (0.95, 0.99))
+                print(f"  {label:<17} mean {sum(timings) / len(timings):.3f} ms, p95 {p95:.3f} ms, p99 {p99:.3f} ms{recall}")
+        finally:
+            index = None  # Its section views pin the mapping
+            database.close()
+    unique = list({food.get_name(): food for food in foods[:5000]}.values())
+    failures = checkFoodIndexSearch(unique, [typo(food.get_name())[:5] for food in unique[:500]])
+    print(f"  search check: {len(failures) or 'no'} failures (duplicates, or compiled differing from in-memory)")
+
+def checkFoodIndexSearch(foods, queries):
+    """
+    Check search over a compiled FoodDatabaseFile of the foods (names must be unique)
+    returns exactly what FoodIndex returns over the list, and that neither returns the
+    same food twice. Returns the (check, query) pairs that failed.
+    """
+    failures = []
+    with tempfile.TemporaryDirectory() as folder:
+        database = FoodDatabaseFile(_compileFoods(foods, folder))
+        try:
+            in_memory, compiled = FoodIndex(foods), CompiledFoodIndex(database)
+            for query in queries:
+                expected = [food.get_name() for food in in_memory.search(query)]
+                names = [food.get_name() for food in compiled.search(query)]
+                if len(names) != len(set(names)) or len(expected) != len(set(expected)):
+                    failures.append(("duplicates", query))
+                elif names != expected:
+                    failures.append(("compiled differs", query))
+        finally:
+            compiled = None  # Its section views pin the mapping
+            database.close()
+    return failures
+
+# --- MEAL PLANNER ENGINE (deterministic macro-target solver) ---
+
+MACRO_KEYS = ("calories", "protein", "carbs", "fat")
+MACRO_WEIGHTS = (1.0, 1.0, 0.6, 0.6)  # Relative importance of hitting each target
+REPEAT_PENALTY = 0.05  # Cost per earlier use of a food, so plans don't repeat the same meal
+SERVING_STEPS_G = tuple(range(25, 325, 25))  # MealPlan serving sizes (g)
+SERVING_MULTIPLIERS = (0.5, 1, 1.5, 2)  # Smart generator portions of a listed serving
+MAX_SOLVER_ROUNDS = 20
+
+def meal_targets_from_ratios(goals, protein_ratio, carb_ratio, fat_ratio):
+    """Per-meal macro targets; calories follow from the macros (4/4/9 kcal per g)."""
+    protein = goals["protein"] * protein_ratio
+    carbs = goals["carbs"] * carb_ratio
+    fat = goals["fat"] * fat_ratio
+    return (4 * protein + 4 * carbs + 9 * fat, protein, carbs, fat)
+
+def solve_meal_selection(slots, targets, usage=None, weights=MACRO_WEIGHTS, repeat_penalty=REPEAT_PENALTY, rng=None):
+    """
+    AC6: Optimisation algorithm (coordinate descent) choosing one candidate per slot.
+
+    `slots` is a list of candidate lists; each candidate is (food_key, (kcal, protein, carbs, fat), payload),
+    and a key of None means "leave this slot empty". The objective is the weighted squared relative
+    deviation from `targets`, plus `repeat_penalty` for every earlier use of a food recorded in `usage`
+    (and for using the same food twice in one meal). Starts from a greedy pick and then re-optimises
+    one slot at a time until no slot improves. Ties keep the earlier candidate, so the result is
+    deterministic unless an `rng` is given to shuffle candidate order.
+    Returns (payloads, stats).
+    """
+    start = time.perf_counter()
+    if usage is None:
+        usage = {}
+    scale = [w / max(t, 1.0) ** 2 for w, t in zip(weights, targets)]
+    slots = [list(candidates) for candidates in slots if candidates]
+    if rng is not None:
+        for candidates in slots:
+            rng.shuffle(candidates)
+
+    def cost(totals, keys):
+        deviation = sum(s * (total - t) ** 2 for s, total, t in zip(scale, totals, targets))
+        repeats = sum(usage.get(key, 0) for key in keys if key is not None)
+        repeats += len([key for key in keys if key is not None]) - len(set(keys) - {None})
+        return deviation + repeat_penalty * repeats
+
+    choice = [None] * len(slots)
+    totals = [0.0, 0.0, 0.0, 0.0]
+    evaluations = 0
+    rounds = 0
+    improved = True
+    while improved and rounds < MAX_SOLVER_ROUNDS:
+        rounds += 1
+        improved = False
+        for index, candidates in enumerate(slots):
+            current = choice[index]
+            base = totals
+            if current is not None:
+                base = [total - value for total, value in zip(totals, candidates[current][1])]
+            other_keys = [slots[i][c][0] for i, c in enumerate(choice) if c is not None and i != index]
+            best, best_cost = current, None
+            for c, (key, nutrients, _payload) in enumerate(candidates):
+                evaluations += 1
+                trial = cost([b + v for b, v in zip(base, nutrients)], other_keys + [key])
+                if best_cost is None or trial < best_cost - 1e-12 or (c == current and trial <= best_cost):
+                    best, best_cost = c, trial
+            if best != current:
+                choice[index] = best
+                totals = [b + v for b, v in zip(base, candidates[best][1])]
+                improved = True
+
+    keys = [slots[i][c][0] for i, c in enumerate(choice)]
+    for key in keys:
+        if key is not None:
+            usage[key] = usage.get(key, 0) + 1
+    stats = {
+        "rounds": rounds,
+        "evaluations": evaluations,
+        "objective": cost(totals, keys),
+        "deviation": {k: round((total - t) / max(t, 1.0), 4) for k, total, t in zip(MACRO_KEYS, totals, targets)},
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+    }
+    return [slots[i][c][2] for i, c in enumerate(choice) if slots[i][c][0] is not None], stats
+
+def smart_meal_candidates(foods, multipliers=SERVING_MULTIPLIERS, optional=False):
+    """Candidates for one smart-generator slot: each serving-sized food at several portions."""
+    candidates = [(None, (0, 0, 0, 0), None)] if optional else []
+    for food in foods:
+        nutrients = (food["calories"], food["protein"], food["carbs"], food["fat"])
+        for multiplier in multipliers:
+            candidates.append((food["food"], tuple(v * multiplier for v in nutrients), (food, multiplier)))
+    return candidates
+
+def smart_meal_item(food, multiplier):
+    """Display/log record for a chosen smart-generator portion."""
+    if multiplier == 1:
+        return food
+    return {
+        "food": f"{food['food']} x{multiplier:g}",
+        "calories": round(food["calories"] * multiplier),
+        "protein": round(food["protein"] * multiplier, 1),
+        "carbs": round(food["carbs"] * multiplier, 1),
+        "fat": round(food["fat"] * multiplier, 1),
+    }
+
+def generate_smart_meal_plan(catalog, diet_type, meal_count, restrictions, goals, rng=None):
+    """
+    Build a smart meal plan: for each meal template, solve for a protein, carb (unless keto),
+    vegetable and optional fat portion that best hits the meal's share of the macro goals.
+    """
+    view = catalog.diet_view(diet_type)
+    query = compile_restrictions(restrictions)
+
+    # Catalog views are already diet-filtered; only the free-text restrictions vary per call
+    proteins = catalog.apply_restrictions(view["proteins"], query)
+    carbs = catalog.apply_restrictions(view["carbs"], query)
+    vegetables = catalog.apply_restrictions(view["vegetables"], query)
+    fats = catalog.apply_restrictions(view["fats"], query)
+
+    slots = [smart_meal_candidates(proteins)]
+    if diet_type.lower() != "keto":
+        slots.append(smart_meal_candidates(carbs))
+    slots.append(smart_meal_candidates(vegetables, multipliers=(1, 2)))
+    slots.append(smart_meal_candidates(fats, optional=True))
+
+    meal_plan = []
+    usage = {}
+    for template in MEAL_TEMPLATES[meal_count]:
+        targets = meal_targets_from_ratios(goals, template["protein_ratio"], template["carb_ratio"], template["fat_ratio"])
+        chosen, stats = solve_meal_selection(slots, targets, usage=usage, rng=rng)
+        meal_plan.append({
+            "name": template["name"],
+            "items": [smart_meal_item(food, multiplier) for food, multiplier in chosen],
+            "solve": stats,
+        })
+    return meal_plan
+
+MEAL_PLAN_CACHE_SIZE = 128
+MEAL_PLAN_SOLVER_VERSION = 1 # Bump when generate_smart_meal_plan gives a different plan for the same inputs
+
+class MealPlanCache:
+    """
+    Bounded LRU cache of smart meal plans keyed by a canonical hash of the inputs and a
+    seed. The same goals/diet/meal count/restrictions/seed always produce the same plan,
+    so a repeat request is served from memory. The key also covers the catalog fingerprint
+    and MEAL_PLAN_SOLVER_VERSION, so plans cached before a data or solver change are never
+    served. Callers get their own copy of the plan. Optionally persisted as JSON at `path`
+    (loaded on first use, written by save()).
+    """
+    def __init__(self, maxsize=MEAL_PLAN_CACHE_SIZE, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._loaded = path is None
+        self._dirty = False
+
+    @staticmethod
+    def make_key(diet_type, meal_count, restrictions, goals, seed):
+        """
+        SHA-256 of the normalised inputs plus the catalog and solver versions; restriction
+        order and spacing do not matter.
+        """
+        query = compile_restrictions(restrictions)
+        canonical = json.dumps([
+            getFoodCatalog().fingerprint, MEAL_PLAN_SOLVER_VERSION, diet_type.lower(), int(meal_count), query.excluded_tags, sorted(query.name_terms),
+            [(key, round(float(value), 1)) for key, value in sorted(goals.items())], int(seed),
+        ], separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get_or_generate(self, diet_type, meal_count, restrictions, goals, seed):
+        """Return the cached plan for these inputs, generating (and caching) it on a miss."""
+        self._load()
+        key = self.make_key(diet_type, meal_count, restrictions, goals, seed)
+        plan = self._entries.get(key)
+        if plan is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._copy(plan)
+        self.misses += 1
+        plan = generate_smart_meal_plan(getFoodCatalog(), diet_type, meal_count, restrictions, goals,
+                                        rng=random.Random(seed))
+        # Plain dicts so the plan can be written to disk
+        plan = [dict(meal, items=[dict(item) for item in meal["items"]]) for meal in plan]
+        self._entries[key] = plan
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        self._dirty = True
+        return self._copy(plan)
+
+    @staticmethod
+    def _copy(plan):
+        """Deep copy via JSON (plans are plain JSON data), so callers cannot edit the cached plan."""
+        return json.loads(json.dumps(plan))
+
+    def stats(self):
+        """Hit/miss counts, hit rate (0-1) and current size."""
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+            for key, plan in list(entries.items())[-self.maxsize:]:
+                self._entries[key] = plan
+        except (OSError, ValueError) as e:
+            logError(f"Meal plan cache unreadable: {e}")
+
+    def save(self):
+        """Write the cache to `path` if it changed (no-op for memory-only caches)."""
+        if self.path is None or not self._dirty:
+            return
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(temp_path, self.path)
+            self._dirty = False
+        except OSError as e:
+            logError(f"Meal plan cache save failed: {e}")
+
+def benchmarkMealPlanner(profiles=10000, seed=2024):
+    """
+    Run the smart meal planner over random goal profiles and report solve time and how
+    closely the meals hit their targets. Headless; no Tk needed.
+    """
+    rng = random.Random(seed)
+    catalog = getFoodCatalog()
+    solve_ms = []
+    deviations = {key: [] for key in MACRO_KEYS}
+    rounds = []
+    start = time.perf_counter()
+    for _ in range(profiles):
+        calories = rng.randint(1400, 3500)
+        protein_share = rng.uniform(0.2, 0.35)
+        fat_share = rng.uniform(0.2, 0.35)
+        goals = {
+            "calories": calories,
+            "protein": calories * protein_share / 4,
+            "fat": calories * fat_share / 9,
+            "carbs": calories * (1 - protein_share - fat_share) / 4,
+        }
+        diet = rng.choice(DIET_TYPES)
+        meal_count = rng.randint(3, 6)
+        plan = generate_smart_meal_plan(catalog, diet, meal_count, "", goals)
+        for meal in plan:
+            stats = meal["solve"]
+            solve_ms.append(stats["elapsed_ms"])
+            rounds.append(stats["rounds"])
+            for key in MACRO_KEYS:
+                deviations[key].append(abs(stats["deviation"][key]))
+    total_s = time.perf_counter() - start
+    solve_ms.sort()
+    p95 = solve_ms[int(len(solve_ms) * 0.95) - 1]
+    print(f"Meal planner benchmark ({profiles} goal profiles, {len(solve_ms)} meals, {total_s:.2f} s)")
+    print(f"  solve time: mean {sum(solve_ms) / len(solve_ms):.3f} ms, p95 {p95:.3f} ms, "
+          f"mean rounds to converge {sum(rounds) / len(rounds):.2f}")
+    for key in MACRO_KEYS:
+        values = deviations[key]
+        print(f"  {key:<9} mean |deviation| {100 * sum(values) / len(values):5.1f}%")
+    return {"solve_ms": solve_ms, "deviations": deviations}
+
+# --- NUTRITION MATRIX (vectorised plan aggregation; numpy optional) ---
+
+NUMPY_AVAILABLE = None  # Unknown until the first matrix is built
+_numpyModule = None
+
+def get_numpy():
+    """Import numpy on first use; returns None (pure-Python fallback) if it is not installed."""
+    global NUMPY_AVAILABLE, _numpyModule
+    if NUMPY_AVAILABLE is None:
+        try:
+            _numpyModule = importlib.import_module("numpy")
+            NUMPY_AVAILABLE = True
+        except ImportError:
+            NUMPY_AVAILABLE = False
+        markStartup("lazy import numpy")
+    return _numpyModule
+
+# Balance rules per macro (same order as MACRO_KEYS): allowed % variance, score penalty, advice when under/over
+BALANCE_THRESHOLDS = (10, 15, 15, 15)
+BALANCE_PENALTIES = (20, 15, 10, 10)
+BALANCE_ADVICE = (
+    ("Add healthy snacks or increase portion sizes", "Reduce portion sizes or choose lower-calorie alternatives"),
+    ("Add more protein sources like lean meats, eggs, or legumes", "Reduce protein portions and balance with other macros"),
+    ("Include more complex carbohydrates like whole grains", "Reduce refined carbs and focus on vegetables"),
+    ("Add healthy fats like nuts, avocado, or olive oil", "Reduce high-fat foods and cooking oils"),
+)
+BALANCED_MESSAGE = "Your nutrition is well balanced!"
+
+class NutritionMatrix:
+    """
+    AC6: Two-dimensional array of a plan's nutrients: one row per food item, columns
+    (calories, protein, carbs, fat), plus day and meal index arrays for each row.
+    Uses numpy arrays when available, otherwise plain lists with the same results.
+    """
+    def __init__(self, rows, days, meal_names=()):
+        """`rows` is a list of (day_index, meal_index, calories, protein, carbs, fat), indexes from 0."""
+        self.days = days
+        self.meal_names = tuple(meal_names)
+        np = get_numpy()
+        if np is not None:
+            data = np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+            self.day_index = data[:, 0].astype(np.intp)
+            self.meal_index = data[:, 1].astype(np.intp)
+            self.values = data[:, 2:]
+        else:
+            self.day_index = [int(row[0]) for row in rows]
+            self.meal_index = [int(row[1]) for row in rows]
+            self.values = [tuple(row[2:]) for row in rows]
+
+    def daily_totals(self):
+        """(days x 4) totals per day; numpy array or list of lists."""
+        np = get_numpy()
+        if np is not None:
+            return day_sums(np, self.day_index, self.values, self.days)
+        totals = [[0.0, 0.0, 0.0, 0.0] for _ in range(self.days)]
+        for day, row in zip(self.day_index, self.values):
+            day_totals = totals[day]
+            for column, value in enumerate(row):
+                day_totals[column] += value
+        return totals
+
+def day_sums(np, day_index, values, days):
+    """Sum the rows of `values` (n x 4) into `days` buckets by `day_index` (bincount per column)."""
+    return np.stack([np.bincount(day_index, weights=values[:, column], minlength=days) for column in range(4)], axis=1)
+
+def balance_analysis(daily_totals, targets):
+    """
+    AC6: Variance (%) from target and balance score for every day at once.
+    `daily_totals` is (..., 4) and `targets` broadcasts against it, so a whole
+    population of plans (users x days x 4) can be scored in one call with numpy.
+    Returns (variances, scores).
+    """
+    np = get_numpy()
+    if np is not None and not isinstance(daily_totals, list):
+        targets = np.asarray(targets, dtype=np.float64)
+        variances = (daily_totals - targets) / targets * 100
+        over_limit = np.abs(variances) > np.asarray(BALANCE_THRESHOLDS)
+        scores = np.maximum(0, 100 - over_limit @ np.asarray(BALANCE_PENALTIES))
+        return variances, scores
+    variances, scores = [], []
+    for totals in daily_totals:
+        variance = [(total - target) / target * 100 for total, target in zip(totals, targets)]
+        penalty = sum(p for v, limit, p in zip(variance, BALANCE_THRESHOLDS, BALANCE_PENALTIES) if abs(v) > limit)
+        variances.append(variance)
+        scores.append(max(0, 100 - penalty))
+    return variances, scores
+
+def balance_recommendations(variance):
+    """AC6: Advice for one day's (calorie, protein, carb, fat) variance, from the BALANCE_ADVICE table."""
+    recommendations = []
+    for value, limit, (under, over) in zip(variance, BALANCE_THRESHOLDS, BALANCE_ADVICE):
+        if value > limit:
+            recommendations.append(over)
+        elif value < -limit:
+            recommendations.append(under)
+    return recommendations if recommendations else [BALANCED_MESSAGE]
+
+def benchmarkNutritionAnalysis(users=10000, days=30, items_per_day=12, seed=7):
+    """
+    Time daily totals and balance analysis for `users` plans of `days` days: the old
+    nested-dict walk versus the nutrient matrix scored in one batch. Headless.
+    """
+    rng = random.Random(seed)
+    catalog_items = getFoodCatalog().items
+    plans = []
+    for _ in range(users):
+        rows = []
+        for day in range(days):
+            for item in range(items_per_day):
+                food = rng.choice(catalog_items)
+                rows.append((day, item % 4) + food.get_nutrition_vector(rng.choice(SERVING_STEPS_G)))
+        plans.append(rows)
+    targets = (2000.0, 125.0, 225.0, 67.0)
+
+    start = time.perf_counter()
+    for rows in plans:
+        # Old representation: {"Day n": {meal: [{"nutrition": {...}}]}} walked per day and macro
+        meals = {}
+        for day, meal, *values in rows:
+            meals.setdefault(f"Day {day + 1}", {}).setdefault(meal, []).append({"nutrition": dict(zip(MACRO_KEYS, values))})
+        for day in range(1, days + 1):
+            totals = {key: 0 for key in MACRO_KEYS}
+            for foods in meals[f"Day {day}"].values():
+                for food_item in foods:
+                    for key in MACRO_KEYS:
+                        totals[key] += food_item["nutrition"][key]
+            balance_analysis([[totals[key] for key in MACRO_KEYS]], targets)
+    legacy_s = time.perf_counter() - start
+
+    np = get_numpy()
+    start = time.perf_counter()
+    if np is not None:
+        # One matrix for every plan: the day index is offset by user so all days reduce together
+        data = np.asarray(plans, dtype=np.float64).reshape(-1, 6)
+        day_index = data[:, 0].astype(np.intp) + np.repeat(np.arange(users) * days, days * items_per_day)
+        build_s = time.perf_counter() - start
+        start = time.perf_counter()
+        totals = day_sums(np, day_index, data[:, 2:], users * days)
+        balance_analysis(totals.reshape(users, days, 4), targets)
+    else:
+        matrices = [NutritionMatrix(rows, days) for rows in plans]
+        build_s = time.perf_counter() - start
+        start = time.perf_counter()
+        for matrix in matrices:
+            balance_analysis(matrix.daily_totals(), targets)
+    matrix_s = time.perf_counter() - start
+
+    print(f"Nutrition analysis benchmark ({users} users x {days} days, numpy={'yes' if np is not None else 'no'})")
+    print(f"  nested dicts            {legacy_s:8.3f} s")
+    print(f"  matrix build            {build_s:8.3f} s")
+    print(f"  matrix totals + scores  {matrix_s:8.3f} s")
+    return legacy_s, build_s, matrix_s
 
 class MealPlan:
     """
     AC6: OOP class demonstrating data structures, algorithms, control structures
     AC7: Input validation, error handling
     """
-    def __init__(self, user, duration_days=7):
+    def __init__(self, user, duration_days=7, rng=None):
         self._user = user  # AC6: Object composition
         self._duration_days = int(duration_days)  # AC6: Type conversion
         self._meals = {}  # AC6: Data structure (dictionary)
+        self._rng = rng  # Optional random.Random for variety; None gives a deterministic plan
+        self._solve_stats = []
+        self._rows = []  # (day, meal, calories, protein, carbs, fat) per item, for NutritionMatrix
+        self._matrix = None
         self._daily_targets = self._calculate_daily_targets()  # AC6: Algorithm
-        self._food_database = self._initialize_food_database()  # AC6: Data structure (list)
+        self._food_database = getFoodCatalog().items  # AC6: Data structure (shared read-only tuple)
         
     def _calculate_daily_targets(self):
         """
@@ -3716,49 +6447,6 @@ class MealPlan:
             "fat": round((calorie_goal * fat_ratio) / 9, 1)  # 9 cal/g fat
         }
     
-    def _initialize_food_database(self):
-        """
-        AC6: Data structures (list of objects), iteration control structure
-        AC7: Data source simulation (would be CSV/database in production)
-        """
-        # AC6: One-dimensional array (list) of food items
-        foods = [
-            # Proteins
-            FoodItem("Chicken Breast", 165, 31, 0, 3.6, "Protein"),
-            FoodItem("Salmon Fillet", 208, 20, 0, 13, "Protein"),
-            FoodItem("Eggs", 155, 13, 1.1, 11, "Protein"),
-            FoodItem("Greek Yogurt", 100, 10, 3.6, 5, "Protein"),
-            FoodItem("Tofu", 76, 8, 1.9, 4.8, "Protein"),
-            FoodItem("Lentils", 116, 9, 20, 0.4, "Protein"),
-            
-            # Carbohydrates
-            FoodItem("Brown Rice", 123, 2.6, 25, 1, "Carbs"),
-            FoodItem("Oats", 389, 16.9, 66, 6.9, "Carbs"),
-            FoodItem("Sweet Potato", 86, 1.6, 20, 0.1, "Carbs"),
-            FoodItem("Quinoa", 368, 14, 64, 6, "Carbs"),
-            FoodItem("Whole Wheat Bread", 247, 13, 41, 4.2, "Carbs"),
-            
-            # Vegetables
-            FoodItem("Broccoli", 34, 2.8, 7, 0.4, "Vegetables"),
-            FoodItem("Spinach", 23, 2.9, 3.6, 0.4, "Vegetables"),
-
-            FoodItem("Bell Peppers", 31, 1, 7, 0.3, "Vegetables"),
-            FoodItem("Carrots", 41, 0.9, 10, 0.2, "Vegetables"),
-            FoodItem("Avocado", 160, 2, 9, 15, "Vegetables"),
-            
-            # Fruits
-            FoodItem("Banana", 89, 1.1, 23, 0.3, "Fruits"),
-            FoodItem("Apple", 52, 0.3, 14, 0.2, "Fruits"),
-            FoodItem("Berries", 57, 0.7, 14, 0.3, "Fruits"),
-            FoodItem("Orange", 47, 0.9, 12, 0.1, "Fruits"),
-            
-            # Fats
-            FoodItem("Olive Oil", 884, 0, 0, 100, "Fats"),
-            FoodItem("Almonds", 579, 21, 22, 50, "Fats"),
-            FoodItem("Walnuts", 654, 15, 14, 65, "Fats"),
-        ]
-        return foods
-    
     def generate_meal_plan(self, dietary_preferences=None):
         """
         AC6: Complex algorithm using control structures (iteration, selection)
@@ -3768,14 +6456,16 @@ class MealPlan:
         try:
             dietary_preferences = dietary_preferences or []
             self._meals = {}
+            self._solve_stats = []
+            self._usage = {}  # Food use counts across the plan, penalised by the solver for variety
+            self._rows = []
+            self._matrix = None
             
             # AC6: Iteration control structure (for loop)
             for day in range(1, self._duration_days + 1):
                 daily_meals = {
-                    "breakfast": self._generate_meal("breakfast", dietary_preferences),
-                    "lunch": self._generate_meal("lunch", dietary_preferences),
-                    "dinner": self._generate_meal("dinner", dietary_preferences),
-                    "snacks": self._generate_meal("snacks", dietary_preferences)
+                    meal_type: self._generate_meal(meal_type, dietary_preferences, day - 1, meal_index)
+                    for meal_index, meal_type in enumerate(MEAL_SLOTS)
                 }
                 
                 # AC6: Nested data structure (dictionary of dictionaries)
@@ -3787,61 +6477,39 @@ class MealPlan:
             # AC7: Error handling
             return False, f"Error generating meal plan: {str(e)}"
     
-    def _generate_meal(self, meal_type, dietary_preferences):
+    def _generate_meal(self, meal_type, dietary_preferences, day_index=0, meal_index=0):
         """
         AC6: Algorithm with selection and iteration control structures
-        AC6: List comprehension, filtering operations
-        """
-        # AC6: Selection control structure
-        if meal_type == "breakfast":
-            target_calories = self._daily_targets["calories"] * 0.25
-            preferred_categories = ["Carbs", "Protein", "Fruits"]
-        elif meal_type == "lunch":
-            target_calories = self._daily_targets["calories"] * 0.35
-            preferred_categories = ["Protein", "Carbs", "Vegetables"]
-        elif meal_type == "dinner":
-            target_calories = self._daily_targets["calories"] * 0.30
-            preferred_categories = ["Protein", "Vegetables", "Carbs"]
-        else:  # snacks
-            target_calories = self._daily_targets["calories"] * 0.10
-            preferred_categories = ["Fruits", "Fats"]
-        
-        # AC6: List comprehension with filtering
-        available_foods = [
-            food for food in self._food_database
-            if food.get_category() in preferred_categories
-            and (not ("vegetarian" in dietary_preferences) or food.is_vegetarian())
-        ]
-        
-        # AC6: Random selection algorithm
-        if len(available_foods) < 2:
-            available_foods = self._food_database  # Fallback
-        
-        selected_foods = []
-        current_calories = 0
-        attempts = 0
-        max_attempts = 20
+        AC6: Data structures (dictionary lookup of precomputed food pools)
+        """
+        # AC6: Per-meal targets are the meal's share of every daily target
+        calorie_share, _categories = MEAL_SLOTS[meal_type]
+        targets = tuple(self._daily_targets[key] * calorie_share for key in MACRO_KEYS)
+        slots = getFoodCatalog().slot_candidates(meal_type, "vegetarian" in dietary_preferences)
         
-        # AC6: Iteration with condition checking
-        while current_calories < target_calories * 0.8 and attempts < max_attempts:
-            attempts += 1
-            food = random.choice(available_foods)
-            
-            # AC6: Arithmetic operations for serving size calculation
-            needed_calories = target_calories - current_calories
-            base_serving = min(150, max(50, needed_calories / 2))
-            
-            nutrition = food.get_nutrition_per_serving(base_serving)
-            
-            selected_foods.append({
-                "food": food.get_name(),
-                "serving_g": base_serving,
-                "nutrition": nutrition
-            })
-            
-            current_calories += nutrition["calories"]
+        # AC6: Optimisation algorithm picks one food and serving size per category
+        chosen, stats = solve_meal_selection(slots, targets, usage=self._usage, rng=self._rng)
+        self._solve_stats.append(stats)
+        self._rows.extend((day_index, meal_index) + food.get_nutrition_vector(grams) for food, grams in chosen)
         
-        return selected_foods
+        return [
+            {"food": food.get_name(), "serving_g": grams, "nutrition": food.get_nutrition_per_serving(grams)}
+            for food, grams in chosen
+        ]
+    
+    def get_nutrition_matrix(self):
+        """AC6: The plan as a NutritionMatrix (built once per generated plan)."""
+        if self._matrix is None:
+            self._matrix = NutritionMatrix(self._rows, self._duration_days, tuple(MEAL_SLOTS))
+        return self._matrix
+    
+    def get_meals(self):
+        """The generated plan: {"Day n": {meal type: [item, ...]}}."""
+        return self._meals
+    
+    def get_solve_stats(self):
+        """Solver statistics (rounds, evaluations, deviation, elapsed_ms) for each generated meal."""
+        return list(self._solve_stats)
     
     def get_daily_nutrition_summary(self, day):
         """
@@ -3851,98 +6519,73 @@ class MealPlan:
         if f"Day {day}" not in self._meals:
             return None
         
-        totals = {"calories": 0, "protein": 0, "carbs": 0, "fat": 0}
-        
-        # AC6: Nested iteration
-        for meal_type, foods in self._meals[f"Day {day}"].items():
-            for food_item in foods:
-                nutrition = food_item["nutrition"]
-                # AC6: Arithmetic operations
-                totals["calories"] += nutrition["calories"]
-                totals["protein"] += nutrition["protein"]
-                totals["carbs"] += nutrition["carbs"]
-                totals["fat"] += nutrition["fat"]
-        
-        return totals
+        # AC6: Vectorised reduction over the nutrient matrix
+        totals = self.get_nutrition_matrix().daily_totals()[day - 1]
+        return {key: float(value) for key, value in zip(MACRO_KEYS, totals)}
     
-    def export_meal_plan_to_csv(self, filename):
+    def iter_rows(self):
         """
-        AC6: File I/O operations, data structures
+        AC6: Generator yielding one export row at a time:
+        (day, meal, food, serving_g, calories, protein, carbs, fat).
+        """
+        for day, meals in self._meals.items():
+            for meal_type, foods in meals.items():
+                for food_item in foods:
+                    nutrition = food_item["nutrition"]
+                    yield (day, meal_type.capitalize(), food_item["food"], food_item["serving_g"],
+                           nutrition["calories"], nutrition["protein"], nutrition["carbs"], nutrition["fat"])
+    
+    def export_meal_plan(self, filename, fmt=None):
+        """
+        AC6: File I/O operations; rows are streamed straight to the file
         AC7: Error handling for file operations
+        Format is "csv", "jsonl" or "bin" (see MEAL_PLAN_EXPORT_FORMATS), taken from
+        the file extension when not given.
         """
+        fmt = fmt or os.path.splitext(filename)[1].lstrip(".").lower()
+        if fmt not in MEAL_PLAN_EXPORT_FORMATS:
+            return False, f"Export failed: unsupported format '{fmt}'"
         try:
-            # AC6: Two-dimensional array structure (list of lists)
-            csv_data = []
-            headers = ["Day", "Meal", "Food", "Serving (g)", "Calories", "Protein (g)", "Carbs (g)", "Fat (g)"]
-            csv_data.append(headers)
-            
-            # AC6: Nested iteration through data structures
-            for day, meals in self._meals.items():
-                for meal_type, foods in meals.items():
-                    for food_item in foods:
-                        row = [
-                            day,
-                            meal_type.capitalize(),
-                            food_item["food"],
-                            food_item["serving_g"],
-                            food_item["nutrition"]["calories"],
-                            food_item["nutrition"]["protein"],
-                            food_item["nutrition"]["carbs"],
-                            food_item["nutrition"]["fat"]
-                        ]
-                        csv_data.append(row)
-            
-            # AC6: File I/O with CSV format
-            with open(filename, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerows(csv_data)
-            
+            with open(filename, "wb") as file:
+                write_meal_plan_rows(self.iter_rows(), file, fmt)
             return True, f"Meal plan exported to {filename}"
-            
         except Exception as e:
             # AC7: Error handling
             return False, f"Export failed: {str(e)}"
     
+    def export_meal_plan_to_csv(self, filename):
+        """
+        AC6: File I/O operations, data structures
+        AC7: Error handling for file operations
+        """
+        return self.export_meal_plan(filename, "csv")
+    
     def analyze_nutritional_balance(self):
         """
         AC6: Algorithm for data analysis using arithmetic and logical operations
         AC6: Control structures for analysis
         """
-        analysis_results = []
+        if not self._meals:
+            return []
         
-        # AC6: Iteration through all days
+        # AC6: Variances and scores for every day in one vectorised step
+        targets = [self._daily_targets[key] for key in MACRO_KEYS]
+        variances, scores = balance_analysis(self.get_nutrition_matrix().daily_totals(), targets)
+        
+        analysis_results = []
         for day in range(1, self._duration_days + 1):
-            daily_nutrition = self.get_daily_nutrition_summary(day)
-            if not daily_nutrition:
-                continue
-            
-            targets = self._daily_targets
-            
-            # AC6: Arithmetic operations for percentage calculations
-            calorie_diff = ((daily_nutrition["calories"] - targets["calories"]) / targets["calories"]) * 100
-            protein_diff = ((daily_nutrition["protein"] - targets["protein"]) / targets["protein"]) * 100
-            carb_diff = ((daily_nutrition["carbs"] - targets["carbs"]) / targets["carbs"]) * 100
-            fat_diff = ((daily_nutrition["fat"] - targets["fat"]) / targets["fat"]) * 100
-            
-            # AC6: Conditional operations for analysis
-            balance_score = 100
-            if abs(calorie_diff) > 10: balance_score -= 20
-            if abs(protein_diff) > 15: balance_score -= 15
-            if abs(carb_diff) > 15: balance_score -= 10
-            if abs(fat_diff) > 15: balance_score -= 10
+            calorie_diff, protein_diff, carb_diff, fat_diff = (float(v) for v in variances[day - 1])
             
             # AC6: Data structure (record/dictionary)
-            day_analysis = {
+            analysis_results.append({
                 "day": day,
-                "balance_score": max(0, balance_score),
+                "balance_score": int(scores[day - 1]),
                 "calorie_variance": round(calorie_diff, 1),
                 "protein_variance": round(protein_diff, 1),
                 "carb_variance": round(carb_diff, 1),
                 "fat_variance": round(fat_diff, 1),
                 "recommendations": self._generate_recommendations(calorie_diff, protein_diff, carb_diff, fat_diff)
-            }
-            
-            analysis_results.append(day_analysis)
+            })
         
         return analysis_results
     
@@ -3951,67 +6594,400 @@ class MealPlan:
         AC6: Algorithm using conditional logic for recommendation generation
         AC6: String operations, control structures
         """
-        recommendations = []
-        
-        # AC6: Selection control structures with logical operations
-        if cal_diff > 10:
-            recommendations.append("Reduce portion sizes or choose lower-calorie alternatives")
-        elif cal_diff < -10:
-            recommendations.append("Add healthy snacks or increase portion sizes")
-        
-        if prot_diff < -15:
-            recommendations.append("Add more protein sources like lean meats, eggs, or legumes")
-        elif prot_diff > 15:
-            recommendations.append("Reduce protein portions and balance with other macros")
-        
-        if carb_diff < -15:
-            recommendations.append("Include more complex carbohydrates like whole grains")
-        elif carb_diff > 15:
-            recommendations.append("Reduce refined carbs and focus on vegetables")
-        
-        if fat_diff < -15:
-            recommendations.append("Add healthy fats like nuts, avocado, or olive oil")
-        elif fat_diff > 15:
-            recommendations.append("Reduce high-fat foods and cooking oils")
-        
-        return recommendations if recommendations else ["Your nutrition is well balanced!"]
+        # AC6: Table-driven selection (see BALANCE_ADVICE)
+        return balance_recommendations((cal_diff, prot_diff, carb_diff, fat_diff))
 
 # AC6: Global constants (naming convention demonstration)
 MEAL_PLAN_CSV = "meal_plans.csv"
+MEAL_PLAN_EXPORT_HEADERS = ["Day", "Meal", "Food", "Serving (g)", "Calories", "Protein (g)", "Carbs (g)", "Fat (g)"]
+MEAL_PLAN_EXPORT_FORMATS = ("csv", "jsonl", "bin")
+MEAL_PLAN_BIN_MAGIC = b"HHPLAN01"
+MEAL_PLAN_BIN_ROW = struct.Struct("<HBH")  # day number, meal code, food name length (name bytes follow)
+MEAL_PLAN_BIN_VALUES = struct.Struct("<5f")  # serving_g, calories, protein, carbs, fat
 NUTRITION_LOG_CSV = "nutrition_log.csv"
+NUTRITION_LOG_DIR = os.path.splitext(NUTRITION_LOG_CSV)[0]  # nutrition_log/<studentId>/<YYYY-MM>.csv
+ADHERENCE_TOLERANCE = 0.10  # a day is "on target" for a macro when within ±10% of the goal
+ROLLUP_PERIODS = ("week", "month")
+NUTRITION_TOTALS_CACHE_MONTHS = 24  # (user, month) totals kept in memory; older ones are re-read from disk
 
-def quick_sort_food_by_calories(food_list):
+class NutritionLog:
     """
-    Quick sort algorithm for sorting food items by calories (AC6: sorting algorithm).
-    Used in food database functionality.
+    AC6: Persistent, append-only nutrition log.
+    Entries go to one CSV segment per user per month (NUTRITION_LOG_CSV fields), and each
+    segment has a small materialised totals file keyed by date, updated on every append.
+    A day's totals therefore cost one lookup in a file of at most 31 days, however long
+    the log grows. The most recently used NUTRITION_TOTALS_CACHE_MONTHS month totals are
+    kept in memory.
+    Weekly and monthly rollups (sums, logged days, days on target per macro) are kept per
+    user in rollups.json and updated incrementally from the day's before/after totals, so
+    range queries never touch the raw entries. Each entry row also records the day's
+    on-target mask after it, so a lost totals file is rebuilt exactly, masks included.
     """
-    if len(food_list) <= 1:
-        return food_list
-    
-    pivot = food_list[len(food_list) // 2]
-    left = [food for food in food_list if food._calories_per_100g < pivot._calories_per_100g]
-    middle = [food for food in food_list if food._calories_per_100g == pivot._calories_per_100g]
-    right = [food for food in food_list if food._calories_per_100g > pivot._calories_per_100g]
-    
-    return quick_sort_food_by_calories(left) + middle + quick_sort_food_by_calories(right)
+    FIELDS = ["studentId", "date", "time", "food", "serving_g", "calories", "protein", "carbs", "fat", "on_target"]
+
+    def __init__(self, root=NUTRITION_LOG_DIR):
+        self.root = root
+        self._totals = OrderedDict()  # LRU: (studentId, "YYYY-MM") -> {date: [calories, protein, carbs, fat, entries, on-target mask]}
+        self._rollups = {}  # studentId -> {"week": {"2026-W42": record}, "month": {"2026-10": record}}
+
+    @staticmethod
+    def _write_json(path, data):
+        """Replace a JSON file atomically (temp file + os.replace)."""
+        temp_path = path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logError(f"Nutrition log save failed ({path}): {e}")
+
+    @staticmethod
+    def _period_keys(log_date):
+        day = date.fromisoformat(log_date)
+        return {"week": isoWeekKey(day), "month": log_date[:7]}
+
+    def _user_dir(self, student_id):
+        return os.path.join(self.root, re.sub(r"[^A-Za-z0-9_-]", "_", student_id))
+
+    def _segment_base(self, student_id, log_date):
+        return os.path.join(self._user_dir(student_id), log_date[:7])
+
+    def _month_totals(self, student_id, log_date):
+        key = (student_id, log_date[:7])
+        totals = self._totals.get(key)
+        if totals is not None:
+            self._totals.move_to_end(key)
+        else:
+            totals = {}
+            base = self._segment_base(student_id, log_date)
+            path = base + ".totals.json"
+            if os.path.exists(path):
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        totals = json.load(f)
+                except (OSError, ValueError) as e:
+                    logError(f"Nutrition totals unreadable ({path}): {e}")
+                    totals = self._rebuild_totals(student_id, log_date)
+            elif os.path.exists(base + ".csv"):
+                # Segment without totals (file lost, or written before totals existed)
+                totals = self._rebuild_totals(student_id, log_date)
+                self._write_json(path, totals)
+            self._totals[key] = totals
+            if len(self._totals) > NUTRITION_TOTALS_CACHE_MONTHS:
+                self._totals.popitem(last=False)  # every change is already on disk
+        return totals
+
+    def _rebuild_totals(self, student_id, log_date):
+        """
+        Recompute a month's totals from its segment (only needed if the totals file is lost).
+        A day's mask is the one stored with its last entry, i.e. the mask its rollups counted.
+        """
+        totals = {}
+        for row in readCsv(self._segment_base(student_id, log_date) + ".csv"):
+            day = totals.setdefault(row["date"], [0.0, 0.0, 0.0, 0.0, 0, 0])
+            for i, field in enumerate(MACRO_KEYS):
+                day[i] = round(day[i] + float(row.get(field) or 0), 2)
+            day[4] += 1
+            day[5] = int(row.get("on_target") or 0)
+        return totals
+
+    def log_entry(self, student_id, log_date, food, serving_g, calories, protein, carbs, fat, goals=None):
+        """
+        Append one entry (log_date is "YYYY-MM-DD", may be in the past) and update that
+        day's materialised totals and its week/month rollups; goals (User.getMacroGoals())
+        drive the adherence counts. Returns the day's totals.
+        """
+        self.log_entries(student_id, [(log_date, food, serving_g, calories, protein, carbs, fat)], goals)
+        return self.day_totals(student_id, log_date)
+
+    def log_entries(self, student_id, entries, goals=None):
+        """
+        Batch form of log_entry for (log_date, food, serving_g, calories, protein, carbs, fat)
+        tuples: each month segment touched is opened once and every totals/rollups file is
+        written once per call, however many entries there are.
+        """
+        now = datetime.now().strftime("%H:%M:%S")
+        by_month = {}
+        for entry in entries:
+            by_month.setdefault(entry[0][:7], []).append(entry)
+        for month_entries in by_month.values():
+            base = self._segment_base(student_id, month_entries[0][0])
+            os.makedirs(os.path.dirname(base), exist_ok=True)
+            totals = self._month_totals(student_id, month_entries[0][0])
+            segment_exists = os.path.exists(base + ".csv")
+            try:
+                with open(base + ".csv", "a", newline="", encoding="utf-8") as f:
+                    writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+                    if not segment_exists:
+                        writer.writeheader()
+                    for log_date, food, serving_g, *macros in month_entries:
+                        values = [round(float(v), 2) for v in macros]
+                        day = totals.setdefault(log_date, [0.0, 0.0, 0.0, 0.0, 0, 0])
+                        new_day, was_on = day[4] == 0, day[5]
+                        for i, value in enumerate(values):
+                            day[i] = round(day[i] + value, 2)
+                        day[4] += 1
+                        if goals:
+                            day[5] = self._target_mask(day, goals)
+                        writer.writerow({"studentId": student_id, "date": log_date, "time": now, "food": food,
+                                         "serving_g": "" if serving_g is None else serving_g,
+                                         **dict(zip(MACRO_KEYS, values)), "on_target": day[5]})
+                        self._update_rollups(student_id, log_date, new_day, was_on, day[5], values)
+            except OSError as e:
+                logError(f"Nutrition log append failed ({base}.csv): {e}")
+            self._write_json(base + ".totals.json", totals)
+        if by_month:
+            self._write_json(os.path.join(self._user_dir(student_id), "rollups.json"), self._user_rollups(student_id))
+
+    def _user_rollups(self, student_id):
+        rollups = self._rollups.get(student_id)
+        if rollups is None:
+            rollups = {period: {} for period in ROLLUP_PERIODS}
+            path = os.path.join(self._user_dir(student_id), "rollups.json")
+            if os.path.exists(path):
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        rollups.update(json.load(f))
+                except (OSError, ValueError) as e:
+                    logError(f"Nutrition rollups unreadable ({path}): {e}")
+            self._rollups[student_id] = rollups
+        return rollups
+
+    @staticmethod
+    def _target_mask(day, goals):
+        """Bitmask over MACRO_KEYS of the macros whose day total is within ADHERENCE_TOLERANCE of the goal."""
+        mask = 0
+        for i, macro in enumerate(MACRO_KEYS):
+            if goals.get(macro) and abs(day[i] - goals[macro]) <= goals[macro] * ADHERENCE_TOLERANCE:
+                mask |= 1 << i
+        return mask
+
+    def _update_rollups(self, student_id, log_date, new_day, was_on, now_on, values):
+        """
+        Fold one entry into its week and month (in memory): O(1).
+        was_on/now_on are the day's stored on-target masks before and after the entry, so
+        each day counts at most once per macro whatever goals (or none) later entries carry;
+        an entry logged without goals leaves the day's mask as it was.
+        """
+        rollups = self._user_rollups(student_id)
+        for period, key in self._period_keys(log_date).items():
+            record = rollups[period].setdefault(key, {**dict.fromkeys(MACRO_KEYS, 0.0), "days": 0, "entries": 0,
+                                                      "on_target": dict.fromkeys(MACRO_KEYS, 0)})
+            for macro, value in zip(MACRO_KEYS, values):
+                record[macro] = round(record[macro] + value, 2)
+            record["entries"] += 1
+            record["days"] += new_day
+            for i, macro in enumerate(MACRO_KEYS):
+                record["on_target"][macro] += bool(now_on >> i & 1) - bool(was_on >> i & 1)
+
+    @staticmethod
+    def _summarise(key, record):
+        days = record["days"]
+        return {
+            "period": key,
+            "totals": {macro: record[macro] for macro in MACRO_KEYS},
+            "mean": {macro: round(record[macro] / days, 1) if days else 0.0 for macro in MACRO_KEYS},
+            "adherence": {macro: record["on_target"][macro] / days if days else 0.0 for macro in MACRO_KEYS},
+            "days": days,
+            "entries": record["entries"],
+        }
+
+    def rollups(self, student_id, period="month", start=None, end=None):
+        """
+        Summaries for the logged periods between start and end inclusive ("2026-W40" keys for
+        weeks, "2026-10" for months), oldest first. Each has totals, mean per logged day and
+        adherence (share of logged days on target) per macro.
+        """
+        records = self._user_rollups(student_id)[period]
+        return [self._summarise(key, records[key]) for key in sorted(records)
+                if (start is None or key >= start) and (end is None or key <= end)]
+
+    def recent_months(self, student_id, count=12, today=None):
+        """The last `count` calendar months up to today, oldest first, empty months included."""
+        today = today or date.today()
+        keys = []
+        year, month = today.year, today.month
+        for _ in range(count):
+            keys.append(f"{year:04d}-{month:02d}")
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        records = self._user_rollups(student_id)["month"]
+        empty = {**dict.fromkeys(MACRO_KEYS, 0.0), "days": 0, "entries": 0, "on_target": dict.fromkeys(MACRO_KEYS, 0)}
+        return [self._summarise(key, records.get(key, empty)) for key in reversed(keys)]
+
+    def day_totals(self, student_id, log_date):
+        """{"calories", "protein", "carbs", "fat", "entries"} for one day (zeros if nothing logged)."""
+        day = self._month_totals(student_id, log_date).get(log_date, [0.0, 0.0, 0.0, 0.0, 0, 0])
+        return {**dict(zip(MACRO_KEYS, day[:4])), "entries": day[4]}
+
+    def day_entries(self, student_id, log_date):
+        """The individual entries logged for one day (reads that month's segment)."""
+        return [row for row in readCsv(self._segment_base(student_id, log_date) + ".csv") if row["date"] == log_date]
+
+_NUTRITION_LOG = None
+
+def getNutritionLog():
+    """The shared NutritionLog (created on first use)."""
+    global _NUTRITION_LOG
+    if _NUTRITION_LOG is None:
+        _NUTRITION_LOG = NutritionLog()
+    return _NUTRITION_LOG
+
+# Bulk import from other trackers' CSV exports (see import_tracker_csv)
+IMPORT_BATCH_ROWS = 5000
+IMPORT_MAX_ERRORS = 20  # rejected rows reported individually in the summary
+IMPORT_DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%Y/%m/%d", "%d-%m-%Y")
+IMPORT_CSV_ALIASES = {
+    "date": ("date", "day", "logged on", "log date"),
+    "food": ("food", "food name", "name", "item", "description"),
+    "serving_g": ("serving_g", "serving", "serving (g)", "grams", "amount (g)"),
+    "calories": ("calories", "kcal", "energy (kcal)", "energy"),
+    "protein": ("protein", "protein (g)"),
+    "carbs": ("carbs", "carbohydrates", "carbohydrates (g)", "carbs (g)"),
+    "fat": ("fat", "fat (g)", "total fat"),
+    "weight": ("weight", "weight (kg)", "weight_kg", "body weight"),
+}
+
+@functools.lru_cache(maxsize=4096)  # exports repeat each date for every item logged that day
+def _parse_import_date(text):
+    text = (text or "").strip()
+    for fmt in IMPORT_DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            pass
+    raise ValueError(f"Unrecognised date '{text}'")
 
-def binary_search_food_by_name(sorted_food_list, target_name):
+def import_tracker_csv(path, user, nutrition_log, batch_rows=IMPORT_BATCH_ROWS, progress=None, cancel=None):
     """
-    Binary search algorithm for finding food by name (AC6: searching algorithm).
-    Used in food database search functionality.
+    Stream a CSV export from another tracker into the user's nutrition log and weight history.
+    Each row needs a date plus a food entry (name and calories/macros as eaten), a weight, or
+    both. Values are checked with validateInput (the same ranges as the logging forms) and
+    good rows are committed one batch at a time: one NutritionLog.log_entries call and at
+    most one saveUser per batch (for weights), so memory stays bounded by batch_rows whatever the file size.
+    Rows the csv module cannot parse are skipped like invalid ones.
+    progress(bytes_done, bytes_total, stats) is called after each batch; if cancel() returns
+    True the import stops after the current batch. Returns the stats dict.
     """
-    left, right = 0, len(sorted_food_list) - 1
-    
-    while left <= right:
-        mid = (left + right) // 2
-        if sorted_food_list[mid].get_name().lower() == target_name.lower():
-            return mid
-        elif sorted_food_list[mid].get_name().lower() < target_name.lower():
-            left = mid + 1
-        else:
-            right = mid - 1
-    
-    return -1
+    stats = {"rows": 0, "foods": 0, "weights": 0, "skipped": 0, "errors": [], "cancelled": False}
+    total_bytes = os.path.getsize(path)
+    bytes_read = [0]
+    foods, weights = [], []
+    weight_dates = set()  # Imported weight dates, to count those that survive the 84-day trim
+
+    def commit():
+        if foods:
+            nutrition_log.log_entries(user.getStudentId(), foods, goals=user.getMacroGoals())
+        if weights:
+            user.addWeightEntries(weights)
+            weight_dates.update(log_date for log_date, _ in weights)
+            stats["weights"] = sum(1 for log_date, _ in user.getWeightHistory() if log_date in weight_dates)
+            saveUser(user)
+        stats["foods"] += len(foods)
+        foods.clear()
+        weights.clear()
+        if progress:
+            progress(bytes_read[0], total_bytes, stats)
+
+    def lines(f):
+        for raw in f:
+            bytes_read[0] += len(raw)
+            yield raw.decode("utf-8-sig", errors="replace")
+
+    def records(reader):
+        """The reader's rows, with the csv.Error in place of a row it could not parse (e.g. an oversized field)."""
+        while True:
+            try:
+                yield next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield e
+
+    with open(path, "rb") as f:
+        reader = csv.DictReader(lines(f))
+        try:
+            fieldnames = reader.fieldnames or []
+        except csv.Error as e:
+            raise ValueError(f"Unreadable CSV header: {e}") from e
+        headers = {header.strip().lower(): header for header in fieldnames}
+        source = {field: next((headers[a] for a in aliases if a in headers), None)
+                  for field, aliases in IMPORT_CSV_ALIASES.items()}
+        if source["date"] is None or (source["food"] is None and source["weight"] is None):
+            raise ValueError("CSV needs a date column and a food or weight column")
+
+        for row in records(reader):
+            stats["rows"] += 1
+            try:
+                if isinstance(row, csv.Error):
+                    raise ValueError(f"Unreadable row ({row})")
+                log_date = _parse_import_date(row.get(source["date"]))
+                food = (row.get(source["food"]) or "").strip() if source["food"] else ""
+                weight = (row.get(source["weight"]) or "").strip() if source["weight"] else ""
+                if not food and not weight:
+                    raise ValueError("No food or weight")
+                entry = None
+                if food:
+                    macros = [row.get(source[field]) or 0 if source[field] else 0 for field in MACRO_KEYS]
+                    serving = (row.get(source["serving_g"]) or "").strip() if source["serving_g"] else ""
+                    checks = list(zip(("calories", "macro", "macro", "macro"), macros))
+                    if serving:
+                        checks.append(("serving", serving))
+                    for inputType, value in checks:
+                        valid, message = validateInput(inputType, value)
+                        if not valid:
+                            raise ValueError(message)
+                    entry = (log_date, food, float(serving) if serving else None, *map(float, macros))
+                if weight:
+                    valid, message = validateInput("weight", weight)
+                    if not valid:
+                        raise ValueError(message)
+            except ValueError as e:
+                stats["skipped"] += 1
+                if len(stats["errors"]) < IMPORT_MAX_ERRORS:
+                    stats["errors"].append(f"Row {stats['rows'] + 1}: {e}")  # +1 for the header line
+            else:
+                if entry:
+                    foods.append(entry)
+                if weight:
+                    weights.append((log_date, float(weight)))
+            # Flush on pending size, and every batch_rows rows read so a run of bad rows
+            # still reports progress and honours cancel()
+            if len(foods) + len(weights) >= batch_rows or stats["rows"] % batch_rows == 0:
+                commit()
+                if cancel and cancel():
+                    stats["cancelled"] = True
+                    break
+        commit()
+    return stats
+
+
+def quick_sort_food_by_calories(food_list):
+    """
+    Quick sort algorithm for sorting food items by calories (AC6: sorting algorithm).
+    Sorts in place (Hoare partitioning with an explicit stack, no per-level list copies)
+    and returns the same list. For repeated lookups use getFoodIndex().sorted_by_calories().
+    """
+    stack = [(0, len(food_list) - 1)]
+    while stack:
+        low, high = stack.pop()
+        if low >= high:
+            continue
+        pivot = food_list[(low + high) // 2].get_calories_per_100g()
+        i, j = low, high
+        # AC6: Partition so everything left of i is <= pivot and right of j is >= pivot
+        while i <= j:
+            while food_list[i].get_calories_per_100g() < pivot:
+                i += 1
+            while food_list[j].get_calories_per_100g() > pivot:
+                j -= 1
+            if i <= j:
+                food_list[i], food_list[j] = food_list[j], food_list[i]
+                i += 1
+                j -= 1
+        stack.append((low, j))
+        stack.append((i, high))
+    return food_list
+
 def selection_sort(data_list, key, reverse=False, type_converter=None):
     """
     Sorts a list of dictionaries using the Selection Sort algorithm.
@@ -4082,10 +7058,325 @@ def validate_meal_plan_input(plan_duration, dietary_prefs):
     return len(errors) == 0, errors
 
 # --- End of Meal Planning System ---
+
+# --- Meal plan export (CSV, JSON Lines, compact binary; see __main__) ---
+def write_meal_plan_rows(rows, stream, fmt):
+    """
+    Stream export rows (see MealPlan.iter_rows) to a binary file-like object, one row at
+    a time, as CSV, JSON Lines or the compact binary format (magic, then per row a
+    MEAL_PLAN_BIN_ROW record, the UTF-8 food name and MEAL_PLAN_BIN_VALUES).
+    Returns the number of rows written.
+    """
+    count = 0
+    if fmt == "bin":
+        meal_codes = {meal.capitalize(): code for code, meal in enumerate(MEAL_SLOTS)}
+        stream.write(MEAL_PLAN_BIN_MAGIC)
+        for day, meal, food, *values in rows:
+            name = food.encode("utf-8")
+            stream.write(MEAL_PLAN_BIN_ROW.pack(int(day.split()[-1]), meal_codes.get(meal, 255), len(name)))
+            stream.write(name)
+            stream.write(MEAL_PLAN_BIN_VALUES.pack(*values))
+            count += 1
+        return count
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    try:
+        if fmt == "csv":
+            writer = csv.writer(text)
+            writer.writerow(MEAL_PLAN_EXPORT_HEADERS)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in rows:
+                text.write(json.dumps(dict(zip(MEAL_PLAN_EXPORT_HEADERS, row))) + "\n")
+                count += 1
+        text.flush()
+    finally:
+        text.detach()  # Leave the underlying stream open for the caller
+    return count
+
+def read_meal_plan_binary(stream):
+    """Generator over rows written by write_meal_plan_rows(..., "bin")."""
+    if stream.read(len(MEAL_PLAN_BIN_MAGIC)) != MEAL_PLAN_BIN_MAGIC:
+        raise ValueError("Not a meal plan binary export")
+    meals = [meal.capitalize() for meal in MEAL_SLOTS]
+    while True:
+        header = stream.read(MEAL_PLAN_BIN_ROW.size)
+        if not header:
+            return
+        day, meal_code, name_length = MEAL_PLAN_BIN_ROW.unpack(header)
+        food = stream.read(name_length).decode("utf-8")
+        values = MEAL_PLAN_BIN_VALUES.unpack(stream.read(MEAL_PLAN_BIN_VALUES.size))
+        meal = meals[meal_code] if meal_code < len(meals) else ""
+        yield (f"Day {day}", meal, food) + values
+
+def exportMealPlansArchive(archive_path, days=7, fmt="csv", dietary_preferences=()):
+    """
+    Generate and export every user's meal plan into one zip archive (one member per user).
+    Plans are built one user at a time and rows are streamed into the archive, so memory
+    stays at one plan rather than the whole set. Member names are the student IDs reduced
+    to [A-Za-z0-9_-]; the archive is built under a temporary name that is removed if
+    generation fails. Returns the number of plans exported.
+    """
+    if fmt not in MEAL_PLAN_EXPORT_FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}'")
+    count = 0
+    used = set()
+    temp_path = archive_path + ".tmp"
+    try:
+        with zipfile.ZipFile(temp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            with open(USERS_CSV, newline="", encoding="utf-8") as users_file:
+                for row in csv.DictReader(users_file):
+                    _seed, plan, ok = build_user_meal_plan(row, days, dietary_preferences)
+                    if not ok:
+                        continue
+                    stem = re.sub(r"[^A-Za-z0-9_-]", "_", row.get("studentId") or "") or "user"
+                    name, n = stem, 1
+                    while name in used:
+                        n += 1
+                        name = f"{stem}_{n}"
+                    used.add(name)
+                    with archive.open(f"{name}.{fmt}", "w") as member:
+                        write_meal_plan_rows(plan.iter_rows(), member, fmt)
+                    count += 1
+        os.replace(temp_path, archive_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return count
+
+# --- Batch meal plan generation (see __main__) ---
+MEAL_PLAN_BATCH_FILE = "meal_plans.jsonl"
+
+def user_plan_seed(student_id):
+    """Stable per-user seed, so a batch run always produces the same plan for the same user."""
+    return zlib.crc32(student_id.encode("utf-8"))
+
+def build_user_meal_plan(row, days=7, dietary_preferences=(), with_message=False):
+    """Generate a user's meal plan from their users.csv row with their stable seed."""
+    user = User.fromDict(row)
+    seed = user_plan_seed(user.getStudentId())
+    plan = MealPlan(user, days, rng=random.Random(seed))
+    ok, message = plan.generate_meal_plan(list(dietary_preferences))
+    return (seed, plan, ok, message) if with_message else (seed, plan, ok)
+
+def generate_user_plan_record(row, days=7, dietary_preferences=()):
+    """
+    Build one user's meal plan from their users.csv row and return (JSON line, error).
+    A user whose row or plan fails gets an "ok": false record with the error instead of
+    aborting the batch; error is None otherwise.
+    Top-level (picklable) so it can run in a ProcessPoolExecutor worker.
+    """
+    student_id = row.get("studentId", "")
+    try:
+        seed, plan, ok, message = build_user_meal_plan(row, days, dietary_preferences, with_message=True)
+        record = {
+            "studentId": student_id,
+            "seed": seed,
+            "ok": ok,
+            "message": message,
+            "meals": plan.get_meals() if ok else {},
+            "analysis": plan.analyze_nutritional_balance() if ok else [],
+        }
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        return json.dumps({"studentId": student_id, "ok": False, "error": error}), error
+    return json.dumps(record), None
+
+def batchGenerateMealPlans(days=7, workers=None, output=MEAL_PLAN_BATCH_FILE, dietary_preferences=()):
+    """
+    Generate meal plans for every user in users.csv across a process pool and stream
+    them to `output` as JSON lines (one user per line, in users.csv order). A user whose
+    plan fails is written as an error record and reported after the run.
+    workers=1 runs in-process. Returns the number of lines written.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    valid, errors = validate_meal_plan_input(days, list(dietary_preferences))
+    if not valid:
+        raise ValueError("; ".join(errors))
+    rows = readCsv(USERS_CSV)
+    workers = workers or os.cpu_count() or 1
+    job = functools.partial(generate_user_plan_record, days=int(days), dietary_preferences=tuple(dietary_preferences))
+    start = time.perf_counter()
+    count = 0
+    failed = []
+    temp_path = output + ".tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            if workers == 1:
+                results = map(job, rows)
+                for row, (line, error) in zip(rows, results):
+                    f.write(line + "\n")
+                    count += 1
+                    if error:
+                        failed.append((row.get("studentId", ""), error))
+            else:
+                chunksize = max(1, len(rows) // (workers * 8))
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    for row, (line, error) in zip(rows, pool.map(job, rows, chunksize=chunksize)):
+                        f.write(line + "\n")
+                        count += 1
+                        if error:
+                            failed.append((row.get("studentId", ""), error))
+        os.replace(temp_path, output)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {count} meal plans ({days} days, {len(failed)} failed) to {output} in {elapsed:.2f} s "
+          f"with {workers} worker(s): {count / elapsed if elapsed else 0:.1f} plans/s")
+    for student_id, error in failed:
+        logError("Batch meal plan failed", level=logging.WARNING, studentId=student_id, error=error)
+        print(f"  failed: {student_id or '(no id)'}: {error}")
+    return count
+
+# --- Benchmarks (run from the command line, see __main__) ---
+def benchmarkNavigation(widgetCount=2000, rounds=10, clicks=20):
+    """
+    Compare page navigation cost for the old per-widget sidebar binding against the
+    single root-level click router. Each round destroys and rebuilds a page with
+    `widgetCount` widgets, like showPage does, then delivers `clicks` <Button-1> events
+    to its deepest widget with event_generate. The router variant runs the app's own
+    _routeClick. Needs a display (Tk window is hidden).
+    """
+    root = tk.Tk()
+    root.withdraw()
+    navBar = tk.Frame(root)
+    toggle_btn = tk.Button(root)
+    page = tk.Frame(root)
+    page.pack()
+    closed = [0]
+    # Stands in for the app: an open sidebar whose toggle_left_menu only counts the closes
+    app = SimpleNamespace(menu_visible=True, navBar=navBar, toggle_btn=toggle_btn, root=root,
+                          toggle_left_menu=lambda: closed.__setitem__(0, closed[0] + 1))
+
+    def legacy_handler(event):
+        if app.menu_visible:
+            app.toggle_left_menu()
+
+    def build_page():
+        for w in page.winfo_children():
+            w.destroy()
+        # Rows of frames with labels, similar in shape to the real pages
+        for _ in range(widgetCount // 10):
+            row = tk.Frame(page)
+            for _ in range(9):
+                tk.Label(row, text="x").pack(side="left")
+            row.pack()
+
+    def legacy_bind(widget):
+        widget.bind("<Button-1>", legacy_handler, add=True)
+        for child in widget.winfo_children():
+            legacy_bind(child)
+
+    def click_deepest():
+        target = page.winfo_children()[-1].winfo_children()[-1]
+        for _ in range(clicks):
+            target.event_generate("<Button-1>", x=1, y=1)
+
+    results = {}
+    for name, after_build in (("recursive bind", lambda: legacy_bind(page)), ("root router", lambda: None)):
+        if name == "root router":
+            root.bind_all("<Button-1>", functools.partial(HealthyHabitsApp._routeClick, app), add="+")
+        closed[0] = 0
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            build_page()
+            after_build()
+            click_deepest()
+            root.update_idletasks()
+            timings.append((time.perf_counter() - start) * 1000)
+        if closed[0] != rounds * clicks:
+            raise RuntimeError(f"{name}: {closed[0]} of {rounds * clicks} clicks reached the handler")
+        results[name] = sum(timings) / len(timings)
+    root.destroy()
+
+    print(f"Navigation benchmark ({widgetCount} widgets, {clicks} clicks, {rounds} rounds)")
+    for name, avg_ms in results.items():
+        print(f"  {name:<15} {avg_ms:8.2f} ms per navigation")
+    return results
+
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Healthy Habits")
+    parser.add_argument("--benchmark-nav", action="store_true", help="Time page navigation with 2,000 widgets and exit")
+    parser.add_argument("--benchmark-planner", type=int, nargs="?", const=10000, metavar="PROFILES",
+                        help="Solve meal plans for random goal profiles (default 10,000) and exit")
+    parser.add_argument("--benchmark-nutrition", action="store_true", help="Time plan analysis for 10,000 users x 30 days and exit")
+    parser.add_argument("--batch-meal-plans", action="store_true", help="Generate meal plans for every user in users.csv and exit")
+    parser.add_argument("--days", type=int, default=7, help="Plan length for --batch-meal-plans (1-30)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for --batch-meal-plans (default: CPU count)")
+    parser.add_argument("--output", default=MEAL_PLAN_BATCH_FILE, help="JSON lines output for --batch-meal-plans")
+    parser.add_argument("--benchmark-food-index", action="store_true", help="Time food lookups over 300,000 synthetic foods and exit")
+    parser.add_argument("--compile-food-db", metavar="CSV", help="Compile a nutrient CSV (per 100g) into the binary food database and exit")
+    parser.add_argument("--food-db-output", default=FOOD_DB_FILE, help="Output path for --compile-food-db")
+    parser.add_argument("--export-meal-plans", metavar="ZIP", help="Export every user's meal plan into one zip archive and exit")
+    parser.add_argument("--format", choices=MEAL_PLAN_EXPORT_FORMATS, default="csv", help="Row format for --export-meal-plans")
+    parser.add_argument("--profile-startup", action="store_true", help="Print the import and init timeline once the login screen is up")
+    parser.add_argument("--list-backups", action="store_true", help="List backup snapshots and exit")
+    parser.add_argument("--restore-backup", nargs="?", const="latest", metavar="SNAPSHOT",
+                        help="Restore data files from a backup snapshot (default: the newest) and exit")
+    parser.add_argument("--restore-to", metavar="DIR",
+                        help="Target directory for --restore-backup (required; data files there that the snapshot lacks are deleted)")
+    parser.add_argument("--metrics-out", nargs="?", const=METRICS_EXPORT_FILE, metavar="JSON",
+                        help=f"Write timer/counter metrics to JSON on exit (default: {METRICS_EXPORT_FILE})")
+    args = parser.parse_args()
+    PROFILE_STARTUP = args.profile_startup
+
+    if args.benchmark_nav:
+        benchmarkNavigation()
+        raise SystemExit(0)
+    if args.list_backups:
+        for snapshot_id in getBackupStore().snapshots():
+            manifest = getBackupStore().manifest(snapshot_id)
+            print(f"{snapshot_id}  {len(manifest['files'])} files, {len(manifest['changed'])} changed")
+        raise SystemExit(0)
+    if args.restore_backup:
+        if args.restore_to is None:
+            parser.error("--restore-backup needs --restore-to DIR (pass . to overwrite the live data)")
+        snapshot_id = None if args.restore_backup == "latest" else args.restore_backup
+        result = getBackupStore().restore(args.restore_to, snapshot_id)
+        print(f"Restored {result['restored']} files to {os.path.abspath(args.restore_to)}, "
+              f"removed {len(result['removed'])} not in the snapshot")
+        raise SystemExit(0)
+    if args.compile_food_db:
+        written, skipped = compile_food_database(args.compile_food_db, args.food_db_output)
+        print(f"Compiled {written} foods into {args.food_db_output} ({skipped} rows skipped)")
+        raise SystemExit(0)
+    if args.export_meal_plans:
+        exported = exportMealPlansArchive(args.export_meal_plans, args.days, args.format)
+        print(f"Exported {exported} meal plans to {args.export_meal_plans}")
+        raise SystemExit(0)
+    if args.batch_meal_plans:
+        batchGenerateMealPlans(args.days, args.workers, args.output)
+        raise SystemExit(0)
+    if args.benchmark_food_index:
+        benchmarkFoodIndex()
+        raise SystemExit(0)
+    if args.benchmark_nutrition:
+        benchmarkNutritionAnalysis()
+        raise SystemExit(0)
+    if args.benchmark_planner:
+        benchmarkMealPlanner(args.benchmark_planner)
+        raise SystemExit(0)
+
     if not os.path.exists(ASSETS_DIR):
         os.makedirs(ASSETS_DIR)
         print(f"Created '{ASSETS_DIR}' folder. Please add your icon files there.")
+    markStartup("module loaded")
     app = HealthyHabitsApp()
-    app.backupData()
+    app.backupDataInBackground()
+
+    def onFirstFrame():
+        markStartup("first frame drawn")
+        if PROFILE_STARTUP:
+            printStartupTimeline()
+
+    # Runs after the first idle redraw, i.e. once the login screen is actually on screen
+    app.root.after_idle(lambda: app.root.after(0, onFirstFrame))
     app.root.mainloop()
+    app.mealPlanCache.save()
+    if args.metrics_out:
+        exportMetrics(args.metrics_out)